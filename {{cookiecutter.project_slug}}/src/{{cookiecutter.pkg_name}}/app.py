@@ -7,26 +7,48 @@ Usage::
 """
 
 import argparse
-from test_project.graceful_interrupt_handler import GracefulInterruptHandler
+from typing import Any, Iterable, Iterator
 
 __docformat__ = 'restructuredtext en'
 
 
+def process_item(item: Any) -> Any:
+    """Process a work item, run by the task runner (in a worker process for --executor process).
+
+    :param item: the work item
+    :return: the item's result
+    """
+    # TODO: implement the work here
+    return item
+
+
 class App(object):
     """This is the application class."""
 
     # noinspection PyUnresolvedReferences,PyMethodMayBeStatic
-    def execute(self, settings: argparse.Namespace) -> None:
+    def execute(self, settings: argparse.Namespace) -> Iterator[Any]:
         """Execute the tasks specified in the settings object.
 
+        The work items are run on the task runner configured by --jobs, --executor, --chunk-size and --unordered,
+        which stops when interrupted (SIGINT, SIGTERM or SIGHUP).
+
         :param settings: the application settings
+        :return: the results, reported by the CLI as they are produced
         :raises: ArgumentError
         """
         # TODO: Initialize logger if necessary
+        from {{ cookiecutter.pkg_name }}.task_runner import TaskRunner
 
-        with GracefulInterruptHandler() as handler:
-            # TODO: implement app here
-            if handler.interrupted:
-                pass
+        runner = TaskRunner.from_settings(settings)
+        # TODO: filter or transform the results (result.error is the task's error if it failed)
+        return runner.run(process_item, self.work_items(settings))
 
-        return None
+    # noinspection PyMethodMayBeStatic,PyUnusedLocal
+    def work_items(self, settings: argparse.Namespace) -> Iterable[Any]:
+        """The work items for process_item.
+
+        :param settings: the application settings
+        :return: the work items, a generator is fine
+        """
+        # TODO: implement the work items here
+        return []
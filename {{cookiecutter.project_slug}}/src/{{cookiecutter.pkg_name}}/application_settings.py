@@ -13,20 +13,27 @@ This base class adds the following features to ArgumentParser:
 * display the application's version from app_package.version (usually defined in app_package/__init__.py).
 
 * display the application's longhelp which is the module docstring in app_package/__init__.py.
+
+To keep the start up of the command line fast, modules only needed on some code paths (configparser, importlib,
+safe_edit) are imported where they are used, and a lone --help, --version or --longhelp is answered before the
+config files are read or the parsers are built (with the rendered help cached per terminal width).
 """
 import argparse
-import importlib
+import marshal
 import os
 import re
-from configparser import ConfigParser, NoSectionError
+import sys
+from collections import OrderedDict
 from itertools import chain
-from typing import Dict, List, Optional, Tuple
-
-from logzero import logger
+from stat import S_ISREG
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from {{ cookiecutter.pkg_name }}.safe_edit import safe_edit
 from {{ cookiecutter.pkg_name }}.terminalsize import get_terminal_size
 
+if TYPE_CHECKING:  # pragma: no cover
+    from {{ cookiecutter.pkg_name }}.file_lock import FileLock
+    from {{ cookiecutter.pkg_name }}.safe_edit import EditFiles
+
 
 class SplitlineHelpFormatter(argparse.HelpFormatter):
     """Formatter that handles embedded newlines in help text."""
@@ -76,6 +83,26 @@ class ApplicationSettings(object):
 
     VERSION_REGEX: str = r"__version__\s*=\s*[\'\"](\S+)[\'\"]"
 
+    # cache the defaults merged from the config files (see _cached_config_defaults)
+    CONFIG_CACHE: bool = True
+
+    # changed whenever the format of the cached config defaults changes
+    CACHE_FORMAT: int = 1
+
+    # the most parsers kept, built from different config files or states of them (see _cached_parser)
+    PARSER_CACHE_SIZE: int = 8
+
+    # seconds to wait for another invocation persisting the config items, the items are not persisted on a timeout
+    PERSIST_LOCK_TIMEOUT: float = 10.0
+
+    # command line flags that are answered, when given alone, before any config file or parser work
+    PRE_DISPATCH_FLAGS: Dict[str, str] = {
+        "-h": "help",
+        "--help": "help",
+        "--version": "version",
+        "--longhelp": "longhelp",
+    }
+
     def __init__(
         self,
         app_name: str,
@@ -102,6 +129,8 @@ class ApplicationSettings(object):
         self._parser: argparse.ArgumentParser
         self._settings: argparse.Namespace
         self._remaining_argv: List[str]
+        self._conf_parser_cache: Optional[argparse.ArgumentParser] = None
+        self._parser_cache: "OrderedDict[Tuple[Tuple[str, int, int], ...], argparse.ArgumentParser]" = OrderedDict()
 
         default_help = {
             "version": "Show the application's version.  (default: %(default)s)",
@@ -111,43 +140,206 @@ class ApplicationSettings(object):
         self._help = default_help.copy()
         self._help.update(help_strings.copy())
 
-    def parse(self) -> Tuple[argparse.ArgumentParser, argparse.Namespace, List[str]]:
+    def parse(self, argv: Optional[List[str]] = None) -> Tuple[argparse.ArgumentParser, argparse.Namespace, List[str]]:
         """Perform the parsing of the optional config files and the command line arguments.
 
+        :param argv: the command line arguments (default: sys.argv[1:])
         :return: the parser, the settings, any leftover arguments
         """
+        args, remaining_argv = self._cached_conf_parser().parse_known_args(argv)
+
+        config_files = self._config_files(args.conf_file)
+        # with persist, locked from before the config files are read until the persisted items are written, so
+        # concurrent invocations do not lose each other's updates
+        persist, lock = self._persist_lock() if self.__persist else (False, None)
+        try:
+            parser = self._cached_parser(config_files)
+
+            settings, leftover_argv = parser.parse_known_args(remaining_argv)
+            settings.config_files = config_files
+
+            if persist:
+                self._persist(settings, config_files, self.__persist)
+        finally:
+            if lock is not None:
+                lock.release()
+
+        return parser, settings, leftover_argv
+
+    def parse_many(self, argv_iterable: Iterable[List[str]], single_pass: bool = False) -> Iterator[argparse.Namespace]:
+        """Parse many command lines, reusing the parsers and the merged config defaults.
+
+        Each settings namespace also has the config_files used and the leftover (unknown) remaining_argv.  Unlike
+        parse, the persist items are not written to the config file.
+
+        Usage::
+
+            for settings in MySettings().parse_many([['--foo'], ['--bar', 'baz']]):
+                pass
+
+        :param argv_iterable: the command lines to parse, each a list of arguments without the program name
+        :param single_pass: parse each command line once with the default config files' parser (which also knows
+            --conf_file) and only parse again, with that config file's defaults, if --conf_file is given, instead of
+            always running the --conf_file parser first.
+        :return: a settings namespace per command line
+        """
+        for argv in argv_iterable:
+            if single_pass:
+                remaining_argv = list(argv)
+                conf_file = None
+            else:
+                args, remaining_argv = self._cached_conf_parser().parse_known_args(argv)
+                conf_file = args.conf_file
+            config_files = self._config_files(conf_file)
+            settings, leftover_argv = self._cached_parser(config_files).parse_known_args(remaining_argv)
+            if single_pass and settings.conf_file:
+                config_files = self._config_files(settings.conf_file)
+                settings, leftover_argv = self._cached_parser(config_files).parse_known_args(remaining_argv)
+            settings.config_files = config_files
+            settings.remaining_argv = leftover_argv
+            yield settings
+
+    def _cached_conf_parser(self) -> argparse.ArgumentParser:
+        """The --conf_file parser, created once per instance."""
+        if self._conf_parser_cache is None:
+            self._conf_parser_cache = self._conf_parser()
+        return self._conf_parser_cache
+
+    def _cached_parser(self, config_files: List[str]) -> argparse.ArgumentParser:
+        """The main parser with the defaults from the config files.
+
+        The parser is built once for each state (path, size and mtime) of the config files, keeping the
+        PARSER_CACHE_SIZE most recently used parsers.
+
+        :param config_files: the config files to load the defaults from
+        """
+        key = tuple(self._config_signatures(config_files))
+        parser = self._parser_cache.get(key)
+        if parser is None:
+            parser = self._build_parser(self._cached_conf_parser(), self._load_defaults(config_files))
+            self._parser_cache[key] = parser
+            if len(self._parser_cache) > self.PARSER_CACHE_SIZE:
+                self._parser_cache.popitem(last=False)
+        else:
+            self._parser_cache.move_to_end(key)
+        return parser
+
+    def _conf_parser(self) -> argparse.ArgumentParser:
+        """Create the parser for the --conf_file option which is also the parent of the main parser."""
         config_parser_help = "Configuration file in INI format (default: {files})".format(
             files=self._default_config_files()
         )
         conf_parser = argparse.ArgumentParser(add_help=False)
         conf_parser.add_argument("-c", "--conf_file", metavar="FILE", help=config_parser_help)
+        return conf_parser
 
-        args, remaining_argv = conf_parser.parse_known_args()
-
-        config_files = self.__config_files
-        if config_files is None:
+    def _config_files(self, conf_file: Optional[str]) -> List[str]:
+        """The config files to load, the --conf_file first."""
+        if self.__config_files is None:
             config_files = self._default_config_files()[:]
-        if args.conf_file:
-            config_files.insert(0, args.conf_file)
+        else:
+            config_files = list(self.__config_files)
+        if conf_file:
+            config_files.insert(0, conf_file)
+        return config_files
 
-        config = ConfigParser()
-        config.read(config_files)
+    def _load_defaults(self, config_files: List[str]) -> Dict[str, str]:
+        """Load the defaults for the parser from the config_sections of the config files.
+
+        The merged defaults are cached (see _cached_config_defaults).
+        """
         defaults = {}
         if self.__persist is not None:
             for key in self.__persist:
                 defaults[key] = ""
+        signatures = self._config_signatures(config_files)
+        if any(size >= 0 for file_, size, mtime_ns in signatures):
+            defaults.update(self._cached_config_defaults(signatures))
+        return defaults
+
+    def _cached_config_defaults(self, signatures: List[Tuple[str, int, int]]) -> Dict[str, str]:
+        """Get the defaults merged from the config_sections of the existing config files.
+
+        The merged defaults are cached in a marshal file keyed by the path, size and mtime of every config file and
+        the config sections, so while the config files are unchanged this costs a stat per config file.
+
+        :param signatures: the config files' signatures from _config_signatures
+        """
+        key = [self.CACHE_FORMAT, list(self.__config_sections), signatures]
+        cache_file = os.path.join(self._cache_dir(), "config-defaults.bin")
+        if self.CONFIG_CACHE:
+            # noinspection PyBroadException
+            try:
+                with open(cache_file, mode="rb") as in_file:
+                    cached_key, defaults = marshal.load(in_file)
+                if cached_key == key:
+                    return defaults
+            except Exception:
+                pass
+
+        from configparser import ConfigParser, NoSectionError
+
+        config = ConfigParser()
+        config.read([file_ for file_, size, mtime_ns in signatures if size >= 0])
+        defaults = {}
         for section in self.__config_sections:
             try:
                 defaults.update(dict(config.items(section)))
             except NoSectionError:
                 pass
+        if self.CONFIG_CACHE:
+            self._write_cache(cache_file, marshal.dumps((key, defaults)))
+        return defaults
 
+    # noinspection PyMethodMayBeStatic
+    def _config_signatures(self, config_files: List[str]) -> List[Tuple[str, int, int]]:
+        """Get the absolute path, size and mtime_ns of each config file, the size and mtime are -1 if it is missing."""
+        signatures = []
+        for file_ in config_files:
+            path = os.path.abspath(file_)
+            try:
+                file_stat = os.stat(path)
+                if S_ISREG(file_stat.st_mode):
+                    signatures.append((path, file_stat.st_size, file_stat.st_mtime_ns))
+                    continue
+            except OSError:
+                pass
+            signatures.append((path, -1, -1))
+        return signatures
+
+    def _cache_dir(self) -> str:
+        """The directory of the application's caches (help and config)."""
+        return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), self.__app_package)
+
+    # noinspection PyMethodMayBeStatic
+    def _write_cache(self, cache_file: str, data: bytes) -> None:
+        """Atomically write a cache file, ignoring any errors (a cache is optional)."""
+        # noinspection PyBroadException
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            tmp_name = "{file}.{pid}".format(file=cache_file, pid=os.getpid())
+            with open(tmp_name, mode="wb") as out_file:
+                out_file.write(data)
+            os.replace(tmp_name, cache_file)
+        except Exception:
+            pass
+
+    def _build_parser(
+        self, conf_parser: argparse.ArgumentParser, defaults: Dict[str, str], console_width: Optional[int] = None
+    ) -> argparse.ArgumentParser:
+        """Create the main parser with the application's options and the defaults.
+
+        :param conf_parser: the --conf_file parser
+        :param defaults: the default dictionary usually loaded from a config file
+        :param console_width: the width of the help (default: the terminal's width)
+        """
         parent_parsers = [conf_parser] + self._cli_parent_parsers()
 
         # HACK:  ArgumentParser by default uses env['COLUMNS'] which is always 80, so we get the terminal
         # size and pass the console width into the HelpFormatter as the width.
         # TODO:  Currently hard coded the max_help_position.  This really should be dynamically calculated.
-        (console_width, console_height) = get_terminal_size()
+        if console_width is None:
+            (console_width, console_height) = get_terminal_size()
         parser = argparse.ArgumentParser(
             self.__app_name,
             parents=parent_parsers,
@@ -159,25 +351,108 @@ class ApplicationSettings(object):
             parser.set_defaults(**defaults)
 
         self._cli_options(parser, defaults)
+        return parser
 
-        settings, leftover_argv = parser.parse_known_args(remaining_argv)
-        settings.config_files = config_files
+    def _pre_dispatch(self, argv: List[str]) -> None:
+        """Answer a lone informational flag (see PRE_DISPATCH_FLAGS) then exit.
 
-        if self.__persist is not None and self.__persist:
-            self._persist(settings, config_files, self.__persist)
+        This skips parsing the config files and building the parsers, and the help is rendered from a cache.
 
-        return parser, settings, leftover_argv
+        :param argv: the command line arguments
+        """
+        if len(argv) != 1 or argv[0] not in self.PRE_DISPATCH_FLAGS:
+            return
+        action = self.PRE_DISPATCH_FLAGS[argv[0]]
+        if action == "version":
+            self._show_version(pre_dispatch=True)
+        elif action == "longhelp":
+            self._show_longhelp(pre_dispatch=True)
+        else:
+            sys.stdout.write(self._cached_help())
+        exit(0)
+
+    def _cached_help(self) -> str:
+        """Get the rendered help from the cache, rendering and caching it if necessary.
+
+        The cache has a file per terminal width whose first line is the key: the application name and version, the
+        path, size and mtime of the settings class's module (where the options are defined) and the path, size and
+        mtime of each config file (as the defaults shown in the help come from them).
+        """
+        (console_width, console_height) = get_terminal_size()
+        config_files = self._config_files(None)
+        signatures = self._config_signatures(config_files)
+        module_file = getattr(sys.modules.get(type(self).__module__), "__file__", None) or ""
+        options_signature = self._config_signatures([module_file])
+        key = repr((self.__app_name, self._load_version(), console_width, options_signature, signatures)) + "\n"
+
+        cache_file = os.path.join(self._cache_dir(), "help-{width}.txt".format(width=console_width))
+        # noinspection PyBroadException
+        try:
+            with open(cache_file, mode="r", encoding="utf-8") as in_file:
+                if in_file.readline() == key:
+                    return in_file.read()
+        except Exception:
+            pass
+
+        parser = self._build_parser(self._cached_conf_parser(), self._load_defaults(config_files), console_width)
+        help_text = parser.format_help()
+        self._write_cache(cache_file, (key + help_text).encode("utf-8"))
+        return help_text
+
+    def _show_version(self, pre_dispatch: bool = False) -> None:
+        """Show the application's version.
+
+        :param pre_dispatch: when answering from _pre_dispatch, log without importing logzero (see _log_info)
+        """
+        message = "Version %s" % self._load_version()
+        if pre_dispatch:
+            _log_info(message)
+        else:
+            from logzero import logger
+            logger.info(message)
+
+    def _show_longhelp(self, pre_dispatch: bool = False) -> None:
+        """Show the longhelp, the app_package's docstring.
+
+        When the package has not been imported yet, the docstring is read from its source instead of importing it.
+
+        :param pre_dispatch: when answering from _pre_dispatch, log without importing logzero (see _log_info)
+        """
+        module = sys.modules.get(self.__app_package)
+        if module is not None:
+            message = module.__doc__
+        else:
+            import ast
+            import importlib.util
+            spec = importlib.util.find_spec(self.__app_package)
+            if spec is None or spec.origin is None:
+                return
+            with open(spec.origin, mode="r", encoding="utf-8") as in_file:
+                message = ast.get_docstring(ast.parse(in_file.read()), clean=False)
+        if pre_dispatch:
+            _log_info(message)
+        else:
+            from logzero import logger
+            logger.info(message)
 
     def _persist(
         self,
         settings: argparse.Namespace,
         config_files: List[str],
         persist: Optional[List[str]],
-    ) -> None:
-        """Persist config items to config files."""
+    ) -> bool:
+        """Persist config items to config files.
+
+        The config file is only rewritten when the persisted values differ from its content.  Called holding the
+        _persist_lock.
+
+        :return: True if the config file was changed
+        """
         existing_files = [file_ for file_ in config_files if os.path.isfile(file_)]
         existing_files.append(config_files[0])
-        files: List
+        from {{ cookiecutter.pkg_name }}.safe_edit import safe_edit
+
+        files: "EditFiles"
         with safe_edit(existing_files[0]) as files:
             # hitting mypy bug: https://github.com/python/mypy/issues/8829
             out_file = files[1]  # type: ignore
@@ -185,6 +460,31 @@ class ApplicationSettings(object):
             if persist:
                 for key in persist:
                     out_file.write("{key}={value}\n".format(key=key, value=vars(settings)[key]))
+        return files.changed
+
+    def _persist_lock(self) -> Tuple[bool, Optional["FileLock"]]:
+        """Lock the persisted config items against other invocations, waiting up to PERSIST_LOCK_TIMEOUT.
+
+        The lock file is in the cache directory rather than next to the config files.  When the lock file cannot be
+        created (e.g. the cache directory is not writable) the items are persisted without the lock, as the
+        cache is optional.
+
+        :return: whether to persist the items and the held lock, (False, None) with a warning logged if the wait
+                 timed out, (True, None) if the lock could not be created
+        """
+        from {{ cookiecutter.pkg_name }}.file_lock import FileLock, LockTimeoutError
+
+        try:
+            os.makedirs(self._cache_dir(), exist_ok=True)
+            lock = FileLock(os.path.join(self._cache_dir(), "persist"), timeout=self.PERSIST_LOCK_TIMEOUT)
+            return True, lock.acquire()
+        except LockTimeoutError as ex:
+            from logzero import logger
+
+            logger.warning("%s, the settings are not persisted", ex)
+            return False, None
+        except OSError:
+            return True, None
 
     def _default_config_files(self) -> List[str]:
         """Defines the default set of config files to try to use.
@@ -252,6 +552,8 @@ class ApplicationSettings(object):
         :param early_validate: asserted if you want cli validation before longhelp and version handling
         :return: the settings namespace
         """
+        self._pre_dispatch(sys.argv[1:])
+
         self._parser, self._settings, self._remaining_argv = self.parse()
 
         # Logger.set_verbose(not self._settings.quiet)
@@ -263,12 +565,11 @@ class ApplicationSettings(object):
                 self._parser.error("\n" + error_message)
 
         if self._settings.longhelp:
-            app_module = importlib.import_module(self.__app_package)
-            logger.info(app_module.__doc__)
+            self._show_longhelp()
             exit(0)
 
         if self._settings.version:
-            logger.info("Version %s" % self._load_version())
+            self._show_version()
             exit(0)
 
         if not early_validate:
@@ -338,3 +639,24 @@ class ApplicationSettings(object):
         if self._parser:
             self._parser.print_help()
         return 2
+
+
+def _log_info(message: Optional[str]) -> None:
+    """Log an info message to stderr in logzero's default format, without importing logging or logzero.
+
+    Only for the _pre_dispatch fast path, which runs before logzero is configured; log through logzero elsewhere.
+
+    :param message: the message, logged as "None" when None like logzero does
+    """
+    import time
+
+    caller = sys._getframe(1)
+    prefix = "[I {time} {module}:{line}]".format(
+        time=time.strftime("%y%m%d %H:%M:%S"),
+        module=os.path.splitext(os.path.basename(caller.f_code.co_filename))[0],
+        line=caller.f_lineno,
+    )
+    if hasattr(sys.stderr, "isatty") and sys.stderr.isatty():
+        # logzero's colored level prefix
+        prefix = "\033[32m{prefix}\033[39m".format(prefix=prefix)
+    sys.stderr.write("{prefix} {message}\n".format(prefix=prefix, message=message))
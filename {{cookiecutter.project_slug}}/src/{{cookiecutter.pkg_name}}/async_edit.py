@@ -0,0 +1,183 @@
+"""asyncio versions of safe_edit and quick_edit.
+
+The blocking file I/O is offloaded to a bounded thread pool so that edits do not stall the event loop, and the
+number of concurrent edits is capped.  The backup and restore semantics are those of safe_edit.
+
+Usage::
+
+    async with async_safe_edit(file_name) as files:
+        in_file, out_file = files
+        await out_file.write((await in_file.read()).upper())
+
+    changed = await async_quick_edit(file_name, {'foo': ['bar']})
+
+    # or with a different cap on the concurrent edits
+    editor = AsyncEditor(max_concurrent_edits=32)
+    await editor.quick_edit(file_name, plan)
+"""
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from {{ cookiecutter.pkg_name }}.safe_edit import EditPlan, quick_edit, safe_edit
+
+# the default cap on concurrent edits (and the size of the default thread pool)
+DEFAULT_MAX_CONCURRENT_EDITS: int = 8
+
+
+class AsyncFile(object):
+    """A file whose reads and writes are awaited, run in an AsyncEditor's executor.
+
+    The wrapped file is available as the file attribute, e.g. to pass to editor.run for a longer blocking task.
+    """
+
+    def __init__(self, file: Any, editor: "AsyncEditor") -> None:
+        """Initialize.
+
+        :param file: the file to wrap
+        :param editor: the editor whose executor runs the blocking I/O
+        """
+        self.file = file
+        self._editor = editor
+
+    async def read(self, size: int = -1) -> Any:
+        """Read up to size characters (or bytes), all the rest when size is negative."""
+        return await self._editor.run(self.file.read, size)
+
+    async def readline(self, size: int = -1) -> Any:
+        """Read a line, returning an empty string (or bytes) at the end of the file."""
+        return await self._editor.run(self.file.readline, size)
+
+    async def write(self, data: Any) -> int:
+        """Write the data.
+
+        :return: the number of characters (or bytes) written
+        """
+        return await self._editor.run(self.file.write, data)
+
+    def __aiter__(self) -> "AsyncFile":
+        return self
+
+    async def __anext__(self) -> Any:
+        line = await self.readline()
+        if not line:
+            raise StopAsyncIteration
+        return line
+
+
+class AsyncEditor(object):
+    """Runs safe_edit and quick_edit on a bounded thread pool with a cap on the concurrent edits."""
+
+    def __init__(
+        self, max_concurrent_edits: int = DEFAULT_MAX_CONCURRENT_EDITS, executor: Optional[ThreadPoolExecutor] = None
+    ) -> None:
+        """Initialize.
+
+        :param max_concurrent_edits: the maximum number of edits in progress at once
+        :param executor: the executor for the blocking I/O (default: a thread pool of max_concurrent_edits threads)
+        """
+        self.max_concurrent_edits = max_concurrent_edits
+        self._executor = executor
+        # a semaphore belongs to the event loop it is used in
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """The executor for the blocking I/O, created when first used."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_edits, thread_name_prefix="async_edit"
+            )
+        return self._executor
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shutdown the executor."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    async def run(self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function in the executor, for example to read or write a large file inside safe_edit.
+
+        :return: the function's return value
+        """
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args, **kwargs))
+
+    @asynccontextmanager
+    async def safe_edit(self, file_name: str, **kwargs: Any) -> AsyncIterator[List[AsyncFile]]:
+        """Edit a file using a backup like safe_edit, opening, reading, writing and committing in the executor.
+
+        The edit counts against the cap on concurrent edits until it is committed.
+
+        :param file_name: source file to edit
+        :param kwargs: the other arguments of safe_edit (create, buffer_size, binary, lock, lock_timeout)
+        :yield: [input file, output file] as AsyncFiles
+        """
+        async with self._semaphore():
+            context: Any = safe_edit(file_name, **kwargs)
+            files = await self.run(context.__enter__)
+            try:
+                yield [AsyncFile(file, self) for file in files]
+            except BaseException as ex:
+                # discard the edit (safe_edit never commits on an exception), shielded so that cancelling this task
+                # again while waiting does not stop the temporary file being removed
+                discard = asyncio.get_running_loop().run_in_executor(
+                    self.executor, partial(context.__exit__, type(ex), ex, ex.__traceback__)
+                )
+                await asyncio.shield(discard)
+                raise
+            else:
+                await self.run(context.__exit__, None, None, None)
+
+    async def quick_edit(
+        self, file_name: str, regex_replacement_dict: Union[Dict[str, List[str]], EditPlan], **kwargs: Any
+    ) -> bool:
+        """Run quick_edit in the executor.
+
+        :param file_name: file to edit
+        :param regex_replacement_dict: the replacements or a compiled EditPlan
+        :param kwargs: the other arguments of quick_edit (buffer_size, whole_buffer)
+        :return: True if the file was changed
+        """
+        async with self._semaphore():
+            return await self.run(quick_edit, file_name, regex_replacement_dict, **kwargs)
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent_edits)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+
+# the editor used by async_safe_edit and async_quick_edit
+DEFAULT_EDITOR = AsyncEditor()
+
+
+def async_safe_edit(file_name: str, **kwargs: Any) -> Any:
+    """Edit a file using a backup like safe_edit without blocking the event loop (see AsyncEditor.safe_edit).
+
+    Usage::
+
+        async with async_safe_edit(file_name) as files:
+            in_file, out_file = files
+            async for line in in_file:
+                await out_file.write(line)
+    """
+    return DEFAULT_EDITOR.safe_edit(file_name, **kwargs)
+
+
+async def async_quick_edit(
+    file_name: str, regex_replacement_dict: Union[Dict[str, List[str]], EditPlan], **kwargs: Any
+) -> bool:
+    """Run quick_edit without blocking the event loop (see AsyncEditor.quick_edit).
+
+    :return: True if the file was changed
+    """
+    return await DEFAULT_EDITOR.quick_edit(file_name, regex_replacement_dict, **kwargs)
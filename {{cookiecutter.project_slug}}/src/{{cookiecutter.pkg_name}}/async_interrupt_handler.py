@@ -0,0 +1,126 @@
+"""asyncio version of GracefulInterruptHandler as an async context manager.
+
+The signal is handled by the event loop (loop.add_signal_handler), so instead of polling **interrupted** the
+coroutines can await the handler's event, or have their tasks cancelled, as soon as the signal arrives.
+
+Can be nested, like GracefulInterruptHandler: the innermost handler gets the signal and releases it to the next
+handler out.
+
+Example Usage::
+
+    async def main():
+        async with AsyncGracefulInterruptHandler(signal.SIGTERM) as handler:
+            server = asyncio.ensure_future(serve())
+            handler.add_task(server)
+            await handler.wait()
+
+    async def worker():
+        # cancel this task on an interrupt
+        async with AsyncGracefulInterruptHandler(cancel_current=True):
+            await work()
+
+Only available with event loops that support add_signal_handler (not the Windows event loops).
+"""
+import asyncio
+import signal
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+
+# per event loop, per signal: the signal's original handler and the stack of captured handlers
+_captured: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[int, List[Any]]]" = weakref.WeakKeyDictionary()
+
+
+class AsyncGracefulInterruptHandler(object):
+    """Provides an async context to safely catch interrupts in an event loop."""
+
+    def __init__(
+        self,
+        sig: int = signal.SIGINT,
+        cancel_tasks: Optional[Iterable["asyncio.Future[Any]"]] = None,
+        cancel_current: bool = False,
+        event: Optional[asyncio.Event] = None,
+    ):
+        """Initialize.
+
+        :param sig: the signal to capture
+        :param cancel_tasks: the tasks (or futures) to cancel when interrupted
+        :param cancel_current: also cancel the task that captures the signal when interrupted
+        :param event: the event to set when interrupted (default: a new event)
+        """
+        self.sig = sig
+        self.interrupted = False
+        self.released = False
+        self.tasks: List["asyncio.Future[Any]"] = list(cancel_tasks or [])
+        self.cancel_current = cancel_current
+        self.event = event
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def __aenter__(self) -> "AsyncGracefulInterruptHandler":
+        """Enter async context manager."""
+        return self.capture()
+
+    # noinspection PyShadowingBuiltins
+    async def __aexit__(self, type, value, tb) -> None:
+        """Exit async context manager."""
+        self.release()
+
+    def capture(self) -> "AsyncGracefulInterruptHandler":
+        """Capture the signal in the running event loop.
+
+        Useful when not using the "async with AsyncGracefulInterruptHandler" syntax.
+        """
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self.interrupted = False
+        self.released = False
+        if self.event is None:
+            self.event = asyncio.Event()
+        if self.cancel_current:
+            current_task = asyncio.current_task()
+            if current_task is not None:
+                self.tasks.append(current_task)
+
+        captured = _captured.setdefault(loop, {})
+        if self.sig not in captured:
+            captured[self.sig] = [signal.getsignal(self.sig), []]
+        captured[self.sig][1].append(self)
+        loop.add_signal_handler(self.sig, self._handler)
+        return self
+
+    def add_task(self, task: "asyncio.Future[Any]") -> None:
+        """Cancel the task (or future) when interrupted."""
+        self.tasks.append(task)
+
+    async def wait(self) -> None:
+        """Wait until interrupted."""
+        assert self.event is not None, "The signal has not been captured"
+        await self.event.wait()
+
+    def _handler(self) -> None:
+        """Signal that an interrupt has occurred, cancelling the tasks."""
+        self.release()
+        self.interrupted = True
+        if self.event is not None:
+            self.event.set()
+        for task in self.tasks:
+            if not task.done():
+                task.cancel()
+
+    def release(self) -> bool:
+        """Release the signal handler, to the enclosing handler if any."""
+        if self.released or self._loop is None:
+            return False
+        self.released = True
+
+        original_handler, stack = _captured[self._loop][self.sig]
+        innermost = stack[-1] is self
+        stack.remove(self)
+        if stack:
+            if innermost:
+                self._loop.add_signal_handler(self.sig, stack[-1]._handler)
+        else:
+            del _captured[self._loop][self.sig]
+            self._loop.remove_signal_handler(self.sig)
+            if original_handler is not None:
+                signal.signal(self.sig, original_handler)
+        return True
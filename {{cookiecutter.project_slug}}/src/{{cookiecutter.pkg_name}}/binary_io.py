@@ -0,0 +1,205 @@
+"""Binary I/O for streams of records without a per record decode, copy or allocation.
+
+* **read_records** reads a stream into a reused bytearray with readinto and yields a memoryview of each record.
+* **mapped_records** memory maps a file and yields a memoryview of each record.
+* **passthrough** copies a stream to another in the kernel (os.splice for pipes, os.copy_file_range between files,
+  os.sendfile from a file), falling back to readinto and write through a reused buffer.
+* **binary_stdin** and **binary_stdout** are unbuffered and large buffered binary stdio.
+
+Usage::
+
+    with binary_stdout() as out_file:
+        for record in read_records(binary_stdin()):
+            if record[:1] != b"#":
+                out_file.write(record)
+
+The memoryviews are only valid until the next record is read (the buffer is reused), so convert a record to bytes
+(bytes(record)) to keep it.
+"""
+import os
+import sys
+from stat import S_ISFIFO, S_ISREG
+from typing import IO, Any, Iterator, Optional, Union
+
+__docformat__ = 'restructuredtext en'
+
+# the default size of the read buffer, and the largest chunk copied by a kernel call
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+
+def binary_stdin() -> IO[bytes]:
+    """An unbuffered binary stdin (so readinto reads straight into the caller's buffer)."""
+    return open(sys.stdin.fileno(), mode="rb", buffering=0, closefd=False)
+
+
+def binary_stdout(buffer_size: int = DEFAULT_BUFFER_SIZE) -> IO[bytes]:
+    """A binary stdout with a large buffer, so writes are batched into few system calls.
+
+    :param buffer_size: the size of the write buffer
+    """
+    sys.stdout.flush()
+    return open(sys.stdout.fileno(), mode="wb", buffering=buffer_size, closefd=False)
+
+
+def read_records(
+    stream: Union[int, Any], delimiter: bytes = b"\n", buffer_size: int = DEFAULT_BUFFER_SIZE
+) -> Iterator[memoryview]:
+    """Read the delimited records of a stream into a reused buffer.
+
+    The buffer grows when a record does not fit in it.
+
+    :param stream: a file descriptor or a binary file object with readinto (best unbuffered)
+    :param delimiter: the end of a record, included in the records (the last record may not have one)
+    :param buffer_size: the initial size of the buffer
+    :return: a memoryview of each record, valid until the next record is read
+    """
+    if isinstance(stream, int):
+        stream = open(stream, mode="rb", buffering=0, closefd=False)
+    buffer = bytearray(max(buffer_size, len(delimiter) + 1))
+    view = memoryview(buffer)
+    start = end = 0
+    while True:
+        position = buffer.find(delimiter, start, end)
+        while position >= 0:
+            record_end = position + len(delimiter)
+            yield view[start:record_end]
+            start = record_end
+            position = buffer.find(delimiter, start, end)
+
+        # keep the partial record at the start of the buffer
+        remaining = end - start
+        if remaining == len(buffer):
+            # the record does not fit, a new buffer as the records handed out may still be using the old one
+            buffer = bytearray(len(buffer) * 2)
+            buffer[:remaining] = view[start:end]
+            view = memoryview(buffer)
+        elif start > 0:
+            # (a copy of the partial record, as the source and destination overlap)
+            buffer[:remaining] = buffer[start:end]
+        start, end = 0, remaining
+
+        size = stream.readinto(view[end:])
+        if not size:
+            if end > start:
+                yield view[start:end]
+            return
+        end += size
+
+
+def mapped_records(file_name: str, delimiter: bytes = b"\n") -> Iterator[memoryview]:
+    """Memory map a file and yield its delimited records.
+
+    The map is closed when the records are exhausted (or the generator is closed) and no record is still referenced.
+
+    :param file_name: the file to read
+    :param delimiter: the end of a record, included in the records (the last record may not have one)
+    :return: a memoryview of each record
+    """
+    import mmap
+
+    with open(file_name, mode="rb") as in_file:
+        size = os.fstat(in_file.fileno()).st_size
+        if size == 0:
+            return
+        mapped = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mapped, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+        mapped.madvise(mmap.MADV_SEQUENTIAL)
+    view = memoryview(mapped)
+    try:
+        start = 0
+        while start < size:
+            position = mapped.find(delimiter, start)
+            end = size if position < 0 else position + len(delimiter)
+            yield view[start:end]
+            start = end
+    finally:
+        try:
+            view.release()
+            mapped.close()
+        except BufferError:
+            # a record is still referenced, the map is closed when it is garbage collected
+            pass
+
+
+def passthrough(
+    in_file: Union[int, IO],
+    out_file: Union[int, IO],
+    count: Optional[int] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+) -> int:
+    """Copy from the current position of the input to the output, in the kernel where possible.
+
+    os.splice is used when either end is a pipe, os.copy_file_range between regular files and os.sendfile from a
+    regular file.  Otherwise (or when the kernel refuses) the data is copied with readinto and write through a reused
+    buffer.  File objects must not have read ahead data in their buffers, output file objects are flushed first.
+
+    :param in_file: the input file descriptor or binary file object
+    :param out_file: the output file descriptor or binary file object
+    :param count: the number of bytes to copy (default: to the end of the input)
+    :param buffer_size: the largest chunk copied at a time
+    :return: the number of bytes copied
+    """
+    if not isinstance(out_file, int):
+        out_file.flush()
+    in_fd = in_file if isinstance(in_file, int) else in_file.fileno()
+    out_fd = out_file if isinstance(out_file, int) else out_file.fileno()
+    in_mode = os.fstat(in_fd).st_mode
+    out_mode = os.fstat(out_fd).st_mode
+
+    copied = 0
+    if hasattr(os, "splice") and (S_ISFIFO(in_mode) or S_ISFIFO(out_mode)):
+        # noinspection PyUnresolvedReferences
+        copied = _kernel_copy(lambda size: os.splice(in_fd, out_fd, size), count, buffer_size)  # type: ignore
+    elif hasattr(os, "copy_file_range") and S_ISREG(in_mode) and S_ISREG(out_mode):
+        # noinspection PyUnresolvedReferences
+        copied = _kernel_copy(lambda size: os.copy_file_range(in_fd, out_fd, size), count, buffer_size)
+    elif hasattr(os, "sendfile") and S_ISREG(in_mode) and sys.platform.startswith("linux"):
+        # (on linux the output can be any file, and no offset means the input's position)
+        copied = _kernel_copy(lambda size: os.sendfile(out_fd, in_fd, None, size), count, buffer_size)  # type: ignore
+    if count is not None and copied >= count:
+        return copied
+    return copied + _buffered_copy(in_fd, out_fd, None if count is None else count - copied, buffer_size)
+
+
+def _kernel_copy(copy: Any, count: Optional[int], buffer_size: int) -> int:
+    """Copy with the kernel call until the end of the input or count bytes.
+
+    :param copy: the kernel call, given the most bytes to copy and returning the number copied (0 at the end)
+    :return: the number of bytes copied, fewer than count (or not at the end of the input) if the kernel refused
+    """
+    copied = 0
+    try:
+        while count is None or copied < count:
+            size = copy(buffer_size if count is None else min(buffer_size, count - copied))
+            if size == 0:
+                break
+            copied += size
+    except OSError as ex:
+        import errno
+
+        unsupported = {errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.EBADF}
+        unsupported.update(getattr(errno, name) for name in ["ENOTSUP", "EOPNOTSUPP"] if hasattr(errno, name))
+        if ex.errno not in unsupported:
+            raise
+        # not supported for these files, the rest is copied through a buffer
+    return copied
+
+
+def _buffered_copy(in_fd: int, out_fd: int, count: Optional[int], buffer_size: int) -> int:
+    """Copy with readinto and write through a reused buffer.
+
+    :return: the number of bytes copied
+    """
+    buffer = bytearray(buffer_size if count is None else max(min(buffer_size, count), 1))
+    view = memoryview(buffer)
+    copied = 0
+    with open(in_fd, mode="rb", buffering=0, closefd=False) as in_stream:
+        while count is None or copied < count:
+            size = in_stream.readinto(view if count is None else view[: min(len(view), count - copied)])
+            if not size:
+                break
+            written = 0
+            while written < size:
+                written += os.write(out_fd, view[written:size])
+            copied += size
+    return copied
@@ -1,8 +1,10 @@
 """Console script for {{cookiecutter.pkg_name}}."""
 
 {% if cookiecutter.command_line_interface|lower == 'saf' -%}
+import argparse
+from typing import Any, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+
 from {{ cookiecutter.pkg_name }}.settings import Settings
-from logzero import logger
 
 
 class ArgumentError(RuntimeError):
@@ -11,33 +13,224 @@ class ArgumentError(RuntimeError):
     pass
 
 
+class BatchResult(NamedTuple):
+    """The outcome of running one argument set of a batch."""
+
+    number: int
+    argv: List[str]
+    results: Any
+    error: Optional[str]
+
+
 class CLI(object):
     """Command Line Interface for the App."""
 
+    # the report writer ({package}.report_writer.ReportWriter) while executing
+    writer: Optional[Any] = None
+
     def execute(self, app):
         """Handle the command line arguments then execute the app.
 
+        With --batch FILE, the app is executed for each argument set in the file instead (see execute_batch).
+
+        The app's results are reported as they are produced (see report), so it may return a generator.  The app may
+        also return a pipeline ({package}.pipeline.Pipeline), which is run with its output batches reported when it
+        has no sink.
+
         :param app: the application instance
         :type app: {package}.App
         """
         with Settings() as settings:
             try:
-                results = app.execute(settings)
-                if results is not None:
-                    self.report(results)
+                from {{ cookiecutter.pkg_name }}.report_writer import ReportWriter
+
+                self.writer = ReportWriter.from_settings(settings).open()
+                try:
+                    if settings.batch:
+                        exit(self.execute_batch(app, settings))
+                    results = app.execute(settings)
+                    if results is not None:
+                        from {{ cookiecutter.pkg_name }}.pipeline import Pipeline
+
+                        if isinstance(results, Pipeline):
+                            results.run(default_sink=self.report)
+                        else:
+                            self.report(results)
+                finally:
+                    self.writer.close()
+                    self.writer = None
                 exit(0)
             except ArgumentError as ex:
+                from logzero import logger
+
                 logger.error(str(ex))
                 exit(1)
 
-    # noinspection PyMethodMayBeStatic
+    def execute_batch(self, app, settings: argparse.Namespace) -> int:
+        """Execute the app for each argument set in the --batch file, in this process.
+
+        Each argument set is parsed with Settings then executed, on a pool of --batch-jobs threads or processes
+        (--batch-executor).  The results are reported in the order of the argument sets, or as they complete with
+        --batch-unordered.  A job's error (an ArgumentError or any other exception) is logged and does not stop the
+        other jobs.
+
+        :param app: the application instance (must be picklable for the process executor)
+        :type app: {package}.App
+        :param settings: the batch's settings
+        :return: the exit code, 0 if every job succeeded else 1
+        """
+        import sys
+        from contextlib import ExitStack
+
+        from logzero import logger
+
+        failed = False
+        with ExitStack() as stack:
+            if settings.batch == "-":
+                in_file = sys.stdin
+            else:
+                in_file = stack.enter_context(open(settings.batch, mode="r", encoding="utf-8"))
+            for result in self._run_batch(app, in_file, settings):
+                failed = self._report_batch_result(result, logger) or failed
+        return 1 if failed else 0
+
+    def _run_batch(self, app, lines: TextIO, settings: argparse.Namespace) -> Iterator[BatchResult]:
+        """Run the app for each argument set.
+
+        :return: the job results, in job order unless settings.batch_unordered
+        """
+        # one Settings, reusing its parsers, parses all the argument sets
+        batch_settings = Settings()
+        argument_sets = enumerate(read_argument_sets(lines), 1)
+        jobs = (_parse_batch_job(batch_settings, number, argv) for number, argv in argument_sets)
+        if settings.batch_jobs <= 1:
+            for job in jobs:
+                yield _run_batch_job(app, job)
+            return
+
+        from collections import deque
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        executor_class = ProcessPoolExecutor if settings.batch_executor == "process" else ThreadPoolExecutor
+        # like TaskRunner, a bounded number of jobs in flight with the next submitted as each completes, so the
+        # argument sets are read and parsed as the jobs run rather than all up front
+        max_in_flight = settings.batch_jobs * 2
+        with executor_class(max_workers=settings.batch_jobs) as executor:
+            in_flight: deque = deque()
+            for job in jobs:
+                in_flight.append(executor.submit(_run_batch_job, app, job))
+                while len(in_flight) >= max_in_flight:
+                    yield from _finished_batch_results(in_flight, settings.batch_unordered)
+            while in_flight:
+                yield from _finished_batch_results(in_flight, settings.batch_unordered)
+
+    def _report_batch_result(self, result: BatchResult, logger) -> bool:
+        """Report the result of a batch job.
+
+        :return: True if the job failed
+        """
+        if result.error is not None:
+            message = "Batch job {number} {argv}: {error}"
+            logger.error(message.format(number=result.number, argv=result.argv, error=result.error))
+            return True
+        if result.results is not None:
+            self.report(result.results)
+        return False
+
     def report(self, results):
-        """Generate the report.
+        """Write the results to the report (--output, --output-format), one at a time as they are produced.
 
-        :param results: (success[], error[], missing_filters_for_rule_ids[])
-        :type results: tuple
+        :param results: a list or an iterator of results (a pipeline's batch, a generator, ...), anything else
+            (including a tuple) is a single result
         """
-        # TODO: implement result report
-        logger.info(f"Results: {repr(results)}")
+        if self.writer is not None:
+            self.writer.write_all(results)
+            return
+        from {{ cookiecutter.pkg_name }}.report_writer import ReportWriter
+
+        with ReportWriter() as writer:
+            writer.write_all(results)
+
+
+def read_argument_sets(lines: Iterable[str]) -> Iterator[List[str]]:
+    """Read the argument sets of a batch, one per line.
+
+    A line is either a JSON list of arguments or shell quoted arguments.  Blank lines and lines starting with "#" are
+    skipped.
+
+    :param lines: the lines of the batch file
+    :return: the argument sets
+    """
+    import json
+    import shlex
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("["):
+            yield [str(arg) for arg in json.loads(line)]
+        else:
+            yield shlex.split(line)
+
+
+class _BatchJob(NamedTuple):
+    """An argument set parsed into settings, or the error parsing it."""
+
+    number: int
+    argv: List[str]
+    settings: Optional[argparse.Namespace]
+    error: Optional[str]
+
+
+def _parse_batch_job(batch_settings: Settings, number: int, argv: List[str]) -> _BatchJob:
+    """Parse and validate an argument set of a batch."""
+    try:
+        settings = next(batch_settings.parse_many([argv]))
+    except SystemExit as ex:
+        # argparse has already shown the usage and the error
+        return _BatchJob(number, argv, None, "invalid arguments (exit code {code})".format(code=ex.code))
+    # noinspection PyProtectedMember
+    error_message = batch_settings._cli_validate(settings, settings.remaining_argv)
+    if error_message is not None:
+        return _BatchJob(number, argv, None, error_message)
+    return _BatchJob(number, argv, settings, None)
+
+
+def _run_batch_job(app, job: _BatchJob) -> BatchResult:
+    """Execute the app for a batch job, capturing its error."""
+    if job.error is not None:
+        return BatchResult(job.number, job.argv, None, job.error)
+    from {{ cookiecutter.pkg_name }}.pipeline import Pipeline
+
+    try:
+        results = app.execute(job.settings)
+        if isinstance(results, Pipeline):
+            # run in the job, the results are the number of records out of the pipeline
+            results = results.run()
+        elif isinstance(results, Iterator):
+            # produce the results in the job (a generator can not be returned from a worker process)
+            results = list(results)
+        return BatchResult(job.number, job.argv, results, None)
+    except ArgumentError as ex:
+        return BatchResult(job.number, job.argv, None, str(ex))
+    except Exception as ex:
+        return BatchResult(job.number, job.argv, None, "{name}: {error}".format(name=type(ex).__name__, error=ex))
+
+
+def _finished_batch_results(in_flight: Any, unordered: bool) -> Iterator[BatchResult]:
+    """Wait for the next job (in job order, or the first to complete when unordered) and yield its result.
+
+    :param in_flight: a deque of the futures of the submitted jobs, in job order, the finished ones are removed
+    """
+    if not unordered:
+        yield in_flight.popleft().result()
+        return
+    from concurrent.futures import FIRST_COMPLETED, wait
+
+    done, not_done = wait(in_flight, return_when=FIRST_COMPLETED)
+    for future in done:
+        in_flight.remove(future)
+        yield future.result()
 
 {%- endif %}
@@ -0,0 +1,434 @@
+{% if cookiecutter.command_line_interface|lower == 'saf' -%}
+"""Resident server mode that keeps the interpreter, App and Settings warm between command line calls.
+
+Most of a short command line call is spent starting the interpreter and importing modules.  The daemon pays
+that once: it preloads the application then listens on a Unix domain socket.  For each call a thin client sends
+its arguments, environment and working directory, and passes its stdin, stdout and stderr file descriptors.
+The daemon forks a child (so each call still gets its own process state) that runs **CLI.execute** on those
+descriptors and returns the exit code, which the client exits with.
+
+Start the daemon::
+
+    python -m {{ cookiecutter.pkg_name }}.daemon --workers 4 --idle-timeout 600
+
+Then opt in by pointing the command line at its socket::
+
+    export {{ cookiecutter.pkg_name|upper }}_DAEMON_SOCKET=$(python -m {{ cookiecutter.pkg_name }}.daemon --show-socket)
+    {{ cookiecutter.project_slug }} --help
+
+When the daemon is not running, the command line runs in process as usual.  Only available where there are
+Unix domain sockets, fork and SO_PEERCRED (Linux).
+
+As the client passes its environment and stdio to the daemon, both ends check with SO_PEERCRED that the other end is
+run by the same user, and the default socket is in a directory only accessible by the user.
+"""
+import json
+import os
+import socket
+import struct
+import sys
+from stat import S_ISDIR
+from typing import List, Optional, Set
+
+__docformat__ = 'restructuredtext en'
+
+# the environment variable with the daemon's socket path that opts the command line in to using the daemon
+DAEMON_SOCKET_ENV = "{{ cookiecutter.pkg_name|upper }}_DAEMON_SOCKET"
+
+# the default maximum number of calls handled at the same time
+DEFAULT_WORKERS = 4
+
+# the default number of seconds without a call before the daemon exits
+DEFAULT_IDLE_TIMEOUT = 600.0
+
+# the number of stdio file descriptors passed with each call: stdin, stdout, stderr
+STDIO_FDS = 3
+
+_INT = struct.Struct("!i")
+
+# the pid, uid and gid of SO_PEERCRED
+_PEER_CREDENTIALS = struct.Struct("3i")
+
+# the modules imported by the daemon before it serves, so the children inherit them rather than importing them on
+# each call: the application and the modules it imports lazily on its code paths
+PRELOAD_MODULES = [
+    "{{ cookiecutter.pkg_name }}.app",
+    "{{ cookiecutter.pkg_name }}.cli",
+    "{{ cookiecutter.pkg_name }}.terminalsize",
+    "{{ cookiecutter.pkg_name }}.report_writer",
+    "{{ cookiecutter.pkg_name }}.task_runner",
+    "{{ cookiecutter.pkg_name }}.pool_interrupt_handler",
+    "{{ cookiecutter.pkg_name }}.safe_edit",
+    "{{ cookiecutter.pkg_name }}.pipeline",
+    "configparser",
+    "concurrent.futures",
+    "csv",
+    "gzip",
+    "shlex",
+    "tempfile",
+    "traceback",
+    "logzero",
+]
+
+
+def default_socket_path() -> str:
+    """The daemon's socket path, from DAEMON_SOCKET_ENV, else in the user's runtime directory, else in a directory
+    of the temp directory only accessible by the user (see _private_directory)."""
+    path = os.environ.get(DAEMON_SOCKET_ENV)
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "{{ cookiecutter.pkg_name }}.sock")
+    return os.path.join(_fallback_directory(), "daemon.sock")
+
+
+def _fallback_directory() -> str:
+    """The user's directory for the socket in the temp directory, when there is no runtime directory."""
+    import tempfile
+
+    return os.path.join(tempfile.gettempdir(), "{{ cookiecutter.pkg_name }}-{uid}".format(uid=os.getuid()))
+
+
+def _private_directory(directory: str) -> None:
+    """Create the directory only accessible by the user, unless it exists.
+
+    :raises OSError: if the directory is not a directory (or is a symbolic link), is owned by another user or is
+        accessible by other users
+    """
+    try:
+        os.mkdir(directory, 0o700)
+    except FileExistsError:
+        pass
+    directory_stat = os.lstat(directory)
+    if not S_ISDIR(directory_stat.st_mode) or directory_stat.st_uid != os.getuid() or directory_stat.st_mode & 0o077:
+        raise OSError("{directory} is not a directory only accessible by this user".format(directory=directory))
+
+
+def _socket_directory_is_safe(socket_path: str) -> bool:
+    """Is the socket's directory safe to use: not the fallback directory, or the fallback directory is private?"""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if directory != _fallback_directory():
+        return True
+    try:
+        _private_directory(directory)
+    except OSError:
+        return False
+    return True
+
+
+def _is_same_user(sock: socket.socket) -> bool:
+    """Is the other end of the connected socket run by this user?  False where SO_PEERCRED is not available."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return False
+    try:
+        credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, _PEER_CREDENTIALS.size)
+    except OSError:
+        return False
+    pid, uid, gid = _PEER_CREDENTIALS.unpack(credentials)
+    return uid == os.getuid()
+
+
+def run_client(argv: List[str], socket_path: Optional[str] = None) -> Optional[int]:
+    """Run a command line in the daemon.
+
+    The signals that would interrupt the call (SIGINT, SIGTERM, SIGHUP) are forwarded to the daemon's child.
+
+    :param argv: the command line arguments (without the program name)
+    :param socket_path: the daemon's socket (default: default_socket_path())
+    :return: the exit code, or None if the daemon is not available (so the caller should run the command itself)
+    """
+    if not hasattr(socket, "AF_UNIX"):
+        return None
+    socket_path = socket_path or default_socket_path()
+    if not _socket_directory_is_safe(socket_path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        sock.close()
+        return None
+    if not _is_same_user(sock):
+        # never pass the environment and stdio to another user's process
+        sock.close()
+        return None
+
+    with sock:
+        request = json.dumps(
+            {"argv": [sys.argv[0]] + list(argv), "env": dict(os.environ), "cwd": os.getcwd()}
+        ).encode("utf-8")
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+        # the process's stdin, stdout and stderr
+        fds = struct.pack("3i", 0, 1, 2)
+        sock.sendmsg([_INT.pack(len(request))], [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds)])
+        sock.sendall(request)
+
+        child_pid = _recv_int(sock)
+        if child_pid is None:
+            return 1
+        import signal
+
+        # noinspection PyUnusedLocal
+        def forward(signum: int, frame) -> None:
+            """Forward the signal to the daemon's child running the call."""
+            try:
+                os.kill(child_pid, signum)  # type: ignore
+            except OSError:
+                pass
+
+        signals = (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)
+        original_handlers = [signal.signal(sig, forward) for sig in signals]
+        try:
+            exit_code = _recv_int(sock)
+        finally:
+            for sig, handler in zip(signals, original_handlers):
+                signal.signal(sig, handler)
+        return 1 if exit_code is None else exit_code
+
+
+def serve(socket_path: Optional[str] = None, workers: int = DEFAULT_WORKERS,
+          idle_timeout: Optional[float] = DEFAULT_IDLE_TIMEOUT) -> None:
+    """Preload the application then handle calls on the socket until idle or interrupted (SIGINT or SIGTERM).
+
+    :param socket_path: the socket to listen on (default: default_socket_path())
+    :param workers: the maximum number of calls handled at the same time
+    :param idle_timeout: the seconds without a call before exiting, None or 0 to never exit when idle
+    """
+    import signal
+    import time
+
+    from {{ cookiecutter.pkg_name }}.graceful_interrupt_handler import GracefulInterruptHandler
+
+    _preload()
+    socket_path = socket_path or default_socket_path()
+    if os.path.dirname(os.path.abspath(socket_path)) == _fallback_directory():
+        _private_directory(_fallback_directory())
+    listener = _listen(socket_path)
+    children: Set[int] = set()
+    last_activity = time.monotonic()
+    try:
+        with GracefulInterruptHandler(signal.SIGINT) as interrupt, GracefulInterruptHandler(signal.SIGTERM) as term:
+            listener.settimeout(min(idle_timeout or 1.0, 1.0))
+            while not (interrupt.interrupted or term.interrupted):
+                children -= _reap(block=len(children) >= workers)
+                if children:
+                    last_activity = time.monotonic()
+                if len(children) >= workers:
+                    continue
+                try:
+                    connection, address = listener.accept()
+                except socket.timeout:
+                    if idle_timeout and time.monotonic() - last_activity >= idle_timeout:
+                        break
+                    continue
+                last_activity = time.monotonic()
+                if not _is_same_user(connection):
+                    connection.close()
+                    continue
+                pid = os.fork()
+                if pid == 0:
+                    listener.close()
+                    _child(connection)
+                connection.close()
+                children.add(pid)
+    finally:
+        listener.close()
+        try:
+            os.remove(socket_path)
+        except OSError:
+            pass
+        while children:
+            exited = _reap(block=True)
+            if not exited:
+                break
+            children -= exited
+
+
+def _preload() -> None:
+    """Import the PRELOAD_MODULES, so the children do not have to.
+
+    This module does not import the application itself, so that run_client stays a thin client.
+    """
+    import importlib
+
+    for name in PRELOAD_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _listen(socket_path: str) -> socket.socket:
+    """Listen on the socket, only accessible by the user, replacing a stale socket.
+
+    :raises OSError: if another daemon is listening on the socket
+    """
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(socket_path)
+        raise OSError("A daemon is already listening on {path}".format(path=socket_path))
+    except (FileNotFoundError, ConnectionRefusedError):
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+    finally:
+        probe.close()
+
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    old_umask = os.umask(0o177)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen(socket.SOMAXCONN)
+    return listener
+
+
+def _reap(block: bool) -> Set[int]:
+    """Wait for the children that have exited.
+
+    :param block: wait for at least one child to exit
+    :return: the pids of the exited children
+    """
+    exited = set()
+    options = 0 if block else os.WNOHANG
+    while True:
+        try:
+            pid, status = os.waitpid(-1, options)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            break
+        exited.add(pid)
+        options = os.WNOHANG
+    return exited
+
+
+def _child(connection: socket.socket) -> None:
+    """Handle a call in the forked child then exit (never returns).
+
+    The call runs with the client's stdio, arguments, environment and working directory, and its exit code is what
+    the interpreter would exit with: a SystemExit's code (None is 0, a message is printed and is 1), 1 for an
+    uncaught exception (with the traceback printed), 130 for a KeyboardInterrupt.
+    """
+    exit_code = 1
+    try:
+        import signal
+
+        # a new session without a controlling terminal, so using the client's terminal is not job controlled
+        os.setsid()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        request = _recv_request(connection)
+        connection.sendall(_INT.pack(os.getpid()))
+        try:
+            exit_code = _execute(request)
+        finally:
+            for stream in (sys.stdout, sys.stderr):
+                stream.flush()
+        connection.sendall(_INT.pack(exit_code))
+    finally:
+        os._exit(0)
+
+
+def _execute(request: dict) -> int:
+    """Run CLI.execute for the request.
+
+    :return: the exit code
+    """
+    import traceback
+
+    # (preloaded by the daemon)
+    from {{ cookiecutter.pkg_name }}.app import App
+    from {{ cookiecutter.pkg_name }}.cli import CLI
+    from {{ cookiecutter.pkg_name }}.terminalsize import refresh_terminal_size
+
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = request["argv"]
+    # the client's terminal and environment
+    refresh_terminal_size()
+    try:
+        CLI().execute(App())
+    except SystemExit as ex:
+        if ex.code is None:
+            return 0
+        if isinstance(ex.code, int):
+            return ex.code
+        print(ex.code, file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        traceback.print_exc()
+        return 130
+    except BaseException:
+        traceback.print_exc()
+        return 1
+    return 0
+
+
+def _recv_request(connection: socket.socket) -> dict:
+    """Receive the request and make the client's stdio file descriptors this process's stdio."""
+    import array
+
+    fds = array.array("i")
+    data, ancillary, flags, address = connection.recvmsg(_INT.size, socket.CMSG_SPACE(STDIO_FDS * fds.itemsize))
+    for level, kind, fd_data in ancillary:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(fd_data[: len(fd_data) - len(fd_data) % fds.itemsize])
+    if len(fds) != STDIO_FDS:
+        raise OSError("Expected the client's stdio file descriptors")
+    for target_fd, fd in enumerate(fds):
+        os.dup2(fd, target_fd)
+        os.close(fd)
+
+    data += _recv_exactly(connection, _INT.size - len(data))
+    (length,) = _INT.unpack(data)
+    return json.loads(_recv_exactly(connection, length).decode("utf-8"))
+
+
+def _recv_int(sock: socket.socket) -> Optional[int]:
+    """Receive an int, None if the connection closed first."""
+    data = _recv_exactly(sock, _INT.size)
+    if len(data) < _INT.size:
+        return None
+    return _INT.unpack(data)[0]
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Receive size bytes, fewer only if the connection closed first."""
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """The daemon's command line."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        "{{ cookiecutter.pkg_name }}.daemon", description="Serve {{ cookiecutter.project_name }} calls from a warm process."
+    )
+    parser.add_argument('--socket', metavar='PATH', default=None,
+                        help='The socket to listen on (default: {path}).'.format(path=default_socket_path()))
+    parser.add_argument('--workers', metavar='INT', type=int, default=DEFAULT_WORKERS,
+                        help='The maximum number of calls handled at the same time (default: %(default)s).')
+    parser.add_argument('--idle-timeout', metavar='SECONDS', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help='Exit after this many seconds without a call, 0 to never exit (default: %(default)s).')
+    parser.add_argument('--show-socket', action='store_true', help='Show the socket path then exit.')
+    settings = parser.parse_args(argv)
+    if settings.show_socket:
+        print(settings.socket or default_socket_path())
+        return
+    serve(settings.socket, workers=max(settings.workers, 1), idle_timeout=settings.idle_timeout)
+
+
+if __name__ == '__main__':
+    main()
+{%- endif %}
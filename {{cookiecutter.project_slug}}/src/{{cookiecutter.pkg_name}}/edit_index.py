@@ -0,0 +1,186 @@
+"""Incrementally apply the same edit to a whole tree of files.
+
+An index file stored in the root of the tree records the size, mtime_ns and content hash of each file along with
+the fingerprint of the edit (the EditPlan and the options that change its output) that was last applied to it.  When
+the same edit is run again, only the files whose stat data or edit changed are opened.
+
+Usage::
+
+    results = quick_edit_tree('path/to/tree', {'foo': ['bar']}, jobs=8)
+"""
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+from {{ cookiecutter.pkg_name }}.safe_edit import DEFAULT_BUFFER_SIZE, EditPlan, EditResult, quick_edit_many, safe_edit
+
+# the name of the index file in the root of the tree
+INDEX_FILE_NAME: str = ".edit_index.json"
+
+# directories that are not walked
+DEFAULT_SKIP_DIRS = frozenset([".git", ".hg", ".svn", ".tox", ".mypy_cache", ".pytest_cache", "__pycache__"])
+
+
+def walk_files(root: str, skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS) -> Iterator[os.DirEntry]:
+    """Walk the tree using os.scandir, yielding an entry for each regular file.
+
+    Symbolic links, safe_edit backup files ("name~") and the index file are not yielded.
+
+    :param root: the root directory of the tree
+    :param skip_dirs: names of directories that are not walked
+    """
+    skip_dirs = frozenset(skip_dirs)
+    directories = [root]
+    while directories:
+        with os.scandir(directories.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in skip_dirs:
+                        directories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    if not entry.name.endswith("~") and entry.name != INDEX_FILE_NAME:
+                        yield entry
+
+
+def file_digest(file_name: str, buffer_size: int = DEFAULT_BUFFER_SIZE) -> str:
+    """Get the sha256 hex digest of the file's content.
+
+    :param file_name: the file to hash
+    :param buffer_size: size in bytes of the chunks that are read
+    """
+    digest = hashlib.sha256()
+    with open(file_name, mode="rb") as in_file:
+        for chunk in iter(lambda: in_file.read(buffer_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def edit_fingerprint(plan: EditPlan, whole_buffer: bool = False) -> str:
+    """A digest of the edit: the plan's fingerprint and the quick_edit options that change the edited output.
+
+    :param plan: the edit plan
+    :param whole_buffer: the files are edited as a whole instead of line by line
+    """
+    text = json.dumps([plan.fingerprint, {"whole_buffer": whole_buffer}])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EditIndex(object):
+    """The persistent index of a tree's files.
+
+    Each record is [size, mtime_ns, sha256 hex digest, edit fingerprint] keyed by the path relative to the root.
+    """
+
+    VERSION: int = 1
+
+    def __init__(self, root: str, index_file: Optional[str] = None) -> None:
+        """Initialize.
+
+        :param root: the root directory of the tree
+        :param index_file: the index file (default: INDEX_FILE_NAME in the root directory)
+        """
+        self.root = root
+        self.index_file = index_file or os.path.join(root, INDEX_FILE_NAME)
+        self.records: Dict[str, List] = {}
+
+    def load(self) -> "EditIndex":
+        """Load the index file, an index that is missing, unreadable or from another version is empty."""
+        self.records = {}
+        # noinspection PyBroadException
+        try:
+            with open(self.index_file, mode="r", encoding="utf-8") as in_file:
+                data = json.load(in_file)
+            if data.get("version") == self.VERSION:
+                self.records = data["files"]
+        except Exception:
+            pass
+        return self
+
+    def save(self) -> None:
+        """Atomically write the index file using safe_edit."""
+        files: List
+        with safe_edit(self.index_file, create=True) as files:
+            # hitting mypy bug: https://github.com/python/mypy/issues/8829
+            out_file = files[1]  # type: ignore
+            json.dump({"version": self.VERSION, "files": self.records}, out_file, separators=(",", ":"))
+
+    def is_current(self, entry: os.DirEntry, fingerprint: str) -> bool:
+        """Is the file's record current for the given plan without opening the file?"""
+        record = self.records.get(self.key(entry.path))
+        if record is None or record[3] != fingerprint:
+            return False
+        stat = entry.stat(follow_symlinks=False)
+        return record[0] == stat.st_size and record[1] == stat.st_mtime_ns
+
+    def is_unchanged(self, entry: os.DirEntry, fingerprint: str) -> bool:
+        """Has the plan already been applied to the file's current content (for example, the file was touched)?
+
+        When the content is unchanged, the record's stat data is refreshed.
+        """
+        record = self.records.get(self.key(entry.path))
+        if record is None or record[3] != fingerprint:
+            return False
+        if file_digest(entry.path) != record[2]:
+            return False
+        self.update(entry.path, fingerprint, record[2])
+        return True
+
+    def update(self, file_name: str, fingerprint: str, digest: Optional[str] = None) -> None:
+        """Record the file's current stat data and content hash for the plan."""
+        stat = os.stat(file_name)
+        self.records[self.key(file_name)] = [
+            stat.st_size,
+            stat.st_mtime_ns,
+            digest or file_digest(file_name),
+            fingerprint,
+        ]
+
+    def prune(self, keys: Iterable[str]) -> None:
+        """Only keep the records for the given keys (remove the records for files that no longer exist)."""
+        keys = set(keys)
+        self.records = {key: record for key, record in self.records.items() if key in keys}
+
+    def key(self, file_name: str) -> str:
+        """The file's key in the index, its path relative to the root."""
+        return os.path.relpath(file_name, self.root)
+
+
+def quick_edit_tree(
+    root: str,
+    regex_replacement_dict: Union[Dict[str, List[str]], EditPlan],
+    jobs: Optional[int] = None,
+    index_file: Optional[str] = None,
+    skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS,
+    whole_buffer: bool = False,
+) -> List[EditResult]:
+    """Apply quick_edit to every file in the tree whose stat data or edit plan changed since the last run.
+
+    :param root: the root directory of the tree
+    :param regex_replacement_dict: the replacements or a compiled EditPlan
+    :param jobs: the number of worker processes used by quick_edit_many
+    :param index_file: the index file (default: INDEX_FILE_NAME in the root directory)
+    :param skip_dirs: names of directories that are not walked
+    :param whole_buffer: edit the memory mapped files as a whole instead of line by line
+    :return: the results for the files that were edited
+    """
+    plan = regex_replacement_dict if isinstance(regex_replacement_dict, EditPlan) else EditPlan(regex_replacement_dict)
+    fingerprint = edit_fingerprint(plan, whole_buffer)
+    index = EditIndex(root, index_file).load()
+
+    keys = []
+    stale = []
+    for entry in walk_files(root, skip_dirs):
+        if os.path.abspath(entry.path) == os.path.abspath(index.index_file):
+            continue
+        keys.append(index.key(entry.path))
+        if not index.is_current(entry, fingerprint) and not index.is_unchanged(entry, fingerprint):
+            stale.append(entry.path)
+    index.prune(keys)
+
+    results = quick_edit_many(stale, plan, jobs=jobs, whole_buffer=whole_buffer)
+    for result in results:
+        if result.error is None:
+            index.update(result.file_name, fingerprint)
+    index.save()
+    return results
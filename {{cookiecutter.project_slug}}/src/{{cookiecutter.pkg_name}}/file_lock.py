@@ -0,0 +1,189 @@
+"""Advisory file locking using a sidecar lock file.
+
+The lock is taken on "file_name.lock" rather than on the file itself because safe_edit replaces the file, which
+would leave a lock on the original file protecting nothing.  Locks are advisory: they only coordinate processes
+(and threads) that also use FileLock.  On platforms without fcntl the lock is a no-op.
+
+Usage::
+
+    with FileLock(file_name, timeout=5.0) as lock:
+        # edit file_name
+        pass
+    logger.debug("waited %.3fs, held %.3fs", lock.wait_time, lock.hold_time)
+
+    # contention across all locks
+    logger.info(LOCK_METRICS.snapshot())
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    # noinspection PyCompatibility
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+
+class LockTimeoutError(TimeoutError):
+    """The lock could not be acquired before the timeout."""
+
+    pass
+
+
+class LockMetrics(object):
+    """Thread safe totals of the time spent waiting for and holding locks."""
+
+    def __init__(self) -> None:
+        """Initialize."""
+        self._mutex = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Zero the metrics."""
+        with self._mutex:
+            self.acquisitions = 0
+            self.timeouts = 0
+            self.total_wait_time = 0.0
+            self.max_wait_time = 0.0
+            self.total_hold_time = 0.0
+            self.max_hold_time = 0.0
+
+    def record_wait(self, wait_time: float, acquired: bool) -> None:
+        """Record the time spent waiting for a lock.
+
+        :param wait_time: seconds spent waiting
+        :param acquired: was the lock acquired (else timed out)
+        """
+        with self._mutex:
+            if acquired:
+                self.acquisitions += 1
+            else:
+                self.timeouts += 1
+            self.total_wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+
+    def record_hold(self, hold_time: float) -> None:
+        """Record the time a lock was held.
+
+        :param hold_time: seconds the lock was held
+        """
+        with self._mutex:
+            self.total_hold_time += hold_time
+            self.max_hold_time = max(self.max_hold_time, hold_time)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Get a copy of the metrics."""
+        with self._mutex:
+            return {
+                "acquisitions": self.acquisitions,
+                "timeouts": self.timeouts,
+                "total_wait_time": self.total_wait_time,
+                "max_wait_time": self.max_wait_time,
+                "total_hold_time": self.total_hold_time,
+                "max_hold_time": self.max_hold_time,
+            }
+
+
+# the metrics of every FileLock that does not use its own metrics
+LOCK_METRICS = LockMetrics()
+
+
+class FileLock(object):
+    """An advisory shared or exclusive lock on a file, as a context manager."""
+
+    def __init__(
+        self,
+        file_name: str,
+        shared: bool = False,
+        timeout: Optional[float] = None,
+        poll_interval: float = 0.01,
+        metrics: Optional[LockMetrics] = None,
+    ) -> None:
+        """Initialize.
+
+        :param file_name: the file to lock, the lock is taken on file_name + ".lock"
+        :param shared: take a shared (reader) lock instead of an exclusive (writer) lock
+        :param timeout: seconds to wait for the lock, None waits forever, 0 tries once
+        :param poll_interval: seconds between attempts while waiting with a timeout
+        :param metrics: where the wait and hold times are recorded (default: LOCK_METRICS)
+        """
+        self.lock_name = file_name + ".lock"
+        self.shared = shared
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.metrics = metrics or LOCK_METRICS
+        self.wait_time = 0.0
+        self.hold_time = 0.0
+        self._fd: Optional[int] = None
+        self._acquired_at = 0.0
+
+    def __enter__(self) -> FileLock:
+        """Enter context manager."""
+        return self.acquire()
+
+    # noinspection PyUnusedLocal,PyShadowingBuiltins
+    def __exit__(self, type, value, tb):
+        """Exit context manager."""
+        self.release()
+
+    def acquire(self) -> FileLock:
+        """Acquire the lock.
+
+        :raises: LockTimeoutError if the lock is not acquired within the timeout
+        """
+        start = time.monotonic()
+        fd = os.open(self.lock_name, os.O_RDWR | os.O_CREAT, 0o666)
+        acquired = False
+        try:
+            acquired = self._lock(fd, start)
+        finally:
+            self.wait_time = time.monotonic() - start
+            self.metrics.record_wait(self.wait_time, acquired)
+            if not acquired:
+                os.close(fd)
+        if not acquired:
+            raise LockTimeoutError(
+                "Timed out after {timeout}s waiting to lock {name}".format(timeout=self.timeout, name=self.lock_name)
+            )
+        self._fd = fd
+        self._acquired_at = time.monotonic()
+        return self
+
+    def release(self) -> bool:
+        """Release the lock.
+
+        :return: False if the lock was not held
+        """
+        if self._fd is None:
+            return False
+        self.hold_time = time.monotonic() - self._acquired_at
+        self.metrics.record_hold(self.hold_time)
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+        return True
+
+    def _lock(self, fd: int, start: float) -> bool:
+        """Try to lock the open lock file until the timeout expires."""
+        if fcntl is None:
+            return True
+        operation = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+        if self.timeout is None:
+            fcntl.flock(fd, operation)
+            return True
+        while True:
+            try:
+                fcntl.flock(fd, operation | fcntl.LOCK_NB)
+                return True
+            except (BlockingIOError, PermissionError):
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return False
+                time.sleep(min(self.poll_interval, remaining))
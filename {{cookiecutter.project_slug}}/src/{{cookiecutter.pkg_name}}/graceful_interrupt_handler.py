@@ -1,6 +1,7 @@
 r"""Graceful Interrupt Handler as a context manager.
 
-Can be nested.
+Can be nested.  Signal handlers can only be set in the main thread, so in other threads (for example an App run on
+a thread pool) the handler does nothing and is never interrupted.
 
 Example Usage::
 
@@ -21,6 +22,17 @@ Example Usage::
                 time.sleep(2)
                 break
 
+Blocking code can wait on the handler instead of polling **interrupted**: **sleep** and **wait_for_fds** return
+as soon as the signal arrives, and **fileno** is a selectable file descriptor that becomes readable when it does::
+
+    with GracefulInterruptHandler() as handler:
+        while not handler.interrupted:
+            readable, writable = handler.wait_for_fds([sock], timeout=60.0)
+            if readable:
+                handle(sock.recv(4096))
+
+See pool_interrupt_handler for thread and process pools, and async_interrupt_handler for asyncio event loops.
+
 From:
 
 * http://stackoverflow.com/a/10972804
@@ -29,17 +41,26 @@ From:
 from __future__ import annotations
 
 import signal
+import threading
+from typing import Any, Callable, List, Optional, Sequence, Tuple
 
 
 class GracefulInterruptHandler(object):
     """Provides a context to safely catch interrupts."""
 
-    def __init__(self, sig: int = signal.SIGINT):
-        """Initialize."""
+    def __init__(self, sig: int = signal.SIGINT, on_interrupt: Optional[Callable[[int], None]] = None):
+        """Initialize.
+
+        :param sig: the signal to capture
+        :param on_interrupt: called with the signal number when interrupted (in the main thread, from the handler)
+        """
         self.sig = sig
+        self.on_interrupt = on_interrupt
         self.interrupted = False
         self.released = False
         self.original_handler = None
+        self._wakeup: Optional[Tuple[Any, Any]] = None
+        self._wakeup_fd_set = False
 
     def __enter__(self):
         """Enter context manager."""
@@ -53,6 +74,10 @@ class GracefulInterruptHandler(object):
         self.interrupted = False
         self.released = False
 
+        if threading.current_thread() is not threading.main_thread():
+            self.released = True
+            return self
+
         self.original_handler = signal.getsignal(self.sig)  # type: ignore
 
         # noinspection PyUnusedLocal
@@ -64,6 +89,9 @@ class GracefulInterruptHandler(object):
             """
             self.release()
             self.interrupted = True
+            self._wake()
+            if self.on_interrupt is not None:
+                self.on_interrupt(signum)
 
         signal.signal(self.sig, handler)
 
@@ -73,6 +101,7 @@ class GracefulInterruptHandler(object):
     def __exit__(self, type, value, tb):
         """Exit context manager."""
         self.release()
+        self.close()
 
     def release(self) -> bool:
         """Release the signal handler."""
@@ -80,7 +109,102 @@ class GracefulInterruptHandler(object):
             return False
 
         signal.signal(self.sig, self.original_handler)
+        if self._wakeup_fd_set:
+            signal.set_wakeup_fd(-1)
+            self._wakeup_fd_set = False
 
         self.released = True
 
         return True
+
+    def fileno(self) -> int:
+        """A file descriptor, for select and friends, that becomes readable when a signal arrives.
+
+        Other signals may also make it readable, so check interrupted.
+        """
+        return self._wakeup_sockets()[0].fileno()
+
+    def sleep(self, seconds: float) -> bool:
+        """Sleep, waking as soon as interrupted.
+
+        :param seconds: the seconds to sleep
+        :return: True if interrupted
+        """
+        self.wait_for_fds([], timeout=seconds)
+        return self.interrupted
+
+    def wait_for_fds(
+        self, read_fds: Sequence[Any], write_fds: Sequence[Any] = (), timeout: Optional[float] = None
+    ) -> Tuple[List[Any], List[Any]]:
+        """Wait until a file descriptor is ready, waking as soon as interrupted.
+
+        :param read_fds: the file descriptors (or objects with a fileno method) to wait for being readable
+        :param write_fds: the file descriptors (or objects with a fileno method) to wait for being writable
+        :param timeout: the maximum seconds to wait, None to wait forever
+        :return: the readable and writable file descriptors, both empty if interrupted or timed out
+        """
+        import select
+        import time
+
+        wakeup = self._wakeup_sockets()[0]
+        end_time = None if timeout is None else time.monotonic() + timeout
+        while not self.interrupted:
+            remaining = None if end_time is None else max(end_time - time.monotonic(), 0.0)
+            readable, writable, exceptional = select.select(list(read_fds) + [wakeup], list(write_fds), [], remaining)
+            if wakeup in readable:
+                readable.remove(wakeup)
+                self._drain()
+            if readable or writable:
+                return readable, writable
+            if remaining is not None and remaining <= 0.0:
+                break
+        return [], []
+
+    def close(self) -> None:
+        """Close the wakeup file descriptor, if any."""
+        if self._wakeup is not None:
+            for sock in self._wakeup:
+                sock.close()
+            self._wakeup = None
+
+    def _wakeup_sockets(self) -> Tuple[Any, Any]:
+        """The (reader, writer) socket pair that wakes the waits, created when first needed.
+
+        When possible the writer is also the signal wakeup fd, so a wait in another thread is woken even while the
+        main thread is busy and has not run the signal handler yet.
+        """
+        if self._wakeup is None:
+            import socket
+
+            reader, writer = socket.socketpair()
+            reader.setblocking(False)
+            writer.setblocking(False)
+            self._wakeup = (reader, writer)
+            if not self.released and threading.current_thread() is threading.main_thread():
+                previous_fd = signal.set_wakeup_fd(writer.fileno())
+                if previous_fd == -1:
+                    self._wakeup_fd_set = True
+                else:
+                    # another wakeup fd (for example an asyncio event loop's) is kept
+                    signal.set_wakeup_fd(previous_fd)
+            # interrupted before there was a wakeup socket to write to
+            if self.interrupted:
+                self._wake()
+        return self._wakeup
+
+    def _wake(self) -> None:
+        """Make the wakeup file descriptor readable."""
+        if self._wakeup is not None:
+            try:
+                self._wakeup[1].send(b"\0")
+            except OSError:
+                pass
+
+    def _drain(self) -> None:
+        """Read the pending wakeups."""
+        if self._wakeup is not None:
+            try:
+                while self._wakeup[0].recv(4096):
+                    pass
+            except OSError:
+                pass
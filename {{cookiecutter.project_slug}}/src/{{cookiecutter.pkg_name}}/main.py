@@ -36,12 +36,23 @@ if __parent_dir in sys.path:
 sys.path.insert(0, __parent_dir)
 sys.path.insert(1, __this_dir)
 
-from {{ cookiecutter.pkg_name }}.app import App     # noqa: E402 Module level import not at top of file
-from {{ cookiecutter.pkg_name }}.cli import CLI     # noqa: E402 Module level import not at top of file
-
 
 def main():
-    """This is the console entry point."""
+    """This is the console entry point.
+
+    When {{ cookiecutter.pkg_name|upper }}_DAEMON_SOCKET is set, the command line is run by that daemon if it is
+    running (see {{ cookiecutter.pkg_name }}.daemon), so the application is only imported when it is not.
+    """
+    if os.environ.get("{{ cookiecutter.pkg_name|upper }}_DAEMON_SOCKET"):
+        from {{ cookiecutter.pkg_name }}.daemon import run_client
+
+        exit_code = run_client(sys.argv[1:])
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+    from {{ cookiecutter.pkg_name }}.app import App
+    from {{ cookiecutter.pkg_name }}.cli import CLI
+
     cli = CLI()
     cli.execute(App())
 
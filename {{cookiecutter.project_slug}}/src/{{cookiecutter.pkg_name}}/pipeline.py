@@ -0,0 +1,208 @@
+"""Streaming pipelines of generator stages: a source, transforms and a sink.
+
+The records flow through the stages in batches (lists of records), so each stage's function sees a list at a time,
+and a stage can run in its own thread with a bounded queue to the next stage, so a slow stage applies backpressure to
+the stages before it.  Only the batches in flight are in memory, however large the input.
+
+Example Usage::
+
+    def parse(lines):
+        return [json.loads(line) for line in lines]
+
+    def store(records):
+        database.insert_many(records)
+
+    pipeline = Pipeline(open('records.jsonl'), batch_size=1000)
+    pipeline.transform(parse, threaded=True).sink(store)
+    count = pipeline.run()
+
+App.execute may return a pipeline, which CLI runs (reporting its output batches when it has no sink).
+"""
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+__docformat__ = 'restructuredtext en'
+
+# the default number of records in a batch
+DEFAULT_BATCH_SIZE = 1000
+
+# the default number of batches queued between a threaded stage and the next stage
+DEFAULT_QUEUE_SIZE = 4
+
+# a stage is a generator function from the upstream batches to its batches
+Stage = Callable[[Iterator[List[Any]]], Iterator[List[Any]]]
+
+
+class Pipeline(object):
+    """A source of records, the stages that process them in batches and an optional sink."""
+
+    def __init__(
+        self,
+        source: Iterable[Any],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        threaded: bool = False,
+    ) -> None:
+        """Initialize.
+
+        :param source: the records, usually a generator or a file
+        :param batch_size: the number of records in the source's batches
+        :param queue_size: the number of batches queued after a threaded stage
+        :param threaded: read the source in its own thread
+        """
+        self.source = source
+        self.batch_size = max(batch_size, 1)
+        self.queue_size = max(queue_size, 1)
+        self._stages: List[Stage] = [self._threaded(self._source_stage) if threaded else self._source_stage]
+        self._sink: Optional[Callable[[List[Any]], Any]] = None
+
+    def stage(self, stage: Stage, threaded: bool = False) -> "Pipeline":
+        """Add a stage: a generator function from the upstream batches to its batches.
+
+        :param stage: the stage
+        :param threaded: run the stage in its own thread
+        :return: the pipeline, for chaining
+        """
+        if self._sink is not None:
+            raise ValueError("The pipeline already has a sink")
+        self._stages.append(self._threaded(stage) if threaded else stage)
+        return self
+
+    def transform(
+        self, function: Callable[[List[Any]], Iterable[Any]], batch_size: Optional[int] = None, threaded: bool = False
+    ) -> "Pipeline":
+        """Add a stage that calls the function with each batch, the records it returns are the stage's batch.
+
+        :param function: returns (or yields) the processed records of a batch, any number of them
+        :param batch_size: rebatch the function's records into batches of this size (default: a batch per call)
+        :param threaded: run the stage in its own thread
+        :return: the pipeline, for chaining
+        """
+
+        def transform_stage(batches: Iterator[List[Any]]) -> Iterator[List[Any]]:
+            """Call the function with each batch."""
+            for batch in batches:
+                records = function(batch)
+                if batch_size is None:
+                    records = list(records)
+                    if records:
+                        yield records
+                else:
+                    yield from batched(records, batch_size)
+
+        return self.stage(transform_stage, threaded=threaded)
+
+    def sink(self, function: Callable[[List[Any]], Any]) -> "Pipeline":
+        """Set the sink: the function called with each batch coming out of the stages.
+
+        :return: the pipeline, for chaining
+        """
+        self._sink = function
+        return self
+
+    def batches(self) -> Iterator[List[Any]]:
+        """Start the stages, the batches coming out of the last stage (ignoring the sink)."""
+        batches: Iterator[List[Any]] = iter(())
+        for stage in self._stages:
+            batches = stage(batches)
+        return batches
+
+    def __iter__(self) -> Iterator[Any]:
+        """The records coming out of the last stage (ignoring the sink)."""
+        for batch in self.batches():
+            yield from batch
+
+    def run(self, default_sink: Optional[Callable[[List[Any]], Any]] = None) -> int:
+        """Run the pipeline, passing the batches coming out of the last stage to the sink.
+
+        :param default_sink: the sink when the pipeline has none (default: drop the batches)
+        :return: the number of records that came out of the last stage
+        """
+        sink = self._sink or default_sink
+        count = 0
+        for batch in self.batches():
+            if sink is not None:
+                sink(batch)
+            count += len(batch)
+        return count
+
+    # noinspection PyUnusedLocal
+    def _source_stage(self, batches: Iterator[List[Any]]) -> Iterator[List[Any]]:
+        """The first stage, batching the source's records."""
+        return batched(self.source, self.batch_size)
+
+    def _threaded(self, stage: Stage) -> Stage:
+        """Make a stage that runs in its own thread, putting its batches in a bounded queue."""
+        queue_size = self.queue_size
+
+        def threaded_stage(batches: Iterator[List[Any]]) -> Iterator[List[Any]]:
+            """Get the batches from the queue filled by the stage's thread."""
+            batch_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+            stopped = threading.Event()
+            thread = threading.Thread(target=_produce, args=(stage(batches), batch_queue, stopped), daemon=True)
+            thread.start()
+            try:
+                while True:
+                    item = batch_queue.get()
+                    if item is _END:
+                        return
+                    if isinstance(item, _Error):
+                        raise item.exception
+                    yield item
+            finally:
+                stopped.set()
+
+        return threaded_stage
+
+
+def batched(records: Iterable[Any], batch_size: int) -> Iterator[List[Any]]:
+    """Group the records into lists of batch_size (the last one may be shorter)."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _Error(object):
+    """An exception raised in a stage's thread, passed to the next stage."""
+
+    def __init__(self, exception: BaseException) -> None:
+        """Initialize."""
+        self.exception = exception
+
+
+# the end of a threaded stage's batches
+_END = object()
+
+# the seconds between the checks that the next stage is still consuming while waiting for room in the queue
+_PUT_INTERVAL = 0.1
+
+
+def _produce(batches: Iterator[List[Any]], batch_queue: "queue.Queue[Any]", stopped: threading.Event) -> None:
+    """Put the stage's batches in the queue until they are exhausted or the next stage stops."""
+    try:
+        for batch in batches:
+            if not _put(batch_queue, batch, stopped):
+                return
+        _put(batch_queue, _END, stopped)
+    except BaseException as ex:
+        _put(batch_queue, _Error(ex), stopped)
+
+
+def _put(batch_queue: "queue.Queue[Any]", item: Any, stopped: threading.Event) -> bool:
+    """Put the item in the queue, waiting for room while the next stage is consuming.
+
+    :return: False if the next stage stopped
+    """
+    while not stopped.is_set():
+        try:
+            batch_queue.put(item, timeout=_PUT_INTERVAL)
+            return True
+        except queue.Full:
+            pass
+    return False
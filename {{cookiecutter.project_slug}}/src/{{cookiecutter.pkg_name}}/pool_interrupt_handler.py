@@ -0,0 +1,309 @@
+r"""Graceful interrupt handling for thread and process pools, as a context manager.
+
+A GracefulInterruptHandler per signal (SIGINT, SIGTERM and SIGHUP by default) cancels a shared CancellationToken that
+the pool's workers can check cheaply with **cancellation_requested()**.  Once cancelled no new work is submitted, and
+on exit the queued work is drained (or cancelled) within a deadline, with what was left undone reported.
+
+Example Usage::
+
+    def work(item):
+        for chunk in item.chunks():
+            if cancellation_requested():
+                return None
+            process(chunk)
+
+    with PoolInterruptHandler(ProcessPoolExecutor, deadline=10.0) as pool:
+        for item in items:
+            if pool.submit(work, item) is None:
+                break
+    if pool.report.unfinished:
+        print("interrupted before finishing:", pool.report.unfinished)
+
+A second signal is not captured, so it has its usual effect (for example a KeyboardInterrupt for SIGINT), which also
+cancels the queued work.
+
+The shutdown is bounded by the deadline: process workers still running after it are terminated, but threads can not
+be stopped, so thread pool work should check cancellation_requested().
+"""
+import signal
+import threading
+import time
+from concurrent.futures import (
+    ALL_COMPLETED,
+    FIRST_COMPLETED,
+    FIRST_EXCEPTION,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple, Type
+
+from {{ cookiecutter.pkg_name }}.graceful_interrupt_handler import GracefulInterruptHandler
+
+# the signals that cancel the pool's work
+DEFAULT_POOL_SIGNALS = tuple(
+    getattr(signal, name) for name in ["SIGINT", "SIGTERM", "SIGHUP"] if hasattr(signal, name)
+)
+
+# the default seconds allowed for the pool's shutdown after a cancellation
+DEFAULT_DEADLINE = 10.0
+
+
+class CancellationToken(object):
+    """A flag, shared with a pool's workers, that is set when their work should stop."""
+
+    def __init__(self, event: Optional[Any] = None) -> None:
+        """Initialize.
+
+        :param event: the threading.Event or multiprocessing Event that is the flag (default: a new threading.Event)
+        """
+        self._event = event if event is not None else threading.Event()
+        self.signum: Optional[int] = None
+
+    @property
+    def cancelled(self) -> bool:
+        """Has the work been cancelled?"""
+        return self._event.is_set()
+
+    def cancel(self, signum: Optional[int] = None) -> None:
+        """Cancel the work.
+
+        :param signum: the signal that caused the cancellation, if any
+        """
+        if self.signum is None:
+            self.signum = signum
+        self._event.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait until cancelled.
+
+        :param timeout: the maximum seconds to wait, None to wait forever
+        :return: True if cancelled
+        """
+        return self._event.wait(timeout)
+
+
+class Task(NamedTuple):
+    """Work submitted to the pool."""
+
+    fn: Callable
+    args: tuple
+    kwargs: Dict[str, Any]
+
+
+class PoolShutdownReport(NamedTuple):
+    """What the pool did and did not do."""
+
+    completed: int
+    # the tasks that were never started: queued when cancelled without draining, or submitted after cancellation
+    cancelled: List[Task]
+    # the tasks still running at the deadline
+    unfinished: List[Task]
+    # the signal that cancelled the work, if any
+    signum: Optional[int]
+
+
+# the token of the pool whose worker (thread or process) this is
+_worker = threading.local()
+
+
+def current_token() -> Optional[CancellationToken]:
+    """The cancellation token of the pool running the current task, None if not in a pool's worker."""
+    return getattr(_worker, "token", None)
+
+
+def cancellation_requested() -> bool:
+    """Has the pool running the current task been cancelled?"""
+    token = getattr(_worker, "token", None)
+    return token is not None and token.cancelled
+
+
+def _init_thread_worker(token: CancellationToken) -> None:
+    """Make the token available to the tasks run by the thread."""
+    _worker.token = token
+
+
+def _init_process_worker(event: Any, signals: Sequence[int]) -> None:
+    """Make the token available to the tasks run by the process, leaving the signals to the parent process."""
+    _worker.token = CancellationToken(event)
+    for sig in signals:
+        signal.signal(sig, signal.SIG_IGN)
+
+
+class PoolInterruptHandler(object):
+    """Provides a pool of threads or processes whose work is cancelled by signals."""
+
+    def __init__(
+        self,
+        executor_class: Type[Executor] = ThreadPoolExecutor,
+        max_workers: Optional[int] = None,
+        signals: Sequence[int] = DEFAULT_POOL_SIGNALS,
+        deadline: float = DEFAULT_DEADLINE,
+        drain: bool = False,
+    ):
+        """Initialize.
+
+        :param executor_class: ThreadPoolExecutor or ProcessPoolExecutor
+        :param max_workers: the number of workers (default: the executor's default)
+        :param signals: the signals that cancel the work
+        :param deadline: the seconds allowed for the shutdown once the work is cancelled
+        :param drain: on cancellation, let the queued tasks run (within the deadline) instead of cancelling them
+        """
+        self.executor_class = executor_class
+        self.max_workers = max_workers
+        self.signals = signals
+        self.deadline = deadline
+        self.drain = drain
+        self.token = CancellationToken()
+        self.executor: Optional[Executor] = None
+        self.report: Optional[PoolShutdownReport] = None
+        self._handlers: List[GracefulInterruptHandler] = []
+        # the tasks not done yet, a done task is only counted so that its future and result can be freed
+        self._tasks: Dict[Future, Task] = {}
+        self._completed = 0
+        self._cancelled: List[Task] = []
+        self._rejected: List[Task] = []
+        self._lock = threading.Lock()
+        self._interrupted: Future = Future()
+
+    def __enter__(self) -> "PoolInterruptHandler":
+        """Enter context manager, starting the pool and capturing the signals."""
+        return self.capture()
+
+    def capture(self) -> "PoolInterruptHandler":
+        """Start the pool and capture the signals.
+
+        Useful when not using the "with PoolInterruptHandler" syntax.
+        """
+        if issubclass(self.executor_class, ProcessPoolExecutor):
+            import multiprocessing
+
+            event = multiprocessing.Event()
+            self.token = CancellationToken(event)
+            self.executor = ProcessPoolExecutor(
+                self.max_workers, initializer=_init_process_worker, initargs=(event, self.signals)
+            )
+        else:
+            self.token = CancellationToken()
+            # noinspection PyArgumentList
+            self.executor = self.executor_class(  # type: ignore
+                self.max_workers, initializer=_init_thread_worker, initargs=(self.token,)
+            )
+        self._handlers = [GracefulInterruptHandler(sig, on_interrupt=self.cancel).capture() for sig in self.signals]
+        return self
+
+    # noinspection PyUnusedLocal,PyShadowingBuiltins
+    def __exit__(self, type, value, tb):
+        """Exit context manager, shutting down the pool (cancelling its work when leaving with an exception)."""
+        if type is not None:
+            self.cancel()
+        self.shutdown()
+
+    @property
+    def cancelled(self) -> bool:
+        """Has the work been cancelled?"""
+        return self.token.cancelled
+
+    def cancel(self, signum: Optional[int] = None) -> None:
+        """Cancel the work: stop accepting tasks and tell the workers.
+
+        :param signum: the signal that caused the cancellation, if any
+        """
+        self.token.cancel(signum)
+        if not self._interrupted.done():
+            self._interrupted.set_result(signum)
+
+    def submit(self, fn: Callable, *args: Any, **kwargs: Any) -> Optional[Future]:
+        """Submit a task to the pool.
+
+        :return: the task's future, None if the work has been cancelled (the task is reported as cancelled)
+        """
+        task = Task(fn, args, kwargs)
+        if self.token.cancelled or self.executor is None:
+            self._rejected.append(task)
+            return None
+        future = self.executor.submit(fn, *args, **kwargs)
+        with self._lock:
+            self._tasks[future] = task
+        future.add_done_callback(self._task_done)
+        return future
+
+    def _task_done(self, future: Future) -> None:
+        """Count a done task and forget it (called by the future, in the thread that finished it)."""
+        with self._lock:
+            task = self._tasks.pop(future, None)
+            if task is None:
+                return
+            if future.cancelled():
+                self._cancelled.append(task)
+            else:
+                self._completed += 1
+
+    def wait(self, futures: Iterable[Future], return_when: str = FIRST_COMPLETED) -> Tuple[Set[Future], Set[Future]]:
+        """Wait for the futures like concurrent.futures.wait, but return as soon as the work is cancelled.
+
+        :param futures: the futures to wait for
+        :param return_when: FIRST_COMPLETED, FIRST_EXCEPTION or ALL_COMPLETED
+        :return: the done and the not done futures
+        """
+        pending = set(futures)
+        done = {future for future in pending if future.done()}
+        pending -= done
+        if return_when == FIRST_COMPLETED and done:
+            return done, pending
+        while pending and not self.token.cancelled:
+            newly_done, not_done = wait(pending | {self._interrupted}, return_when=FIRST_COMPLETED)
+            newly_done.discard(self._interrupted)
+            done |= newly_done
+            pending = {future for future in not_done if future is not self._interrupted}
+            if return_when == FIRST_COMPLETED and done:
+                break
+            if return_when == FIRST_EXCEPTION and any(not f.cancelled() and f.exception() for f in newly_done):
+                break
+        return done, pending
+
+    def shutdown(self) -> PoolShutdownReport:
+        """Wait for the tasks to finish, or once cancelled to drain or cancel within the deadline, then release.
+
+        :return: the report of what was done, also in self.report
+        """
+        with self._lock:
+            futures = list(self._tasks)
+        done, pending = self.wait(futures, return_when=ALL_COMPLETED)
+        try:
+            if pending:
+                end_time = time.monotonic() + self.deadline
+                if not self.drain:
+                    for future in pending:
+                        future.cancel()
+                done, not_done = wait(pending, timeout=max(end_time - time.monotonic(), 0.0))
+                pending = set(not_done)
+        finally:
+            for handler in reversed(self._handlers):
+                handler.release()
+            # the tasks not done by now are unfinished, even if a terminated worker fails them later
+            with self._lock:
+                unfinished = list(self._tasks.values())
+                completed = self._completed
+                cancelled = self._cancelled + self._rejected
+            self._release_executor(pending)
+
+        self.report = PoolShutdownReport(completed, cancelled, unfinished, self.token.signum)
+        return self.report
+
+    def _release_executor(self, unfinished: Set[Future]) -> None:
+        """Shut down the executor without waiting for the unfinished tasks, terminating any process workers."""
+        if self.executor is None:
+            return
+        executor = self.executor
+        self.executor = None
+        if not unfinished:
+            executor.shutdown(wait=True)
+            return
+        # noinspection PyProtectedMember
+        processes = dict(getattr(executor, "_processes", None) or {})
+        executor.shutdown(wait=False)
+        for process in processes.values():
+            process.terminate()
@@ -0,0 +1,229 @@
+"""Stream the results to stdout or a file as JSON Lines or CSV, optionally gzipped, through a large buffer.
+
+The results are written one at a time as they are reported, so a report of millions of results uses constant memory,
+and the large buffer (--output-buffer-size) batches the writes into few system calls.  The buffer is flushed when it
+is full (--output-flush buffer), after each reported batch of results (batch) or after each result (record).
+
+Example Usage::
+
+    with ReportWriter("results.jsonl.gz", buffer_size=4 * 1024 * 1024) as writer:
+        writer.write_all(result for result in results)
+
+The output format defaults from the output file's suffix (.csv, else JSON Lines), a .gz suffix compresses the output,
+and without an output file the results are logged (the "log" format).
+"""
+import io
+from typing import Any, List, Optional
+
+from {{ cookiecutter.pkg_name }}.binary_io import DEFAULT_BUFFER_SIZE, binary_stdout
+
+__docformat__ = 'restructuredtext en'
+
+# the formats of the report
+OUTPUT_FORMATS = ['log', 'jsonl', 'csv']
+
+# when the report's buffer is flushed: when full, after each batch of results or after each result
+FLUSH_POLICIES = ['buffer', 'batch', 'record']
+
+
+def output_format_for(output: Optional[str]) -> str:
+    """The default output format for the output file: csv for a .csv file, else jsonl, and log without a file.
+
+    :param output: the output file name, None or "-" for stdout
+    """
+    if output is None or output == '-':
+        return 'log'
+    name = output[:-3] if output.endswith('.gz') else output
+    return 'csv' if name.lower().endswith('.csv') else 'jsonl'
+
+
+class ReportWriter(object):
+    """Writes the results, one at a time, to stdout or a file."""
+
+    def __init__(
+        self,
+        output: Optional[str] = None,
+        output_format: Optional[str] = None,
+        compress: Optional[bool] = None,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        flush_policy: str = 'buffer',
+    ) -> None:
+        """Initialize.
+
+        :param output: the output file name, None or "-" for stdout
+        :param output_format: one of OUTPUT_FORMATS (default: from the output file, see output_format_for)
+        :param compress: gzip the output (default: when the output file name ends with .gz)
+        :param buffer_size: the size of the write buffer, at least 1
+        :param flush_policy: one of FLUSH_POLICIES
+        """
+        self.output = None if output == '-' else output
+        self.output_format = output_format or output_format_for(self.output)
+        self.compress = (self.output or '').endswith('.gz') if compress is None else compress
+        self.buffer_size = buffer_size
+        self.flush_policy = flush_policy
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError("output_format must be one of {formats}".format(formats=OUTPUT_FORMATS))
+        if self.flush_policy not in FLUSH_POLICIES:
+            raise ValueError("flush_policy must be one of {policies}".format(policies=FLUSH_POLICIES))
+        if self.buffer_size < 1:
+            raise ValueError("buffer_size must be at least 1")
+        # the number of results written
+        self.count = 0
+        self._logger: Optional[Any] = None
+        self._file: Optional[Any] = None
+        self._gzip_file: Optional[Any] = None
+        self._stream: Optional[Any] = None
+        self._encoder: Optional[Any] = None
+        self._csv_writer: Optional[Any] = None
+        self._csv_fields: Optional[List[str]] = None
+
+    @classmethod
+    def from_settings(cls, settings: Any) -> "ReportWriter":
+        """Create the writer from the --output, --output-format, --gzip, --output-buffer-size and --output-flush
+        settings.
+
+        :param settings: the application settings
+        """
+        return cls(
+            output=getattr(settings, 'output', None),
+            output_format=getattr(settings, 'output_format', None),
+            compress=getattr(settings, 'gzip', False) or None,
+            buffer_size=getattr(settings, 'output_buffer_size', DEFAULT_BUFFER_SIZE),
+            flush_policy=getattr(settings, 'output_flush', 'buffer'),
+        )
+
+    def __enter__(self) -> "ReportWriter":
+        """Enter context manager, opening the output."""
+        return self.open()
+
+    # noinspection PyShadowingBuiltins
+    def __exit__(self, type, value, tb):
+        """Exit context manager, flushing and closing the output."""
+        self.close()
+
+    def open(self) -> "ReportWriter":
+        """Open the output.
+
+        Useful when not using the "with ReportWriter" syntax.
+        """
+        if self.output_format == 'log':
+            if self._logger is None:
+                from logzero import logger
+
+                self._logger = logger
+            return self
+        if self._stream is not None:
+            return self
+        if self.output is None:
+            self._file = binary_stdout(self.buffer_size)
+        else:
+            self._file = open(self.output, mode='wb', buffering=self.buffer_size)
+        binary = self._file
+        if self.compress:
+            import gzip
+
+            # compress the buffer's worth of results at a time
+            self._gzip_file = gzip.GzipFile(fileobj=self._file, mode='wb')
+            binary = io.BufferedWriter(self._gzip_file, buffer_size=self.buffer_size)
+        self._stream = io.TextIOWrapper(binary, encoding='utf-8', newline='', write_through=True)
+        return self
+
+    def write(self, result: Any) -> None:
+        """Write a result.
+
+        A named tuple or a dataclass is written as a JSON object (CSV row) of its fields.
+
+        :param result: the result
+        """
+        if self._stream is None and self._logger is None:
+            self.open()
+        if self.output_format == 'log':
+            self._logger.info(f"Result: {repr(result)}")  # type: ignore
+        elif self.output_format == 'jsonl':
+            self._write_json(_plain(result))
+        else:
+            self._write_csv(_plain(result))
+        self.count += 1
+        if self.flush_policy == 'record':
+            self.flush()
+
+    def write_all(self, results: Any) -> int:
+        """Write the results, as they are produced.
+
+        :param results: a list or an iterator of results (a pipeline's batch, a generator, ...), anything else
+            (including a tuple) is a single result
+        :return: the number of results written
+        """
+        count = self.count
+        if isinstance(results, list) or hasattr(results, '__next__'):
+            for result in results:
+                self.write(result)
+        else:
+            self.write(results)
+        if self.flush_policy == 'batch':
+            self.flush()
+        return self.count - count
+
+    def flush(self) -> None:
+        """Flush the buffered results to the output (ending the compressed block when gzipped)."""
+        if self._stream is None:
+            return
+        self._stream.flush()
+        if self._gzip_file is not None:
+            self._gzip_file.flush()
+        self._file.flush()  # type: ignore
+
+    def close(self) -> None:
+        """Flush and close the output (stdout is flushed but left open)."""
+        if self._stream is None:
+            return
+        stream, file = self._stream, self._file
+        self._stream = self._file = self._gzip_file = None
+        try:
+            # also closes the gzip file, writing its trailer
+            stream.close()
+        finally:
+            file.close()  # type: ignore
+
+    def _write_json(self, record: Any) -> None:
+        """Write the record as a line of JSON, anything JSON can not encode (but a dataclass) is written as its
+        string."""
+        if self._encoder is None:
+            import json
+
+            self._encoder = json.JSONEncoder(ensure_ascii=False, default=_json_default)
+        self._stream.write(self._encoder.encode(record) + "\n")  # type: ignore
+
+    def _write_csv(self, record: Any) -> None:
+        """Write the record as a CSV row, with a header row of the first record's fields when it is a dict."""
+        if self._csv_writer is None:
+            import csv
+
+            self._csv_writer = csv.writer(self._stream)  # type: ignore
+            if isinstance(record, dict):
+                self._csv_fields = [str(field) for field in record]
+                self._csv_writer.writerow(self._csv_fields)
+        if isinstance(record, dict):
+            row = list(record.values()) if self._csv_fields is None else [record.get(f) for f in self._csv_fields]
+        elif isinstance(record, (list, tuple)):
+            row = list(record)
+        else:
+            row = [record]
+        self._csv_writer.writerow(row)
+
+
+def _plain(result: Any) -> Any:
+    """The result, with a named tuple or a dataclass as a dict of its fields."""
+    if isinstance(result, tuple) and hasattr(result, '_asdict'):
+        return result._asdict()
+    if hasattr(result, '__dataclass_fields__') and not isinstance(result, type):
+        import dataclasses
+
+        return dataclasses.asdict(result)
+    return result
+
+
+def _json_default(value: Any) -> Any:
+    """Encode the values JSON can not: a dataclass as a dict of its fields, anything else as its string."""
+    plain = _plain(value)
+    return str(value) if plain is value else plain
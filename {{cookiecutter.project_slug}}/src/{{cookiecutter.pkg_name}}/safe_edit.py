@@ -1,24 +1,55 @@
-"""Safely edit a file by creating a backup which will be restored on any error."""
+"""Safely edit a file by creating a backup which will be restored on any error.
+
+Modules only needed by some of the functions (tempfile, shutil, mmap, hashlib, concurrent.futures,...) are
+imported where they are used so that importing this module stays cheap.
+"""
 
 import os
 import re
-import shutil
-from contextlib import contextmanager
-from tempfile import NamedTemporaryFile
-from typing import Dict, Iterable, List, TextIO, Optional, IO
+from contextlib import ExitStack, contextmanager
+from functools import partial
+from itertools import chain
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Match, NamedTuple, Optional, Pattern, Tuple, Union
 
 from {{ cookiecutter.pkg_name }}.touch import touch
 
+# size in bytes of the read and write buffers used when editing files.
+DEFAULT_BUFFER_SIZE: int = 64 * 1024
+
+# linux ioctl request to clone (reflink) a file on copy on write file systems (btrfs, xfs,...)
+FICLONE: int = 0x40049409
+
+
+class EditFiles(list):
+    """The [input file, output file] yielded by safe_edit.
+
+    Once the edit is committed, changed tells whether the file was replaced.  When the output is identical to the
+    original file, the original file, its backup and its mtime are left untouched and changed is False.
+    """
+
+    changed: bool = False
+
 
 # hitting mypy bug: https://github.com/python/mypy/issues/1317
 @contextmanager     # type: ignore
-def safe_edit(file_name: str, create: bool = False) -> Iterable[List]:
+def safe_edit(
+    file_name: str,
+    create: bool = False,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    binary: bool = False,
+    lock: bool = False,
+    lock_timeout: Optional[float] = None,
+) -> Iterator[EditFiles]:
     """Edit a file using a backup.  On any exception, restore the backup.
 
     :param file_name: source file to edit
     :param create: create the file if it doesn't exist
-    :yield: dict containing open file instances for input (files['in']) and output (files['out'])
-    :raises: allows IO exceptions to propagate
+    :param buffer_size: size in bytes of the input and output file buffers
+    :param binary: open the files in binary mode instead of utf-8 text mode
+    :param lock: hold an exclusive FileLock on the file from before it is read until the edit is committed
+    :param lock_timeout: seconds to wait for the lock, None waits forever
+    :yield: EditFiles containing open file instances for input (files[0]) and output (files[1])
+    :raises: allows IO exceptions to propagate, LockTimeoutError
 
     Usage::
 
@@ -26,59 +57,529 @@ def safe_edit(file_name: str, create: bool = False) -> Iterable[List]:
             for line in in_file.readlines():
                 # edit line
                 out_file.write(line)
-    """
-    backup_name = file_name + "~"
 
-    if create:
-        touch(file_name)
+    Writing the same content as the original does not replace the file::
+
+        with safe_edit(file_name) as files:
+            files[1].write(files[0].read())
+        assert not files.changed
 
-    in_file: Optional[TextIO] = None
+    With binary, the raw buffered files are yielded and copy_range may be used to pass unchanged regions
+    through without decoding them.
+    """
+    in_file: Optional[IO] = None
     tmp_file: Optional[IO] = None
     tf_name: Optional[str] = None
+    files = EditFiles()
+    with ExitStack() as stack:
+        if lock:
+            from {{ cookiecutter.pkg_name }}.file_lock import FileLock
+
+            stack.enter_context(FileLock(file_name, timeout=lock_timeout))
+        try:
+            in_file, tmp_file = _open_edit(file_name, create, buffer_size, binary)
+            tf_name = tmp_file.name
+            files.extend([in_file, tmp_file])
+            yield files
+
+        # intentionally catching any exceptions, including KeyboardInterrupt and asyncio.CancelledError, so that a
+        # partially written output is never committed
+        # pylint: disable=W0702
+        except BaseException:
+            # on any exception, delete the output temporary file
+            if tmp_file:
+                tmp_file.close()
+                tmp_file = None
+            if tf_name:
+                os.remove(tf_name)
+                tf_name = None
+            raise
+        finally:
+            if in_file:
+                in_file.close()
+            if tmp_file:
+                tmp_file.close()
+            if tf_name:
+                # only locked at os level against other writers when lock is asserted
+                files.changed = _commit_edit(file_name, tf_name)
+
+
+# hitting mypy bug: https://github.com/python/mypy/issues/1317
+@contextmanager     # type: ignore
+def safe_edit_many(
+    file_names: List[str],
+    create: bool = False,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    binary: bool = False,
+    durable: bool = True,
+    lock: bool = False,
+    lock_timeout: Optional[float] = None,
+) -> Iterator[List[EditFiles]]:
+    """Edit a set of files as a unit.  On any exception, none of the files are changed.
+
+    All of the outputs are staged in temporary files.  When durable, the staged files are then flushed to disk
+    together and their directories are flushed once after every file has been renamed into place, so the whole
+    set costs about one fsync round trip instead of one per file.  If committing any file fails, the files
+    already committed are restored from their backups.  Files whose output is identical to the original are
+    left untouched (see EditFiles).
+
+    :param file_names: source files to edit
+    :param create: create the files if they don't exist
+    :param buffer_size: size in bytes of the input and output file buffers
+    :param binary: open the files in binary mode instead of utf-8 text mode
+    :param durable: fsync the staged files and their directories before returning
+    :param lock: hold an exclusive FileLock on every file (taken in sorted order) until the set is committed
+    :param lock_timeout: seconds to wait for each lock, None waits forever
+    :yield: a list of EditFiles, [input file, output file], for each file in file_names
+    :raises: allows IO exceptions to propagate, LockTimeoutError
+
+    Usage::
+
+        with safe_edit_many([rc_name, conf_name]) as edits:
+            for in_file, out_file in edits:
+                out_file.write(in_file.read())
+    """
+    with ExitStack() as stack:
+        if lock:
+            from {{ cookiecutter.pkg_name }}.file_lock import FileLock
+
+            # a consistent order avoids deadlocks between transactions with overlapping files
+            for file_name in sorted(set(os.path.abspath(file_name) for file_name in file_names)):
+                stack.enter_context(FileLock(file_name, timeout=lock_timeout))
+        edits: List[EditFiles] = []
+        try:
+            for file_name in file_names:
+                edits.append(EditFiles(_open_edit(file_name, create, buffer_size, binary)))
+            yield edits
+        except BaseException:
+            # (including KeyboardInterrupt and asyncio.CancelledError) none of the partial outputs are committed
+            for in_file, tmp_file in edits:
+                if in_file:
+                    in_file.close()
+                tmp_file.close()
+                os.remove(tmp_file.name)
+            raise
+        _commit_edits(file_names, edits, durable)
+
+
+def _commit_edits(file_names: List[str], edits: List[EditFiles], durable: bool) -> None:
+    """Commit the staged edits of safe_edit_many, rolling back on any error.
+
+    Every staged file is written and, when durable, fsynced through its open descriptor before the first file is
+    renamed into place, then each parent directory is fsynced once after all of the renames.
+    """
+    committed: List[Tuple[str, bool]] = []
     try:
-        if os.path.isfile(file_name):
-            in_file = open(file_name, mode="r", encoding="utf-8")
-        tmp_file = NamedTemporaryFile(mode="w", delete=False, encoding="utf-8")
-        tf_name = tmp_file.name
-        yield [in_file, tmp_file]
-
-    # intentionally catching any exceptions
-    # pylint: disable=W0702
-    except Exception:
-        # on any exception, delete the output temporary file
-        if tmp_file:
+        for in_file, tmp_file in edits:
+            if in_file:
+                in_file.close()
+            tmp_file.flush()
+        for file_name, files in zip(file_names, edits):
+            files.changed = not _is_identical(file_name, files[1].name)
+        for files in edits:
+            if files.changed and durable:
+                os.fsync(files[1].fileno())
+            files[1].close()
+            if not files.changed:
+                os.remove(files[1].name)
+
+        for file_name, files in zip(file_names, edits):
+            if files.changed:
+                existed = os.path.isfile(file_name)
+                _install_file(file_name, files[1].name)
+                committed.append((file_name, existed))
+    except BaseException:
+        # roll back the files already committed then remove the remaining temporary files
+        for file_name, existed in reversed(committed):
+            if existed:
+                os.replace(file_name + "~", file_name)
+            else:
+                os.remove(file_name)
+        for in_file, tmp_file in edits:
             tmp_file.close()
-            tmp_file = None
-        if tf_name:
-            os.remove(tf_name)
-            tf_name = None
+            if os.path.isfile(tmp_file.name):
+                os.remove(tmp_file.name)
         raise
-    finally:
+
+    if durable and committed:
+        for directory in sorted(set(os.path.dirname(os.path.abspath(file_name)) for file_name, _ in committed)):
+            _fsync_directory(directory)
+
+
+def _open_edit(file_name: str, create: bool, buffer_size: int, binary: bool) -> Tuple[Optional[IO], IO]:
+    """Open the file to edit (None if it doesn't exist) and the temporary file for the edited content."""
+    if create:
+        touch(file_name)
+
+    encoding = None if binary else "utf-8"
+    in_file: Optional[IO] = None
+    if os.path.isfile(file_name):
+        in_file = open(file_name, mode="rb" if binary else "r", buffering=buffer_size, encoding=encoding)
+    try:
+        from tempfile import NamedTemporaryFile
+
+        # the temporary file is created next to the file so that it can be renamed into place
+        tmp_file = NamedTemporaryFile(
+            mode="wb" if binary else "w",
+            buffering=buffer_size,
+            delete=False,
+            encoding=encoding,
+            dir=os.path.dirname(os.path.abspath(file_name)),
+            prefix="." + os.path.basename(file_name) + ".",
+            suffix=".tmp",
+        )
+    except Exception:
         if in_file:
             in_file.close()
-        if tmp_file:
-            tmp_file.close()
-        if tf_name:
-            # ideally this block would be thread locked at os level
-            # remove previous backup file if it exists
-            # noinspection PyBroadException
-            try:
-                os.remove(backup_name)
-            except Exception:
-                pass
+        raise
+    return in_file, tmp_file
+
+
+def _commit_edit(file_name: str, tf_name: str) -> bool:
+    """Replace the file with the temporary file unless their contents are identical.
+
+    :return: True if the file was replaced
+    """
+    if _is_identical(file_name, tf_name):
+        os.remove(tf_name)
+        return False
+    _install_file(file_name, tf_name)
+    return True
+
+
+def _is_identical(file_name: str, tf_name: str) -> bool:
+    """Does the file exist with the same content as the temporary file?  The sizes are compared first."""
+    try:
+        if os.path.getsize(file_name) != os.path.getsize(tf_name):
+            return False
+    except OSError:
+        return False
+    with open(file_name, mode="rb") as file1, open(tf_name, mode="rb") as file2:
+        while True:
+            chunk = file1.read(DEFAULT_BUFFER_SIZE)
+            if chunk != file2.read(DEFAULT_BUFFER_SIZE):
+                return False
+            if not chunk:
+                return True
+
+
+def _install_file(file_name: str, tf_name: str) -> None:
+    """Backup the file then atomically replace it with the temporary file."""
+    import shutil
+
+    backup_name = file_name + "~"
+
+    # remove previous backup file if it exists
+    # noinspection PyBroadException
+    try:
+        os.remove(backup_name)
+    except Exception:
+        pass
+
+    # backup source file
+    if os.path.isfile(file_name):
+        shutil.copymode(file_name, tf_name)
+        _backup_file(file_name, backup_name)
+
+    # atomically put new file in place
+    os.replace(tf_name, file_name)
+
+
+def _fsync_directory(directory: str) -> None:
+    """Flush a directory's entries (renames) to disk where the platform supports it."""
+    if os.name == "nt":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _backup_file(file_name: str, backup_name: str) -> None:
+    """Backup the file without copying its content when possible.
+
+    The original file is replaced rather than rewritten, so a hard link to it is a complete backup.  When the
+    file system does not support hard links, try a copy on write clone (reflink) and finally fall back to a copy.
+
+    :param file_name: the file to backup
+    :param backup_name: the backup file, which must not exist
+    """
+    import shutil
+
+    try:
+        os.link(file_name, backup_name)
+        return
+    except (OSError, AttributeError):
+        pass
+
+    # noinspection PyBroadException
+    try:
+        # noinspection PyCompatibility
+        import fcntl
+
+        with open(file_name, mode="rb") as src_file, open(backup_name, mode="wb") as dst_file:
+            fcntl.ioctl(dst_file.fileno(), FICLONE, src_file.fileno())
+        shutil.copystat(file_name, backup_name)
+        return
+    except Exception:
+        pass
+
+    shutil.copy2(file_name, backup_name)
+
+
+def copy_range(in_file: IO, out_file: IO, offset: int, count: Optional[int] = None) -> int:
+    """Copy a range of bytes from the input file to the current position of the output file.
+
+    The bytes are copied by the kernel (os.copy_file_range, else os.sendfile) without passing through python's
+    memory.  Where neither is available or the file systems do not support them, the bytes are copied in chunks.
+
+    Usage, patching a header while passing the rest of the file through unchanged::
+
+        with safe_edit(file_name, binary=True) as files:
+            in_file, out_file = files
+            out_file.write(patch_header(in_file.read(4096)))
+            copy_range(in_file, out_file, 4096)
+
+    :param in_file: the binary input file
+    :param out_file: the binary output file
+    :param offset: the offset in the input file of the first byte to copy
+    :param count: the number of bytes to copy (default: to the end of the input file)
+    :return: the number of bytes copied
+    """
+    if count is None:
+        count = max(0, os.fstat(in_file.fileno()).st_size - offset)
+    out_file.flush()
+    position = out_file.tell()
+    copied = 0
+    try:
+        copied = _kernel_copy(in_file.fileno(), out_file.fileno(), offset, position, count)
+    except OSError:
+        pass
+    remaining = count - copied
+    out_file.seek(position + copied)
+    if remaining > 0:
+        in_file.seek(offset + copied)
+        while remaining > 0:
+            chunk = in_file.read(min(remaining, DEFAULT_BUFFER_SIZE))
+            if not chunk:
+                break
+            out_file.write(chunk)
+            copied += len(chunk)
+            remaining -= len(chunk)
+    return copied
+
+
+def _kernel_copy(in_fd: int, out_fd: int, offset: int, position: int, count: int) -> int:
+    """Copy bytes between file descriptors in the kernel, returning the number of bytes copied.
+
+    :raises: OSError if the copy fails before any bytes are copied
+    """
+    copied = 0
+    if hasattr(os, "copy_file_range"):
+        try:
+            while copied < count:
+                # noinspection PyUnresolvedReferences
+                size = os.copy_file_range(in_fd, out_fd, count - copied, offset + copied, position + copied)
+                if size == 0:
+                    return copied
+                copied += size
+            return copied
+        except OSError:
+            if copied:
+                return copied
+    if hasattr(os, "sendfile"):
+        # sendfile writes at the output's file position
+        os.lseek(out_fd, position + copied, os.SEEK_SET)
+        while copied < count:
+            size = os.sendfile(out_fd, in_fd, offset + copied, count - copied)
+            if size == 0:
+                break
+            copied += size
+    return copied
+
+
+class EditPlan(object):
+    """A compiled set of regular expression replacements that may be applied to many lines and files.
+
+    Compiling the plan once avoids rebuilding and re-looking up each regex for every line.  A single combined
+    prefilter pattern rejects lines that none of the regexes match so that most lines cost one scan.
+
+    Usage::
+
+        plan = EditPlan({'foo': ['bar'], r'.*?(foo).*?(car).*': ['bar', 'dog']})
+        for file_name in file_names:
+            quick_edit(file_name, plan)
+    """
+
+    # a regex containing any of these cannot safely be embedded in the combined prefilter
+    # (back references, conditional groups and inline flags change meaning when combined).
+    UNSAFE_PREFILTER_REGEX: str = r"\\\d|\(\?P=|\(\?\(|\(\?[aiLmsux-]"
+
+    # inline global flags which must stay at the start of a regex when it is wrapped.
+    GLOBAL_FLAGS_REGEX: str = r"\(\?[aiLmsux]+\)"
+
+    # a regex containing any of these cannot be searched for over a whole buffer to find the lines it may match
+    # (the string anchors and lookarounds change meaning at the end of a line, and the unicode classes and non-ASCII
+    # characters match differently in the utf-8 encoded bytes than in the decoded line).
+    UNSAFE_BUFFER_PREFILTER_REGEX: str = r"\\[AZwdsbBNuU]|\\x[89a-fA-F]|\(\?<?[=!]|[^\x00-\x7f]"
+
+    def __init__(self, regex_replacement_dict: Dict[str, List[str]]) -> None:
+        """Initialize.
+
+        :param regex_replacement_dict: maps regular expressions to the list of replacement values for their groups
+        """
+        self.regex_replacement_dict = dict(regex_replacement_dict)
+        self._rules: List[Tuple[Pattern, List[str]]] = [
+            (re.compile(self._rule_regex(regex)), values) for regex, values in self.regex_replacement_dict.items()
+        ]
+        self._prefilter = self._compile_prefilter(list(self.regex_replacement_dict.keys()))
+        # the whole buffer stages are only compiled when first used
+        self._buffer_stages: Optional[List[Callable[[Any], Optional[Iterator[Any]]]]] = None
+
+    @staticmethod
+    def _rule_regex(regex: str) -> str:
+        """A regex without any groups replaces the whole regex in the line."""
+        if "(" not in regex:
+            regex = ".*(" + regex + ").*"
+        return regex
+
+    def _compile_prefilter(
+        self, regexes: List[str], buffer: bool = False
+    ) -> Optional[Callable[[Any], Optional[Match]]]:
+        """Combine the regexes into a single pattern that matches any line that at least one regex matches.
+
+        Regexes without groups are implicitly wrapped in ".*(regex).*" and matched, which for a single line
+        is equivalent to searching for the bare regex, so they are combined into one searched alternation.
+
+        :param regexes: the regexes from the replacement dictionary
+        :param buffer: compile a bytes prefilter to search a whole buffer instead of a str prefilter for a line
+        :return: the combined pattern's match or search method, or None if the regexes can not be safely combined
+        """
+        if not regexes or any(re.search(self.UNSAFE_PREFILTER_REGEX, regex) for regex in regexes):
+            return None
+        if buffer and any(re.search(self.UNSAFE_BUFFER_PREFILTER_REGEX, regex) for regex in regexes):
+            return None
+        plain = [regex for regex in regexes if "(" not in regex]
+        grouped = [regex for regex in regexes if "(" in regex]
+        try:
+            if buffer:
+                alternatives = ["^(?:" + "|".join("(?:" + regex + ")" for regex in grouped) + ")"] if grouped else []
+                alternatives.extend(plain)
+                return re.compile("|".join(alternatives).encode("utf-8"), re.MULTILINE).search
+            if not grouped:
+                return re.compile("|".join(plain)).search
+            alternatives = ["(?:" + regex + ")" for regex in grouped]
+            if plain:
+                alternatives.append(".*?(?:" + "|".join(plain) + ")")
+            return re.compile("|".join(alternatives)).match
+        except re.error:
+            return None
+
+    def apply(self, line: str) -> str:
+        """Apply the replacements to the given line.
 
-            # Note, shutil.move will safely move even across file systems
+        :param line: the line to edit
+        :return: the edited line
+        """
+        if self._prefilter is not None and self._prefilter(line) is None:
+            return line
+        for pattern, values in self._rules:
+            match = pattern.match(line)
+            if match:
+                line = _match_replacement(line, match, values)
+        return line
 
-            # backup source file
-            if os.path.isfile(file_name):
-                shutil.move(file_name, backup_name)
+    def apply_buffer(self, buffer: Any) -> Optional[Iterator[Any]]:
+        """Apply the replacements to a whole buffer of utf-8 encoded bytes (bytes, bytearray, mmap,...).
 
-            # put new file in place
-            # noinspection PyTypeChecker
-            shutil.move(tf_name, file_name)
+        The buffer's lines end with b"\\n".  A regex that spans lines (one with a \\n) is matched at the start of
+        every line and the match may continue over the following lines: its groups are replaced with the values
+        while the text outside the groups is kept (a match without groups is replaced by the first value).  Any other
+        regex is confined to its line: the line is decoded and the consecutive line regexes are applied to it in turn
+        with apply()'s rules, so they match non-ASCII text as in line mode.  A combined search of the buffer finds the
+        lines the line regexes may match, so the other lines are not decoded.
 
+        The regexes that span lines are matched against the utf-8 encoded bytes, so their \\w, \\d, \\s and (?i) only
+        match ASCII, and a match whose groups would split a character raises ValueError (leaving the file unchanged).
 
-def quick_edit(file_name: str, regex_replacement_dict: Dict[str, List[str]]) -> None:
+        The regexes are applied in order, so a regex that spans lines sees the result of the regexes before it, which
+        is staged in an anonymous temporary file rather than in memory.
+
+        :param buffer: the buffer to edit
+        :return: the segments of the edited buffer (memoryviews of untouched regions and replacement bytes), produced
+                 as they are written so the edits are not held in memory, or None if nothing matched
+        """
+        if self._buffer_stages is None:
+            self._buffer_stages = self._compile_buffer_stages()
+        segments: Optional[Iterator[Any]] = None
+        for stage in self._buffer_stages:
+            if segments is not None:
+                buffer = _staged_buffer(segments)
+                segments = iter([buffer])
+            edited = stage(buffer)
+            if edited is not None:
+                segments = edited
+        return segments
+
+    def _compile_buffer_stages(self) -> List[Callable[[Any], Optional[Iterator[Any]]]]:
+        """Compile the regexes into the stages of apply_buffer: a stage per regex that spans lines, and a stage per
+        run of consecutive line regexes."""
+        stages: List[Callable[[Any], Optional[Iterator[Any]]]] = []
+        line_regexes: List[str] = []
+
+        rules = dict(zip(self.regex_replacement_dict, self._rules))
+
+        def add_line_stage() -> None:
+            """Add a stage for the line regexes so far."""
+            if line_regexes:
+                probe = self._compile_prefilter(line_regexes, buffer=True)
+                line_rules = [rules[regex] for regex in line_regexes]
+                stages.append(partial(_line_replacements, rules=line_rules, probe=probe))
+                del line_regexes[:]
+
+        for regex, values in self.regex_replacement_dict.items():
+            if not self._spans_lines(regex):
+                line_regexes.append(regex)
+                continue
+            add_line_stage()
+            pattern = re.compile(self._anchored(self._rule_regex(regex)).encode("utf-8"), re.MULTILINE)
+            encoded_values = [value.encode("utf-8") for value in values]
+            stages.append(partial(_buffer_replacement, pattern=pattern, values=encoded_values))
+        add_line_stage()
+        return stages
+
+    @staticmethod
+    def _spans_lines(regex: str) -> bool:
+        """Does the regex match a newline explicitly, so it may span lines in apply_buffer?"""
+        return "\\n" in regex or "\n" in regex
+
+    @property
+    def fingerprint(self) -> str:
+        """A digest that changes whenever the regexes, their values or their order change."""
+        import hashlib
+        import json
+
+        text = json.dumps(list(self.regex_replacement_dict.items()))
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def __reduce__(self) -> Tuple[Any, ...]:
+        """Pickle just the replacements (for process pools), the plan is recompiled when unpickled."""
+        return EditPlan, (self.regex_replacement_dict,)
+
+    def _anchored(self, regex: str) -> str:
+        """Anchor the regex to the start of a line, keeping any leading inline global flags first."""
+        flags = re.match(self.GLOBAL_FLAGS_REGEX, regex)
+        prefix = flags.group(0) if flags else ""
+        return prefix + "^(?:" + regex[len(prefix):] + ")"
+
+
+def quick_edit(
+    file_name: str,
+    regex_replacement_dict: Union[Dict[str, List[str]], EditPlan],
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    whole_buffer: bool = False,
+) -> bool:
     """This handles replacing text by using regular expressions.
 
     The simple case of replacing the first occurrence in each line of 'foo' with 'bar' is::
@@ -95,21 +596,138 @@ def quick_edit(file_name: str, regex_replacement_dict: Dict[str, List[str]]) ->
 
         quick_edit(file_name, {r'.*?(foo).*?(car).*': ['bar', 'dog']})
 
+    When editing many files with the same replacements, compile them once into an EditPlan::
+
+        plan = EditPlan({'foo': ['bar']})
+        quick_edit(file_name, plan)
+
+    The file is streamed a line at a time through buffers of buffer_size bytes, so memory use depends on the
+    length of the longest line rather than on the size of the file.
+
+    With whole_buffer, the file is memory mapped and searched as a whole (see EditPlan.apply_buffer): patterns with
+    a newline are run over the raw bytes and may span lines, the others edit each line as without whole_buffer::
+
+        quick_edit(file_name, {r'(foo)\\n(bar)': ['bar', 'foo']}, whole_buffer=True)
+
+    When nothing matches, the file is left alone (no temporary file or backup is created), otherwise the
+    untouched regions are copied directly from the mapping.  Line endings are not translated in this mode.
+
 
     WARNING, there are probably gotchas here.
 
     :param file_name: file to edit
-    :param regex_replacement_dict:
+    :param regex_replacement_dict: the replacements or a compiled EditPlan
+    :param buffer_size: size in bytes of the input and output file buffers
+    :param whole_buffer: edit the memory mapped file as a whole instead of line by line
+    :return: True if the file was changed (an unchanged file is not rewritten)
     """
-    files: List
-    with safe_edit(file_name) as files:
+    plan = regex_replacement_dict if isinstance(regex_replacement_dict, EditPlan) else EditPlan(regex_replacement_dict)
+    if whole_buffer:
+        return _quick_edit_buffer(file_name, plan, buffer_size)
+    files: EditFiles
+    with safe_edit(file_name, buffer_size=buffer_size) as files:
         # hitting mypy bug: https://github.com/python/mypy/issues/8829
         in_file = files[0]  # type: ignore
         out_file = files[1]  # type: ignore
         if in_file and out_file:
-            for line in in_file.readlines():
-                out_line = _line_replacement(line, regex_replacement_dict)
-                out_file.write(out_line)
+            out_file.writelines(map(plan.apply, in_file))
+    return files.changed
+
+
+class EditResult(NamedTuple):
+    """The result of editing one file with quick_edit_many."""
+
+    file_name: str
+    changed: bool
+    bytes_written: int
+    error: Optional[str]
+
+
+def quick_edit_many(
+    paths: Iterable[str],
+    regex_replacement_dict: Union[Dict[str, List[str]], EditPlan],
+    jobs: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    buffer_size: int = DEFAULT_BUFFER_SIZE,
+    whole_buffer: bool = False,
+) -> List[EditResult]:
+    """Apply the same quick_edit to many files using a pool of processes.
+
+    Each file is edited with its own safe_edit, so a file that fails is restored from its backup while the
+    remaining files are still edited.  A missing file is reported as an error and is not created.
+
+    Usage::
+
+        for result in quick_edit_many(file_names, {'foo': ['bar']}, jobs=8):
+            if result.error:
+                logger.error("{file}: {error}".format(file=result.file_name, error=result.error))
+
+    :param paths: the files to edit
+    :param regex_replacement_dict: the replacements or a compiled EditPlan
+    :param jobs: the number of worker processes (default: the number of CPUs), 1 edits in this process
+    :param chunk_size: the number of files sent to a worker at a time (default: spread over about 4 chunks per job)
+    :param buffer_size: size in bytes of the input and output file buffers
+    :param whole_buffer: edit the memory mapped file as a whole instead of line by line
+    :return: the result for each file in the same order as paths
+    """
+    plan = regex_replacement_dict if isinstance(regex_replacement_dict, EditPlan) else EditPlan(regex_replacement_dict)
+    file_names = list(paths)
+    edit = partial(_quick_edit_result, plan=plan, buffer_size=buffer_size, whole_buffer=whole_buffer)
+    jobs = jobs or os.cpu_count() or 1
+    if jobs == 1 or len(file_names) <= 1:
+        return [edit(file_name) for file_name in file_names]
+    if chunk_size is None:
+        chunk_size = max(1, len(file_names) // (jobs * 4))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(file_names))) as executor:
+        return list(executor.map(edit, file_names, chunksize=chunk_size))
+
+
+def _quick_edit_result(file_name: str, plan: EditPlan, buffer_size: int, whole_buffer: bool) -> EditResult:
+    """Run quick_edit on one file, capturing any error in the result."""
+    try:
+        # a missing (or unreadable) file is an error rather than created empty as safe_edit would
+        with open(file_name, mode="rb"):
+            pass
+        changed = quick_edit(file_name, plan, buffer_size=buffer_size, whole_buffer=whole_buffer)
+        bytes_written = os.path.getsize(file_name) if changed else 0
+        return EditResult(file_name, changed, bytes_written, None)
+    # intentionally catching any exceptions so one file does not abort the batch
+    except Exception as ex:
+        return EditResult(file_name, False, 0, "{name}: {ex}".format(name=type(ex).__name__, ex=ex))
+
+
+def _quick_edit_buffer(file_name: str, plan: EditPlan, buffer_size: int) -> bool:
+    """Edit the memory mapped file as a whole, only rewriting the file when something matched."""
+    import mmap
+
+    with open(file_name, mode="rb") as in_file:
+        if os.fstat(in_file.fileno()).st_size == 0:
+            # an empty file can not be mapped, and has no lines to edit
+            return False
+        buffer = mmap.mmap(in_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            segments = plan.apply_buffer(buffer)
+            if segments is None:
+                return False
+            files: EditFiles
+            with safe_edit(file_name, buffer_size=buffer_size, binary=True) as files:
+                # hitting mypy bug: https://github.com/python/mypy/issues/8829
+                out_file = files[1]  # type: ignore
+                out_file.writelines(segments)
+                # release the views of the mapping so it may be closed before the file is moved
+                segments = None
+                buffer.close()
+            return files.changed
+        finally:
+            segments = None
+            try:
+                buffer.close()
+            except BufferError:
+                # a view is still referenced (by the traceback of an error), the map is closed when it is collected
+                pass
 
 
 def _line_replacement(line: str, regex_replacement_dict: Dict[str, List[str]]) -> str:
@@ -119,19 +737,136 @@ def _line_replacement(line: str, regex_replacement_dict: Dict[str, List[str]]) -
 
 
 def _single_replacement(line: str, regex: str, values: List[str]) -> str:
-    newline = line
     if "(" not in regex:
         regex = ".*(" + regex + ").*"
     match = re.match(regex, line)
     if match:
-        newline = ""
-        postfix = ""
-        for group in range(1, len(match.groups()) + 1):
-            a = 0
-            if group > 1:
-                a = match.end(group - 1)
-            newline += line[a: match.start(group)]
-            newline += values[group - 1]
-            postfix = line[match.end(group):]
-        newline += postfix
+        return _match_replacement(line, match, values)
+    return line
+
+
+def _match_replacement(line: Any, match: Match, values: List[Any]) -> Any:
+    # (str or bytes)
+    newline = line[:0]
+    postfix = line[:0]
+    for group in range(1, len(match.groups()) + 1):
+        a = 0
+        if group > 1:
+            a = match.end(group - 1)
+        newline += line[a: match.start(group)]
+        newline += values[group - 1]
+        postfix = line[match.end(group):]
+    newline += postfix
     return newline
+
+
+def _line_replacements(
+    buffer: Any, rules: List[Tuple[Pattern, List[str]]], probe: Optional[Callable[..., Optional[Match]]]
+) -> Optional[Iterator[Any]]:
+    """Apply the str rules to each decoded line of the buffer in turn, like EditPlan.apply.
+
+    :param probe: searches the buffer from a position for where the next line the rules may match is, None to try
+        every line
+    :return: the segments of the edited buffer, produced as they are read, or None if no line changed
+    """
+    return _if_changed(_line_segments(buffer, rules, probe))
+
+
+def _line_segments(
+    buffer: Any, rules: List[Tuple[Pattern, List[str]]], probe: Optional[Callable[..., Optional[Match]]]
+) -> Iterator[Any]:
+    """The segments of the buffer with the rules applied to each line, nothing if no line changed."""
+    view = memoryview(buffer)
+    size = len(buffer)
+    position = 0
+    start = 0
+    while start < size:
+        line_start = start
+        if probe is not None:
+            found = probe(buffer, start)
+            if found is None:
+                break
+            line_start = buffer.rfind(b"\n", start, found.start()) + 1 or start
+        line_end = buffer.find(b"\n", line_start)
+        line_end = size if line_end < 0 else line_end + 1
+        line = edited = bytes(view[line_start:line_end]).decode("utf-8")
+        for pattern, values in rules:
+            match = pattern.match(edited)
+            if match:
+                edited = _match_replacement(edited, match, values)
+        if edited != line:
+            yield view[position:line_start]
+            yield edited.encode("utf-8")
+            position = line_end
+        start = line_end
+    if position:
+        yield view[position:]
+
+
+def _buffer_replacement(buffer: Any, pattern: Pattern, values: List[bytes]) -> Optional[Iterator[Any]]:
+    """Replace the groups of every match of the pattern in the buffer.
+
+    :return: the segments of the edited buffer, produced as they are read, or None if the pattern did not match
+    """
+    return _if_changed(_match_segments(buffer, pattern, values))
+
+
+def _match_segments(buffer: Any, pattern: Pattern, values: List[bytes]) -> Iterator[Any]:
+    """The segments of the buffer with the groups of every match replaced, nothing if the pattern did not match."""
+    view = memoryview(buffer)
+    position = 0
+    matched = False
+    for match in pattern.finditer(buffer):
+        matched = True
+        _check_boundaries(buffer, match)
+        yield view[position: match.start()]
+        position = match.start()
+        if not match.re.groups:
+            # without groups the whole match is replaced
+            yield values[0] if values else b""
+            position = match.end()
+        for group in range(1, match.re.groups + 1):
+            if match.start(group) < 0:
+                continue
+            yield view[position: match.start(group)]
+            yield values[group - 1]
+            position = match.end(group)
+        yield view[position: match.end()]
+        position = match.end()
+    if matched:
+        yield view[position:]
+
+
+def _check_boundaries(buffer: Any, match: Match) -> None:
+    """Verify the match and its groups start and end on utf-8 character boundaries.
+
+    :raises ValueError: if replacing the match would split a character
+    """
+    for group in range(match.re.groups + 1):
+        for position in match.span(group):
+            if 0 < position < len(buffer) and 0x80 <= buffer[position] < 0xC0:
+                raise ValueError(
+                    "{regex!r} splits a utf-8 character at byte {position}".format(
+                        regex=match.re.pattern.decode("utf-8"), position=position
+                    )
+                )
+
+
+def _if_changed(segments: Iterator[Any]) -> Optional[Iterator[Any]]:
+    """The segments, None if there are none (the buffer is unchanged)."""
+    for first in segments:
+        return chain([first], segments)
+    return None
+
+
+def _staged_buffer(segments: Iterable[Any]) -> Any:
+    """Write the segments to an anonymous temporary file and map it, so they are not held in memory."""
+    import mmap
+    from tempfile import TemporaryFile
+
+    with TemporaryFile() as tmp_file:
+        tmp_file.writelines(segments)
+        tmp_file.flush()
+        if tmp_file.tell() == 0:
+            return b""
+        return mmap.mmap(tmp_file.fileno(), 0, access=mmap.ACCESS_READ)
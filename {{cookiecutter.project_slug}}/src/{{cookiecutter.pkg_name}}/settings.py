@@ -29,6 +29,27 @@ class Settings(ApplicationSettings):
         'output_group': 'Options that control generated output.',
         'verbosity': 'Set verbosity level: 0=none, 1=errors, 2=info+errors, 3+=debug+info+errors (default=2).',
         'logfile': 'File to log all messages (debug, info, warning, error, fatal) to.',
+        'output': 'Write the results to FILE ("-" for stdout) instead of logging them.',
+        'output_format': 'The format of the results: log, jsonl (JSON Lines) or csv (default: csv for a .csv FILE, '
+                         'else jsonl, and log without --output).',
+        'gzip': 'Compress the results with gzip (default for a FILE ending with .gz).',
+        'output_buffer_size': 'The size in bytes of the results\' write buffer (default=1048576).',
+        'output_flush': 'Flush the results when the buffer is full, after each batch of results or after each result '
+                        '(default=buffer).',
+
+        'concurrency_group': 'Options that control how the work items are run.',
+        'jobs': 'The number of work items run at the same time, or "auto" for the number of CPUs available '
+                '(default=1).',
+        'executor': 'Run the work items in a pool of threads or processes (default=thread).',
+        'chunk_size': 'The number of work items sent to a worker at a time (default=1).',
+        'unordered': 'Report the results as they complete instead of in the order of the work items.',
+
+        'batch_group': 'Run many argument sets in this process.',
+        'batch': 'Run the argument sets in FILE ("-" for stdin), one per line either as a JSON list of arguments or '
+                 'shell quoted arguments.',
+        'batch_jobs': 'The number of argument sets run at the same time (default=1).',
+        'batch_executor': 'Run the argument sets in a pool of threads or processes (default=thread).',
+        'batch_unordered': 'Report the results as they complete instead of in the order of the argument sets.',
     }
 
     def __init__(self):
@@ -51,10 +72,59 @@ class Settings(ApplicationSettings):
         )
         output_group.add_argument('--logfile', type=str, metavar='FILE', help=self._help['logfile'])
 
+        from {{ cookiecutter.pkg_name }}.report_writer import DEFAULT_BUFFER_SIZE, FLUSH_POLICIES, OUTPUT_FORMATS
+
+        output_group.add_argument('--output', type=str, metavar='FILE', help=self._help['output'])
+        output_group.add_argument(
+            '--output-format', dest='output_format', choices=OUTPUT_FORMATS, help=self._help['output_format']
+        )
+        output_group.add_argument('--gzip', dest='gzip', action='store_true', help=self._help['gzip'])
+        output_group.add_argument(
+            '--output-buffer-size', dest='output_buffer_size', default=DEFAULT_BUFFER_SIZE, type=int, metavar='INT',
+            help=self._help['output_buffer_size']
+        )
+        output_group.add_argument(
+            '--output-flush', dest='output_flush', default='buffer', choices=FLUSH_POLICIES,
+            help=self._help['output_flush']
+        )
+
+        from {{ cookiecutter.pkg_name }}.task_runner import EXECUTORS, jobs_argument
+
+        concurrency_group = parser.add_argument_group(title='Concurrency Options',
+                                                      description=self._help['concurrency_group'])
+        concurrency_group.add_argument(
+            '--jobs', dest='jobs', default=1, type=jobs_argument, metavar='INT|auto', help=self._help['jobs']
+        )
+        concurrency_group.add_argument(
+            '--executor', dest='executor', default='thread', choices=EXECUTORS, help=self._help['executor']
+        )
+        concurrency_group.add_argument(
+            '--chunk-size', dest='chunk_size', default=1, type=int, metavar='INT', help=self._help['chunk_size']
+        )
+        concurrency_group.add_argument('--unordered', dest='unordered', action='store_true',
+                                       help=self._help['unordered'])
+
+        batch_group = parser.add_argument_group(title='Batch Options', description=self._help['batch_group'])
+        batch_group.add_argument('--batch', type=str, metavar='FILE', help=self._help['batch'])
+        batch_group.add_argument(
+            '--batch-jobs', dest='batch_jobs', default=1, type=int, metavar='INT', help=self._help['batch_jobs']
+        )
+        batch_group.add_argument(
+            '--batch-executor', dest='batch_executor', default='thread', choices=['thread', 'process'],
+            help=self._help['batch_executor']
+        )
+        batch_group.add_argument(
+            '--batch-unordered', dest='batch_unordered', action='store_true', help=self._help['batch_unordered']
+        )
+
     def _cli_validate(self, settings: argparse.Namespace, remaining_argv: List[str]) -> Optional[str]:
         """Verify we have required options for commands.
 
         :param settings: the settings object returned by ArgumentParser.parse_args()
         :return: the error message if any
         """
+        if getattr(settings, 'output_format', None) == 'log' and (settings.output or settings.gzip):
+            return "--output-format log logs the results, it can not be used with --output or --gzip"
+        if getattr(settings, 'output_buffer_size', 1) < 1:
+            return "--output-buffer-size must be at least 1"
         return None
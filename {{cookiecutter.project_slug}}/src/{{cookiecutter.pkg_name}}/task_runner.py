@@ -0,0 +1,269 @@
+"""Run the application's work items concurrently on a thread or process pool.
+
+The pool is sized by --jobs, either a number or "auto" for the CPUs this process may use (its CPU affinity limited by
+the cgroup CPU quota, so a container is not oversubscribed), and chosen by --executor.  The work items are sent to
+the workers in chunks of --chunk-size, and the results come back in the order of the work items or, with
+--unordered, as they complete.
+
+Example Usage::
+
+    def count_words(file_name):
+        with open(file_name) as in_file:
+            return sum(len(line.split()) for line in in_file)
+
+    runner = TaskRunner.from_settings(settings)
+    for result in runner.run(count_words, file_names):
+        if result.error is None:
+            print(result.item, result.result)
+
+A signal (SIGINT, SIGTERM, SIGHUP) stops the run: no more work is submitted and the queued chunks are cancelled (see
+pool_interrupt_handler), the tasks can check cancellation_requested() to stop early, and the runner's report tells
+what was left undone.  The task function and the work items must be picklable for the process executor.
+"""
+import os
+from typing import Any, Callable, Iterable, Iterator, List, NamedTuple, Optional
+
+__docformat__ = 'restructuredtext en'
+
+# the executors that can run the tasks
+EXECUTORS = ['thread', 'process']
+
+
+class TaskResult(NamedTuple):
+    """The outcome of running the task on a work item."""
+
+    item: Any
+    result: Any
+    # the task's exception as "type: message" when errors are captured, else None
+    error: Optional[str]
+
+
+def available_cpus() -> int:
+    """The number of CPUs this process may use: its CPU affinity, limited by the cgroup CPU quota (at least 1)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))  # type: ignore
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, quota)
+    return max(cpus, 1)
+
+
+def _cgroup_cpu_quota() -> Optional[int]:
+    """The cgroup (v2 then v1) CPU quota rounded up to whole CPUs, None if there is no quota."""
+    quota_period = None
+    try:
+        with open("/sys/fs/cgroup/cpu.max", mode="r") as in_file:
+            quota_period = in_file.read().split()
+    except OSError:
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", mode="r") as quota_file, \
+                    open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", mode="r") as period_file:
+                quota_period = [quota_file.read().strip(), period_file.read().strip()]
+        except OSError:
+            return None
+    try:
+        quota, period = int(quota_period[0]), int(quota_period[1])
+    except (IndexError, ValueError):
+        # "max" (v2) is no quota
+        return None
+    if quota <= 0 or period <= 0:
+        # -1 (v1) is no quota
+        return None
+    return -(-quota // period)
+
+
+def jobs_argument(value: str) -> int:
+    """The argparse type of --jobs: a positive number or "auto" for available_cpus().
+
+    :raises argparse.ArgumentTypeError: for anything else
+    """
+    if value == 'auto':
+        return available_cpus()
+    try:
+        jobs = int(value)
+    except ValueError:
+        jobs = 0
+    if jobs < 1:
+        import argparse
+
+        raise argparse.ArgumentTypeError("expected a positive number or auto, got {value!r}".format(value=value))
+    return jobs
+
+
+class TaskRunner(object):
+    """Runs a task function on work items, on a pool of threads or processes."""
+
+    def __init__(
+        self,
+        jobs: int = 1,
+        executor: str = 'thread',
+        chunk_size: int = 1,
+        ordered: bool = True,
+        capture_errors: bool = True,
+        deadline: Optional[float] = None,
+    ) -> None:
+        """Initialize.
+
+        :param jobs: the number of workers, 1 to run the tasks in this thread
+        :param executor: 'thread' or 'process'
+        :param chunk_size: the number of work items sent to a worker at a time
+        :param ordered: yield the results in the order of the work items, else as they complete
+        :param capture_errors: record a task's exception in its result instead of raising it (which stops the run)
+        :param deadline: the seconds allowed to shut down the pool once interrupted (default: the
+            PoolInterruptHandler's)
+        """
+        if executor not in EXECUTORS:
+            raise ValueError("executor must be one of {executors}".format(executors=EXECUTORS))
+        self.jobs = max(jobs, 1)
+        self.executor = executor
+        self.chunk_size = max(chunk_size, 1)
+        self.ordered = ordered
+        self.capture_errors = capture_errors
+        self.deadline = deadline
+        self.report: Any = None
+
+    @classmethod
+    def from_settings(cls, settings: Any, **kwargs: Any) -> "TaskRunner":
+        """Create the runner from the --jobs, --executor, --chunk-size and --unordered settings.
+
+        :param settings: the application settings
+        :param kwargs: the other TaskRunner arguments
+        """
+        return cls(
+            jobs=getattr(settings, 'jobs', 1),
+            executor=getattr(settings, 'executor', 'thread'),
+            chunk_size=getattr(settings, 'chunk_size', 1),
+            ordered=not getattr(settings, 'unordered', False),
+            **kwargs
+        )
+
+    def run(self, task: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[TaskResult]:
+        """Run the task on each work item.
+
+        The work items are consumed as the workers need them, so they can be a generator of any length.  When
+        interrupted, the results already finished are yielded and the run stops (see self.report).
+
+        :param task: the function called with each work item
+        :param items: the work items
+        :return: the results
+        """
+        if self.jobs == 1:
+            return self._run_serial(task, items)
+        return self._run_pool(task, items)
+
+    def _run_serial(self, task: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[TaskResult]:
+        """Run the tasks in this thread, stopping between work items when interrupted."""
+        from {{ cookiecutter.pkg_name }}.graceful_interrupt_handler import GracefulInterruptHandler
+        from {{ cookiecutter.pkg_name }}.pool_interrupt_handler import DEFAULT_POOL_SIGNALS, PoolShutdownReport
+
+        handlers = [GracefulInterruptHandler(sig).capture() for sig in DEFAULT_POOL_SIGNALS]
+        completed = 0
+        signum = None
+        try:
+            for item in items:
+                interrupted = [handler.sig for handler in handlers if handler.interrupted]
+                if interrupted:
+                    signum = interrupted[0]
+                    break
+                yield _run_task(task, item, self.capture_errors)
+                completed += 1
+        finally:
+            for handler in reversed(handlers):
+                handler.release()
+            self.report = PoolShutdownReport(completed, [], [], signum)
+
+    def _run_pool(self, task: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[TaskResult]:
+        """Run the tasks in chunks on the pool, reporting the number of work items completed (not chunks)."""
+        self.report = None
+        completed = 0
+        try:
+            for result in self._run_chunks(task, items):
+                if result.error != _CANCELLED:
+                    completed += 1
+                yield result
+        finally:
+            if self.report is not None:
+                self.report = self.report._replace(completed=completed)
+
+    def _run_chunks(self, task: Callable[[Any], Any], items: Iterable[Any]) -> Iterator[TaskResult]:
+        """Run the tasks in chunks on the pool, with a bounded number of chunks in flight."""
+        from collections import deque
+        from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+        from {{ cookiecutter.pkg_name }}.pool_interrupt_handler import PoolInterruptHandler
+
+        executor_class = ProcessPoolExecutor if self.executor == 'process' else ThreadPoolExecutor
+        kwargs = {} if self.deadline is None else {'deadline': self.deadline}
+        max_in_flight = self.jobs * 2
+        with PoolInterruptHandler(executor_class, max_workers=self.jobs, **kwargs) as pool:  # type: ignore
+            in_flight: deque = deque()
+            for chunk in _chunks(items, self.chunk_size):
+                future = pool.submit(_run_chunk, task, chunk, self.capture_errors)
+                if future is None:
+                    break
+                in_flight.append(future)
+                while len(in_flight) >= max_in_flight and not pool.cancelled:
+                    yield from self._finished_results(pool, in_flight)
+            while in_flight and not pool.cancelled:
+                yield from self._finished_results(pool, in_flight)
+            if pool.cancelled:
+                # the results finished before the interrupt
+                finished: List[Future] = [
+                    future for future in in_flight if future.done() and not future.cancelled()
+                ]
+                for future in finished:
+                    yield from future.result()
+        self.report = pool.report
+
+    def _finished_results(self, pool: Any, in_flight: Any) -> Iterator[TaskResult]:
+        """Wait for the next chunk (in order or the first to complete) and yield its results."""
+        if self.ordered:
+            done, not_done = pool.wait([in_flight[0]])
+            if done:
+                yield from in_flight.popleft().result()
+        else:
+            done, not_done = pool.wait(in_flight)
+            for future in done:
+                in_flight.remove(future)
+                yield from future.result()
+
+
+# the error of the work items of a chunk skipped because the pool was cancelled
+_CANCELLED = "cancelled"
+
+
+def _chunks(items: Iterable[Any], chunk_size: int) -> Iterator[List[Any]]:
+    """Group the work items into lists of chunk_size."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _run_chunk(task: Callable[[Any], Any], chunk: List[Any], capture_errors: bool) -> List[TaskResult]:
+    """Run the task on a chunk of work items in a worker, stopping when the pool is cancelled."""
+    from {{ cookiecutter.pkg_name }}.pool_interrupt_handler import cancellation_requested
+
+    results = []
+    for item in chunk:
+        if cancellation_requested():
+            results.append(TaskResult(item, None, _CANCELLED))
+        else:
+            results.append(_run_task(task, item, capture_errors))
+    return results
+
+
+def _run_task(task: Callable[[Any], Any], item: Any, capture_errors: bool) -> TaskResult:
+    """Run the task on the work item, capturing its error."""
+    if not capture_errors:
+        return TaskResult(item, task(item), None)
+    try:
+        return TaskResult(item, task(item), None)
+    except Exception as ex:
+        return TaskResult(item, None, "{name}: {error}".format(name=type(ex).__name__, error=ex))
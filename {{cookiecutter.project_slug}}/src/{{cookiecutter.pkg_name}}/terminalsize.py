@@ -4,16 +4,23 @@
 Used in application_settings adjust the argparse display width to fill the width of the console.
 
 From:  https://gist.github.com/jtriley/1108174
+
+The platform specific modules are only imported on the platforms that use them, and the platform specific probes are
+only used when os.get_terminal_size cannot get the size of the terminal on stdout.
 """
 
 import os
-import platform
-import shlex
-import struct
-import subprocess
 import sys
 from typing import Tuple, Optional
 
+# the size used when there is no terminal
+DEFAULT_TERMINAL_SIZE = (80, 25)
+
+# the memoized terminal size, invalidated by a SIGWINCH or refresh_terminal_size()
+_terminal_size: Optional[Tuple[int, int]] = None
+
+_sigwinch_handler_installed = False
+
 
 # noinspection HttpUrlsUsage
 def get_terminal_size() -> Tuple[int, int]:
@@ -22,27 +29,114 @@ def get_terminal_size() -> Tuple[int, int]:
     - get width and height of console
     - works on linux,os x,windows,cygwin(windows)
 
+    The size follows shutil.get_terminal_size: the COLUMNS and LINES environment variables, else the size of the
+    terminal on stdout, else DEFAULT_TERMINAL_SIZE (without probing anything else when stdout is not a terminal).
+    The size is memoized until the terminal is resized (SIGWINCH) or refresh_terminal_size() is called.
+
     originally retrieved from:
 
     http://stackoverflow.com/questions/566746/how-to-get-console-window-width-in-python
     """
+    global _terminal_size
+    if _terminal_size is None:
+        _terminal_size = _query_terminal_size()
+    return _terminal_size
+
+
+def refresh_terminal_size() -> None:
+    """Forget the memoized terminal size, for example after changing the environment or stdout."""
+    global _terminal_size
+    _terminal_size = None
+
+
+def _query_terminal_size() -> Tuple[int, int]:
+    """Get the terminal size from the environment or the terminal on stdout."""
+    columns = _env_size("COLUMNS")
+    lines = _env_size("LINES")
+    if columns > 0 and lines > 0:
+        return columns, lines
+
+    tuple_xy = None
+    if os.isatty(1):
+        _install_sigwinch_handler()
+        try:
+            size = os.get_terminal_size(1)
+            tuple_xy = (size.columns, size.lines)
+        except (AttributeError, ValueError, OSError):
+            # not supported by the platform's terminal (for example mintty), so probe the platform
+            tuple_xy = _get_terminal_size_platform()
+    if tuple_xy is None or tuple_xy[0] <= 0 or tuple_xy[1] <= 0:
+        tuple_xy = DEFAULT_TERMINAL_SIZE
+    return columns if columns > 0 else tuple_xy[0], lines if lines > 0 else tuple_xy[1]
+
+
+def _env_size(name: str) -> int:
+    """Get a size from the environment, 0 if not set."""
+    try:
+        return int(os.environ[name])
+    except (KeyError, ValueError):
+        return 0
+
+
+def _install_sigwinch_handler() -> None:
+    """Forget the memoized terminal size when the terminal is resized.
+
+    Chains to any existing SIGWINCH handler.  Signal handlers can only be set in the main thread, in other threads
+    the size is memoized until refreshed.
+    """
+    global _sigwinch_handler_installed
+    if _sigwinch_handler_installed:
+        return
+    import signal
+
+    if not hasattr(signal, "SIGWINCH"):
+        return
+    original_handler = signal.getsignal(signal.SIGWINCH)
+
+    # noinspection PyUnusedLocal
+    def handler(signum: int, frame) -> None:
+        """Forget the memoized terminal size.
+
+        :param signum: the signal number
+        :param frame: the current stack frame
+        """
+        refresh_terminal_size()
+        if callable(original_handler):
+            original_handler(signum, frame)
+
+    try:
+        signal.signal(signal.SIGWINCH, handler)
+    except ValueError:
+        return
+    _sigwinch_handler_installed = True
+
+
+def _get_terminal_size_platform() -> Optional[Tuple[int, int]]:
+    """Get the terminal size the platform specific ways."""
     tuple_xy = None
     if sys.platform == "win32":
         tuple_xy = _get_terminal_size_windows()
         if tuple_xy is None:
             tuple_xy = _get_terminal_size_tput()
             # needed for window's python in cygwin's xterm!
-    if sys.platform.startswith("linux") or sys.platform == "darwin" or platform.system().startswith("CYGWIN"):
+    if _is_posix_terminal():
         tuple_xy = _get_terminal_size_linux()
-    if tuple_xy is None:
-        tuple_xy = (80, 25)  # default value
     return tuple_xy
 
 
+def _is_posix_terminal() -> bool:
+    if sys.platform.startswith("linux") or sys.platform == "darwin":
+        return True
+    import platform
+
+    return platform.system().startswith("CYGWIN")
+
+
 def _get_terminal_size_windows() -> Optional[Tuple[int, int]]:
     if sys.platform == "win32":
         # noinspection PyBroadException
         try:
+            import struct
             from ctypes import create_string_buffer, windll
 
             # stdin handle is -10
@@ -80,6 +174,9 @@ def _get_terminal_size_tput() -> Optional[Tuple[int, int]]:
     if sys.platform == "win32":
         # noinspection PyBroadException
         try:
+            import shlex
+            import subprocess
+
             cols = int(subprocess.check_call(shlex.split("tput cols")))
             rows = int(subprocess.check_call(shlex.split("tput lines")))
             return cols, rows
@@ -90,11 +187,13 @@ def _get_terminal_size_tput() -> Optional[Tuple[int, int]]:
 
 # noinspection PyTypeChecker
 def _get_terminal_size_linux() -> Optional[Tuple[int, int]]:
-    if sys.platform.startswith("linux") or sys.platform == "darwin" or platform.system().startswith("CYGWIN"):
+    if _is_posix_terminal():
         # noinspection PyPep8Naming,PyDocstring,PyShadowingNames
         def ioctl_GWINSZ(fd):
             # noinspection PyBroadException
             try:
+                import struct
+
                 # noinspection PyCompatibility
                 import fcntl
 
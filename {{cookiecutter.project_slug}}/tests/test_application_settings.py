@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.application_settings` module."""
+import os
+from pathlib import Path
+from typing import List
+
+from {{ cookiecutter.pkg_name }}.application_settings import ApplicationSettings
+
+
+def test_cached_config_defaults(tmp_path: Path, monkeypatch):
+    """The merged config defaults are cached until a config file changes."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_file = tmp_path / "apprc"
+    config_file.write_text("[App]\nfoo = bar\n")
+    missing_file = str(tmp_path / "missing")
+    settings = ApplicationSettings("App", "app", ["App"], {}, config_files=[missing_file, str(config_file)])
+
+    assert settings._load_defaults([missing_file, str(config_file)]) == {"foo": "bar"}
+    assert (tmp_path / "cache" / "app" / "config-defaults.bin").is_file()
+
+    # served from the cache while the config file is unchanged
+    import configparser
+
+    with monkeypatch.context() as patch:
+        patch.setattr(configparser, "ConfigParser", None)
+        assert settings._load_defaults([missing_file, str(config_file)]) == {"foo": "bar"}
+
+    # a changed config file invalidates the cache
+    config_file.write_text("[App]\nfoo = baz\n")
+    os.utime(str(config_file), ns=(0, 0))
+    assert settings._load_defaults([missing_file, str(config_file)]) == {"foo": "baz"}
+
+    # as does creating a missing config file
+    Path(missing_file).write_text("[App]\nfoo = qux\n")
+    assert settings._load_defaults([missing_file, str(config_file)]) == {"foo": "baz"}
+    assert settings._load_defaults([str(config_file), missing_file]) == {"foo": "qux"}
+
+
+def test_parse_many(tmp_path: Path, monkeypatch):
+    """parse_many reuses the parsers and applies each command line's --conf_file defaults."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_file = tmp_path / "apprc"
+    config_file.write_text("[App]\nlonghelp = yes\n")
+    other_file = tmp_path / "otherrc"
+    other_file.write_text("[App]\nversion = yes\n")
+    settings = ApplicationSettings("App", "app", ["App"], {"App": "the app"}, config_files=[str(config_file)])
+
+    argvs = [[], ["--version", "extra"], ["--conf_file", str(other_file)], ["-c", str(other_file), "--longhelp"]]
+    for single_pass in [False, True]:
+        results = [
+            (ns.version, ns.longhelp, ns.config_files, ns.remaining_argv)
+            for ns in settings.parse_many(argvs, single_pass=single_pass)
+        ]
+        assert results == [
+            (False, "yes", [str(config_file)], []),
+            (True, "yes", [str(config_file)], ["extra"]),
+            ("yes", "yes", [str(other_file), str(config_file)], []),
+            ("yes", True, [str(other_file), str(config_file)], []),
+        ]
+    # one parser for each set of config files
+    assert len(settings._parser_cache) == 2
+
+    parser, namespace, leftover_argv = settings.parse(["--version"])
+    assert parser is settings._cached_parser([str(config_file)])
+    assert namespace.version is True
+
+
+def test_parser_cache_size(tmp_path: Path, monkeypatch):
+    """Only the PARSER_CACHE_SIZE most recently used parsers are kept as the config file changes."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_file = tmp_path / "apprc"
+    settings = ApplicationSettings("App", "app", ["App"], {"App": "the app"}, config_files=[str(config_file)])
+    settings.PARSER_CACHE_SIZE = 2
+
+    first = settings._cached_parser([str(config_file)])
+    for mtime in range(1, 4):
+        config_file.write_text("[App]\nlonghelp = {mtime}\n".format(mtime=mtime))
+        os.utime(str(config_file), ns=(mtime, mtime))
+        assert settings.parse([])[1].longhelp == str(mtime)
+    assert len(settings._parser_cache) == 2
+    assert first not in settings._parser_cache.values()
+
+
+def test_persist_lock(tmp_path: Path, monkeypatch):
+    """The persisted items are written under a lock in the cache directory, and not written when it times out."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    config_file = tmp_path / "apprc"
+    config_file.write_text("[App]\nlonghelp = yes\n")
+    settings = ApplicationSettings(
+        "App", "app", ["App"], {"App": "the app"}, config_files=[str(config_file)], persist=["longhelp"]
+    )
+
+    settings.parse([])
+    assert config_file.read_text() == "[App]\nlonghelp=yes\n"
+    assert not list(tmp_path.glob("*.lock"))
+    assert (tmp_path / "cache" / "app" / "persist.lock").is_file()
+
+    from {{ cookiecutter.pkg_name }}.file_lock import FileLock
+
+    settings.PERSIST_LOCK_TIMEOUT = 0.05
+    with FileLock(str(tmp_path / "cache" / "app" / "persist")):
+        parser, namespace, leftover_argv = settings.parse(["--longhelp"])
+    assert namespace.longhelp is True
+    assert config_file.read_text() == "[App]\nlonghelp=yes\n"
+
+
+def test_persist_without_lock(tmp_path: Path, monkeypatch):
+    """The persisted items are still written when the lock cannot be created in the cache directory."""
+    cache_home = tmp_path / "cache"
+    cache_home.write_text("not a directory")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(cache_home))
+    config_file = tmp_path / "apprc"
+    config_file.write_text("[App]\nlonghelp = yes\n")
+    settings = ApplicationSettings(
+        "App", "app", ["App"], {"App": "the app"}, config_files=[str(config_file)], persist=["longhelp"]
+    )
+
+    settings.parse([])
+    assert config_file.read_text() == "[App]\nlonghelp=yes\n"
+
+
+def test_show_version_logger(tmp_path: Path, monkeypatch, capsys):
+    """The version is logged through logzero, except when answered from the pre-dispatch fast path."""
+    import logzero
+
+    logged: List[str] = []
+    monkeypatch.setattr(logzero.logger, "info", logged.append)
+    settings = ApplicationSettings("App", "app", ["App"], {"App": "the app"}, config_files=[])
+
+    settings._show_version()
+    assert logged == ["Version Unknown"]
+    assert not capsys.readouterr().err
+
+    settings._show_version(pre_dispatch=True)
+    assert logged == ["Version Unknown"]
+    assert capsys.readouterr().err.endswith("] Version Unknown\n")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.async_edit` module."""
+import asyncio
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.async_edit import AsyncEditor, async_quick_edit, async_safe_edit
+
+
+def test_async_quick_edit(tmp_path: Path):
+    """Verify async_quick_edit edits the files concurrently."""
+    file_names = [tmp_path / "test{index}.txt".format(index=index) for index in range(10)]
+    for file_name in file_names:
+        file_name.write_text("foo\nbar\n", encoding="utf-8")
+
+    async def edit_all():
+        return await asyncio.gather(*[async_quick_edit(str(file_name), {'foo': ['baz']}) for file_name in file_names])
+
+    assert asyncio.run(edit_all()) == [True] * len(file_names)
+    for file_name in file_names:
+        assert file_name.read_text(encoding="utf-8") == "baz\nbar\n"
+
+
+def test_async_safe_edit_error_leaves_file(tmp_path: Path):
+    """Verify an exception inside async_safe_edit leaves the file alone."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("old\n", encoding="utf-8")
+
+    async def edit():
+        async with async_safe_edit(str(file_name)) as files:
+            await files[1].write("new\n")
+            raise ValueError("oops")
+
+    with pytest.raises(ValueError):
+        asyncio.run(edit())
+    assert file_name.read_text(encoding="utf-8") == "old\n"
+    assert list(tmp_path.iterdir()) == [file_name]
+
+
+def test_async_editor_caps_concurrent_edits(tmp_path: Path):
+    """Verify AsyncEditor runs no more than max_concurrent_edits edits at once."""
+    editor = AsyncEditor(max_concurrent_edits=2)
+    lock = threading.Lock()
+    active = [0, 0]
+
+    def slow_write(out_file):
+        with lock:
+            active[0] += 1
+            active[1] = max(active)
+        time.sleep(0.02)
+        out_file.write("new\n")
+        with lock:
+            active[0] -= 1
+
+    async def edit(file_name):
+        async with editor.safe_edit(str(file_name)) as files:
+            await editor.run(slow_write, files[1].file)
+
+    async def edit_all():
+        await asyncio.gather(*[edit(tmp_path / "test{index}.txt".format(index=index)) for index in range(6)])
+
+    asyncio.run(edit_all())
+    editor.shutdown()
+    assert active[1] == 2
+    assert (tmp_path / "test5.txt").read_text(encoding="utf-8") == "new\n"
+
+
+def test_async_safe_edit_cancelled_leaves_file(tmp_path: Path):
+    """Verify cancelling an edit in flight leaves the file unchanged, without a backup or temporary file."""
+    file_name = tmp_path / "t"
+    file_name.write_text("old\n", encoding="utf-8")
+
+    async def edit(started: asyncio.Event):
+        async with async_safe_edit(str(file_name)) as files:
+            await files[1].write("PARTIAL")
+            started.set()
+            await asyncio.sleep(10)
+
+    async def cancel_edit():
+        started = asyncio.Event()
+        task = asyncio.ensure_future(edit(started))
+        await started.wait()
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_edit())
+    assert file_name.read_text(encoding="utf-8") == "old\n"
+    assert list(tmp_path.iterdir()) == [file_name]
+
+
+def test_async_safe_edit_loop_responsive(tmp_path: Path):
+    """Verify the event loop keeps running other tasks while a large file is read and written."""
+    file_name = tmp_path / "large.txt"
+    file_name.write_text("foo\n" * 4_000_000, encoding="utf-8")
+    editor = AsyncEditor()
+    ticks = [0]
+
+    async def tick(done: asyncio.Event):
+        while not done.is_set():
+            ticks[0] += 1
+            await asyncio.sleep(0)
+
+    async def edit():
+        done = asyncio.Event()
+        ticker = asyncio.ensure_future(tick(done))
+        await asyncio.sleep(0)
+        async with editor.safe_edit(str(file_name)) as files:
+            in_file, out_file = files
+            before = ticks[0]
+            data = await in_file.read()
+            assert ticks[0] > before
+            before = ticks[0]
+            await out_file.write(data.upper())
+            assert ticks[0] > before
+            assert [line async for line in in_file] == []
+        done.set()
+        await ticker
+
+    asyncio.run(edit())
+    editor.shutdown()
+    assert file_name.read_text(encoding="utf-8") == "FOO\n" * 4_000_000
@@ -0,0 +1,56 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.async_interrupt_handler` module."""
+import asyncio
+import os
+import signal
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.async_interrupt_handler import AsyncGracefulInterruptHandler
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="requires Unix signals")
+
+
+def test_nested_handlers():
+    """Verify the innermost handler gets the signal then releases it to the enclosing handler."""
+
+    async def nested():
+        async with AsyncGracefulInterruptHandler(signal.SIGUSR1) as outer:
+            async with AsyncGracefulInterruptHandler(signal.SIGUSR1) as inner:
+                os.kill(os.getpid(), signal.SIGUSR1)
+                await asyncio.wait_for(inner.wait(), timeout=5)
+                assert inner.interrupted and not outer.interrupted
+                os.kill(os.getpid(), signal.SIGUSR1)
+                await asyncio.wait_for(outer.wait(), timeout=5)
+                assert outer.interrupted
+
+    original_handler = signal.signal(signal.SIGUSR1, signal.SIG_IGN)
+    try:
+        asyncio.run(nested())
+        # the original handler is restored
+        assert signal.getsignal(signal.SIGUSR1) == signal.SIG_IGN
+    finally:
+        signal.signal(signal.SIGUSR1, original_handler)
+
+
+def test_cancels_tasks():
+    """Verify the signal cancels the given tasks and the current task right away."""
+
+    async def cancelled():
+        sleeper = asyncio.ensure_future(asyncio.sleep(30))
+        try:
+            async with AsyncGracefulInterruptHandler(signal.SIGUSR1, cancel_tasks=[sleeper], cancel_current=True):
+                os.kill(os.getpid(), signal.SIGUSR1)
+                await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("not cancelled")
+        await asyncio.sleep(0)
+        return sleeper.cancelled()
+
+    original_handler = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert asyncio.run(asyncio.wait_for(cancelled(), timeout=5))
+    finally:
+        signal.signal(signal.SIGUSR1, original_handler)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.binary_io` module."""
+import io
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.binary_io import mapped_records, passthrough, read_records
+
+DATA = b"".join(b"record %d %s\n" % (number, b"x" * (number % 37)) for number in range(2000)) + b"no newline"
+
+
+@pytest.mark.parametrize("buffer_size", [8, 100, 1024 * 1024])
+def test_read_records(buffer_size: int):
+    """Verify the records are split on the delimiter, across buffer refills and records longer than the buffer."""
+    records = [bytes(record) for record in read_records(io.BytesIO(DATA), buffer_size=buffer_size)]
+    assert records == DATA.splitlines(keepends=True)
+
+
+def test_read_records_delimiter(tmp_path: Path):
+    """Verify a multi byte delimiter, reading from a file descriptor."""
+    path = tmp_path / "records.bin"
+    path.write_bytes(b"a\r\nbb\r\n\r\nccc\r\n")
+    fd = os.open(str(path), os.O_RDONLY)
+    try:
+        records = [bytes(record) for record in read_records(fd, delimiter=b"\r\n", buffer_size=4)]
+    finally:
+        os.close(fd)
+    assert records == [b"a\r\n", b"bb\r\n", b"\r\n", b"ccc\r\n"]
+
+
+def test_mapped_records(tmp_path: Path):
+    """Verify the records of a memory mapped file, and an empty file."""
+    path = tmp_path / "records.bin"
+    path.write_bytes(DATA)
+    assert [bytes(record) for record in mapped_records(str(path))] == DATA.splitlines(keepends=True)
+    path.write_bytes(b"")
+    assert list(mapped_records(str(path))) == []
+
+
+@pytest.mark.parametrize("kernel", [True, False])
+def test_passthrough_files(tmp_path: Path, monkeypatch, kernel: bool):
+    """Verify copying from the position of a file to a file, with and without the kernel copies."""
+    if not kernel:
+        for name in ["splice", "copy_file_range", "sendfile"]:
+            monkeypatch.delattr(os, name, raising=False)
+    in_path = tmp_path / "in.bin"
+    in_path.write_bytes(DATA)
+    out_path = tmp_path / "out.bin"
+    with in_path.open("rb", buffering=0) as in_file, out_path.open("wb") as out_file:
+        in_file.seek(10)
+        out_file.write(b"header ")
+        assert passthrough(in_file, out_file, buffer_size=1000) == len(DATA) - 10
+    assert out_path.read_bytes() == b"header " + DATA[10:]
+
+    with in_path.open("rb", buffering=0) as in_file, out_path.open("wb") as out_file:
+        assert passthrough(in_file, out_file, count=100, buffer_size=30) == 100
+    assert out_path.read_bytes() == DATA[:100]
+
+
+def test_passthrough_pipes(tmp_path: Path):
+    """Verify copying from a pipe to a file and from a file to a pipe."""
+    in_path = tmp_path / "in.bin"
+    in_path.write_bytes(DATA)
+    out_path = tmp_path / "out.bin"
+    read_fd, write_fd = os.pipe()
+    copied = []
+
+    def copy_to_pipe():
+        with in_path.open("rb", buffering=0) as in_file:
+            copied.append(passthrough(in_file, write_fd))
+        os.close(write_fd)
+
+    thread = threading.Thread(target=copy_to_pipe)
+    thread.start()
+    try:
+        with out_path.open("wb") as out_file:
+            assert passthrough(read_fd, out_file) == len(DATA)
+    finally:
+        thread.join()
+        os.close(read_fd)
+    assert copied == [len(DATA)]
+    assert out_path.read_bytes() == DATA
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.cli` module."""
+import argparse
+from pathlib import Path
+
+from {{ cookiecutter.pkg_name }}.cli import CLI, ArgumentError, read_argument_sets
+from {{ cookiecutter.pkg_name }}.pipeline import Pipeline
+
+
+class VerbosityApp(object):
+    """An app whose results are the verbosity, raising ArgumentError for a verbosity of 0."""
+
+    def execute(self, settings: argparse.Namespace) -> int:
+        """Return the verbosity."""
+        if settings.verbosity == 0:
+            raise ArgumentError("quiet")
+        return settings.verbosity
+
+
+class RecordingCLI(CLI):
+    """Records the reported results."""
+
+    def __init__(self):
+        """Initialize."""
+        self.reported = []
+
+    def report(self, results):
+        """Record the results."""
+        self.reported.append(results)
+
+
+def test_read_argument_sets():
+    """Verify both JSON lists and shell quoted lines are read, skipping blank and comment lines."""
+    lines = ['["--logfile", "a b.log"]\n', "\n", "# comment\n", "--verbosity 3 --logfile 'c d.log'\n"]
+    assert list(read_argument_sets(lines)) == [["--logfile", "a b.log"], ["--verbosity", "3", "--logfile", "c d.log"]]
+
+
+def test_execute_batch(tmp_path: Path, monkeypatch):
+    """Verify every job runs, in order, and a job's errors do not stop the others."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    batch_file = tmp_path / "batch.txt"
+    batch_file.write_text("--verbosity 1\n--verbosity 0\n--verbosity nan\n" + "--verbosity 3\n" * 20)
+    for jobs in [1, 4]:
+        cli = RecordingCLI()
+        settings = argparse.Namespace(batch=str(batch_file), batch_jobs=jobs, batch_executor="thread",
+                                      batch_unordered=False)
+        assert cli.execute_batch(VerbosityApp(), settings) == 1
+        assert cli.reported == [1] + [3] * 20
+
+    cli = RecordingCLI()
+    batch_file.write_text("--verbosity 1\n--verbosity 3\n")
+    settings = argparse.Namespace(batch=str(batch_file), batch_jobs=2, batch_executor="thread", batch_unordered=True)
+    assert cli.execute_batch(VerbosityApp(), settings) == 0
+    assert sorted(cli.reported) == [1, 3]
+
+
+def test_execute_batch_bounds_jobs_in_flight(tmp_path: Path, monkeypatch):
+    """Verify at most two jobs per worker are submitted ahead of the reported results."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    batch_file = tmp_path / "batch.txt"
+    batch_file.write_text("--verbosity 3\n" * 50)
+    started = []
+
+    class CountingApp(VerbosityApp):
+        def execute(self, settings: argparse.Namespace) -> int:
+            started.append(settings.verbosity)
+            return super().execute(settings)
+
+    class BoundCheckingCLI(RecordingCLI):
+        def report(self, results):
+            assert len(started) - len(self.reported) <= 2 * 2
+            super().report(results)
+
+    for unordered in [False, True]:
+        started.clear()
+        cli = BoundCheckingCLI()
+        settings = argparse.Namespace(batch=str(batch_file), batch_jobs=2, batch_executor="thread",
+                                      batch_unordered=unordered)
+        assert cli.execute_batch(CountingApp(), settings) == 0
+        assert cli.reported == [3] * 50
+
+
+class PipelineApp(object):
+    """An app returning a pipeline of verbosity records."""
+
+    def execute(self, settings: argparse.Namespace) -> Pipeline:
+        """Return a pipeline of the verbosity's records."""
+        return Pipeline(range(settings.verbosity), batch_size=2)
+
+
+def test_execute_batch_runs_pipelines(tmp_path: Path, monkeypatch):
+    """Verify a pipeline returned by a batch job is run in the job, its results are its record count."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    batch_file = tmp_path / "batch.txt"
+    batch_file.write_text("--verbosity 1\n--verbosity 5\n")
+    cli = RecordingCLI()
+    settings = argparse.Namespace(batch=str(batch_file), batch_jobs=1, batch_executor="thread", batch_unordered=False)
+    assert cli.execute_batch(PipelineApp(), settings) == 0
+    assert cli.reported == [1, 5]
+
+
+def test_report_streams(tmp_path: Path):
+    """Verify the reported results are written through the CLI's writer as they are produced."""
+    from {{ cookiecutter.pkg_name }}.report_writer import ReportWriter
+
+    path = tmp_path / "results.jsonl"
+    produced = []
+
+    def results():
+        for number in range(3):
+            produced.append(number)
+            yield number
+
+    cli = CLI()
+    cli.writer = ReportWriter(str(path), flush_policy="record").open()
+    try:
+        cli.report(results())
+        Pipeline(range(3, 5)).run(default_sink=cli.report)
+    finally:
+        cli.writer.close()
+    assert produced == [0, 1, 2]
+    assert path.read_text() == "0\n1\n2\n3\n4\n"
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.daemon` module."""
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+from subprocess import PIPE, Popen, run
+
+import pytest
+
+from {{ cookiecutter.pkg_name }} import daemon as daemon_module
+from {{ cookiecutter.pkg_name }}.daemon import DAEMON_SOCKET_ENV, default_socket_path, run_client
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires fork and Unix domain sockets")
+def test_daemon(tmp_path: Path, capfd):
+    """Verify calls run in the daemon keep the command line's output and exit codes, and the daemon exits when idle."""
+    socket_path = str(tmp_path / "daemon.sock")
+    src_dir = str(Path(__file__).parent.parent / "src")
+    env = dict(os.environ, PYTHONPATH=src_dir, XDG_CACHE_HOME=str(tmp_path / "cache"))
+    daemon = Popen(
+        [sys.executable, "-m", "{{ cookiecutter.pkg_name }}.daemon", "--socket", socket_path, "--idle-timeout", "2"],
+        env=env,
+    )
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        capfd.readouterr()
+
+        assert run_client(["--version"], socket_path) == 0
+        assert "Version" in capfd.readouterr().err
+
+        assert run_client(["--verbosity", "many"], socket_path) == 2
+        assert "invalid int value" in capfd.readouterr().err
+
+        # the daemon exits after the idle timeout
+        assert daemon.wait(timeout=10) == 0
+        assert not os.path.exists(socket_path)
+        assert run_client(["--version"], socket_path) is None
+    finally:
+        daemon.kill()
+        daemon.wait()
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_PEERCRED"), reason="requires SO_PEERCRED")
+def test_client_refuses_other_users(tmp_path: Path, monkeypatch):
+    """Verify the client sends nothing to a socket listened on by another user."""
+    socket_path = str(tmp_path / "other.sock")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+        listener.bind(socket_path)
+        listener.listen(1)
+        uid = os.getuid()
+        monkeypatch.setattr(daemon_module.os, "getuid", lambda: uid + 1)
+        assert run_client(["--version"], socket_path) is None
+        connection, address = listener.accept()
+        with connection:
+            assert connection.recv(1) == b""
+
+
+def test_fallback_socket_directory(tmp_path: Path, monkeypatch):
+    """Verify the fallback socket directory is created private, and refused when accessible by others."""
+    import tempfile
+
+    monkeypatch.delenv(DAEMON_SOCKET_ENV, raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    socket_path = default_socket_path()
+    directory = Path(socket_path).parent
+    assert directory.parent == tmp_path and not directory.exists()
+
+    assert run_client(["--version"]) is None
+    assert directory.stat().st_mode & 0o777 == 0o700
+
+    directory.chmod(0o755)
+    assert run_client(["--version"]) is None
+    with pytest.raises(OSError):
+        daemon_module.serve(idle_timeout=0.1)
+
+
+CLIENT_IMPORTS_SCRIPT = """
+import sys
+from {{ cookiecutter.pkg_name }}.daemon import run_client
+run_client(["--version"], "missing.sock")
+sys.stdout.write("\\n".join(sorted(sys.modules)))
+"""
+
+
+def test_client_imports():
+    """Verify the client does not import the application, its settings or argparse."""
+    src_dir = Path(__file__).parent.parent / "src"
+    completed_process = run([sys.executable, "-c", CLIENT_IMPORTS_SCRIPT], stdout=PIPE, cwd=str(src_dir))
+    assert completed_process.returncode == 0
+    imported = set(completed_process.stdout.decode(encoding="utf-8").split())
+    assert "{{ cookiecutter.pkg_name }}.daemon" in imported
+    application = {"{{ cookiecutter.pkg_name }}." + name for name in ["app", "cli", "settings", "application_settings"]}
+    assert not imported & (application | {"argparse"})
+
+
+def test_preload(monkeypatch):
+    """Verify the daemon preloads the application and the modules it imports lazily."""
+    for name in ["{{ cookiecutter.pkg_name }}.cli", "{{ cookiecutter.pkg_name }}.report_writer", "configparser"]:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    daemon_module._preload()
+    assert {"{{ cookiecutter.pkg_name }}.cli", "{{ cookiecutter.pkg_name }}.report_writer", "configparser"} <= set(
+        sys.modules
+    )
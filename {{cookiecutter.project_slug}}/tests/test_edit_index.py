@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.edit_index` module."""
+import os
+from pathlib import Path
+
+from {{ cookiecutter.pkg_name }}.edit_index import INDEX_FILE_NAME, quick_edit_tree
+
+
+def make_tree(root: Path) -> None:
+    """Create a small tree of files to edit."""
+    (root / "sub" / "deeper").mkdir(parents=True)
+    (root / ".git").mkdir()
+    for name in ["a.txt", "sub/b.txt", "sub/deeper/c.txt", ".git/config"]:
+        (root / name).write_text("foo\nbar\n", encoding="utf-8")
+
+
+def test_quick_edit_tree_skips_current_files(tmp_path: Path):
+    """Verify a re-run only edits the files whose stat data or plan changed."""
+    make_tree(tmp_path)
+    results = quick_edit_tree(str(tmp_path), {'foo': ['baz']}, jobs=1)
+    assert sorted(os.path.relpath(result.file_name, str(tmp_path)) for result in results) == [
+        "a.txt",
+        os.path.join("sub", "b.txt"),
+        os.path.join("sub", "deeper", "c.txt"),
+    ]
+    assert (tmp_path / "sub" / "b.txt").read_text(encoding="utf-8") == "baz\nbar\n"
+    assert (tmp_path / ".git" / "config").read_text(encoding="utf-8") == "foo\nbar\n"
+    assert (tmp_path / INDEX_FILE_NAME).is_file()
+
+    assert quick_edit_tree(str(tmp_path), {'foo': ['baz']}, jobs=1) == []
+
+    # touching a file without changing its content does not edit it again
+    os.utime(str(tmp_path / "a.txt"), ns=(1, 1))
+    assert quick_edit_tree(str(tmp_path), {'foo': ['baz']}, jobs=1) == []
+
+    (tmp_path / "sub" / "b.txt").write_text("foo\nfoo bar\n", encoding="utf-8")
+    results = quick_edit_tree(str(tmp_path), {'foo': ['baz']}, jobs=1)
+    assert [result.file_name for result in results] == [str(tmp_path / "sub" / "b.txt")]
+
+    # a different plan is applied to every file
+    assert len(quick_edit_tree(str(tmp_path), {'bar': ['qux']}, jobs=1)) == 3
+
+    # as is the same plan in whole buffer mode, which may edit differently
+    assert len(quick_edit_tree(str(tmp_path), {'bar': ['qux']}, jobs=1, whole_buffer=True)) == 3
+    assert quick_edit_tree(str(tmp_path), {'bar': ['qux']}, jobs=1, whole_buffer=True) == []
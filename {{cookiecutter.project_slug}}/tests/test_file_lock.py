@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.file_lock` module."""
+import sys
+from pathlib import Path
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.file_lock import FileLock, LockMetrics, LockTimeoutError
+from {{ cookiecutter.pkg_name }}.safe_edit import EditFiles, safe_edit
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="requires fcntl")
+
+
+def test_exclusive_lock_times_out(tmp_path: Path):
+    """Verify a second exclusive lock times out while the first is held and the metrics record both."""
+    file_name = str(tmp_path / "test.rc")
+    metrics = LockMetrics()
+    with FileLock(file_name, metrics=metrics) as lock:
+        with pytest.raises(LockTimeoutError):
+            FileLock(file_name, timeout=0.05, metrics=metrics).acquire()
+        with pytest.raises(LockTimeoutError):
+            FileLock(file_name, shared=True, timeout=0, metrics=metrics).acquire()
+    assert lock.hold_time >= 0.05
+    snapshot = metrics.snapshot()
+    assert snapshot["acquisitions"] == 1
+    assert snapshot["timeouts"] == 2
+    assert snapshot["max_wait_time"] >= 0.05
+    assert snapshot["max_hold_time"] == lock.hold_time
+
+
+def test_shared_locks(tmp_path: Path):
+    """Verify shared locks may be held together but exclude an exclusive lock."""
+    file_name = str(tmp_path / "test.rc")
+    with FileLock(file_name, shared=True), FileLock(file_name, shared=True, timeout=0):
+        with pytest.raises(LockTimeoutError):
+            FileLock(file_name, timeout=0).acquire()
+    with FileLock(file_name, timeout=0) as lock:
+        assert lock.wait_time < 1
+
+
+def test_safe_edit_lock(tmp_path: Path):
+    """Verify a locked safe_edit waits for the lock held by another writer."""
+    file_name = str(tmp_path / "test.rc")
+    files: EditFiles
+    with FileLock(file_name):
+        with pytest.raises(LockTimeoutError):
+            with safe_edit(file_name, lock=True, lock_timeout=0.01) as files:
+                files[1].write("lost\n")
+    assert not Path(file_name).exists()
+    with safe_edit(file_name, lock=True, lock_timeout=0.01) as files:
+        files[1].write("saved\n")
+    assert Path(file_name).read_text(encoding="utf-8") == "saved\n"
@@ -0,0 +1,46 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.graceful_interrupt_handler` module."""
+import os
+import signal
+import socket
+import threading
+import time
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.graceful_interrupt_handler import GracefulInterruptHandler
+
+pytestmark = pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="requires Unix signals")
+
+
+def test_sleep_wakes_on_signal():
+    """Verify sleep returns as soon as the signal arrives."""
+    timer = threading.Timer(0.1, os.kill, [os.getpid(), signal.SIGUSR1])
+    with GracefulInterruptHandler(signal.SIGUSR1) as handler:
+        start = time.monotonic()
+        timer.start()
+        assert handler.sleep(30.0)
+        assert time.monotonic() - start < 5.0
+    with GracefulInterruptHandler(signal.SIGUSR1) as handler:
+        assert not handler.sleep(0.01)
+
+
+def test_wait_for_fds_in_thread_wakes_on_signal():
+    """Verify a wait in another thread wakes when the main thread gets the signal, and ready fds are returned."""
+    reader, writer = socket.socketpair()
+    with reader, writer, GracefulInterruptHandler(signal.SIGUSR1) as handler:
+        writer.send(b"x")
+        assert handler.wait_for_fds([reader], timeout=5.0) == ([reader], [])
+        reader.recv(1)
+        assert handler.wait_for_fds([reader], timeout=0.01) == ([], [])
+
+        results = []
+        waiter = threading.Thread(target=lambda: results.append(handler.wait_for_fds([reader], timeout=30.0)))
+        start = time.monotonic()
+        waiter.start()
+        time.sleep(0.1)
+        os.kill(os.getpid(), signal.SIGUSR1)
+        waiter.join(10.0)
+        assert results == [([], [])]
+        assert handler.interrupted
+        assert time.monotonic() - start < 5.0
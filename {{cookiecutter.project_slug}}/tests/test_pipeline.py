@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.pipeline` module."""
+import time
+from typing import List
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.pipeline import Pipeline, batched
+
+
+def test_batched():
+    """Verify the records are grouped into batches."""
+    assert list(batched(range(7), 3)) == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+@pytest.mark.parametrize("threaded", [False, True])
+def test_pipeline(threaded: bool):
+    """Verify the records flow through the stages in batches to the sink."""
+    batch_sizes = []
+    sunk: List[int] = []
+
+    def double_evens(batch):
+        batch_sizes.append(len(batch))
+        return [record * 2 for record in batch if record % 2 == 0]
+
+    pipeline = Pipeline(iter(range(1000)), batch_size=100, threaded=threaded)
+    pipeline.transform(double_evens, threaded=threaded).transform(lambda batch: batch, batch_size=30)
+    assert pipeline.sink(sunk.extend).run() == 500
+    assert sunk == [record * 2 for record in range(0, 1000, 2)]
+    assert batch_sizes == [100] * 10
+
+
+def test_backpressure_and_errors():
+    """Verify a slow consumer bounds the records read ahead by threaded stages, and stage errors are raised."""
+    read = []
+
+    def source():
+        for record in range(10000):
+            read.append(record)
+            yield record
+
+    batches = Pipeline(source(), batch_size=10, queue_size=2, threaded=True).batches()
+    next(batches)
+    time.sleep(0.2)
+    # the batch consumed, the batches queued, the batch waiting to be queued and the batch being read
+    assert len(read) <= 10 * 5
+    # closing stops the source's thread
+    batches.close()
+    time.sleep(0.3)
+    read_count = len(read)
+    time.sleep(0.2)
+    assert len(read) == read_count
+
+    def fail(batch):
+        raise ValueError("bad batch")
+
+    with pytest.raises(ValueError):
+        Pipeline(range(10)).transform(fail, threaded=True).run()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.pool_interrupt_handler` module."""
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.pool_interrupt_handler import PoolInterruptHandler, cancellation_requested
+
+
+def cooperative_task(seconds: float) -> bool:
+    """Sleep, stopping early when cancelled.
+
+    :return: True if cancelled
+    """
+    end_time = time.monotonic() + seconds
+    while time.monotonic() < end_time:
+        if cancellation_requested():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def stubborn_task(seconds: float) -> None:
+    """Sleep, ignoring cancellation."""
+    time.sleep(seconds)
+
+
+@pytest.mark.parametrize("executor_class", [ThreadPoolExecutor, ProcessPoolExecutor])
+def test_signal_cancels_pool(executor_class):
+    """Verify a signal stops the submissions, cancels the queued tasks and tells the running ones."""
+    with PoolInterruptHandler(executor_class, max_workers=2, deadline=5.0) as pool:
+        futures = [pool.submit(cooperative_task, 5.0) for _ in range(10)]
+        time.sleep(0.5)
+        os.kill(os.getpid(), signal.SIGTERM)
+        assert pool.cancelled
+        assert pool.submit(cooperative_task, 5.0) is None
+    report = pool.report
+    assert report.signum == signal.SIGTERM
+    assert report.unfinished == []
+    # how many queued tasks are cancelled depends on the timing (a process pool hands some to its workers early)
+    assert len(report.cancelled) + report.completed == 11
+    assert report.cancelled
+    assert all(future.result() for future in futures if not future.cancelled())
+
+
+def test_deadline_bounds_shutdown():
+    """Verify the shutdown returns at the deadline, reporting the tasks still running."""
+    start = time.monotonic()
+    with PoolInterruptHandler(ProcessPoolExecutor, max_workers=1, deadline=0.5) as pool:
+        pool.submit(stubborn_task, 30.0)
+        time.sleep(0.2)
+        pool.cancel()
+    assert time.monotonic() - start < 10
+    assert [task.args for task in pool.report.unfinished] == [(30.0,)]
+
+
+def test_drains_without_cancellation():
+    """Verify without a cancellation every task runs."""
+    with PoolInterruptHandler(max_workers=4) as pool:
+        for _ in range(8):
+            pool.submit(cooperative_task, 0.01)
+    assert pool.report.completed == 8
+    assert pool.report.cancelled == [] and pool.report.unfinished == []
+
+
+def test_done_tasks_are_not_kept():
+    """Verify the pool only keeps the tasks not done, so their futures and results can be freed."""
+    with PoolInterruptHandler(max_workers=2) as pool:
+        futures = [pool.submit(cooperative_task, 0.0) for _ in range(20)]
+        pool.wait(futures, return_when="ALL_COMPLETED")
+        assert pool._tasks == {}
+    assert pool.report.completed == 20
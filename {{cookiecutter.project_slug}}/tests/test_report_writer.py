@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.report_writer` module."""
+import argparse
+import gzip
+import json
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.report_writer import ReportWriter, output_format_for
+from {{ cookiecutter.pkg_name }}.task_runner import TaskResult
+
+
+@dataclass
+class Point(object):
+    """A dataclass result."""
+
+    x: int
+    y: int
+
+
+def test_output_format_for():
+    """Verify the default output format of the output files."""
+    assert output_format_for(None) == 'log'
+    assert output_format_for('-') == 'log'
+    assert output_format_for('results.CSV') == 'csv'
+    assert output_format_for('results.csv.gz') == 'csv'
+    assert output_format_for('results.jsonl.gz') == 'jsonl'
+    assert output_format_for('results.txt') == 'jsonl'
+
+
+def test_jsonl(tmp_path: Path):
+    """Verify the results are written as JSON Lines, named tuples and dataclasses as objects."""
+    path = tmp_path / "results.jsonl"
+    with ReportWriter(str(path), buffer_size=16) as writer:
+        assert writer.write_all(number for number in range(3)) == 3
+        assert writer.write_all([TaskResult("a", Point(1, 2), None), {"path": path}]) == 2
+        assert writer.write_all(("single", "tuple")) == 1
+    lines = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert lines == [
+        0, 1, 2,
+        {"item": "a", "result": {"x": 1, "y": 2}, "error": None},
+        {"path": str(path)},
+        ["single", "tuple"],
+    ]
+
+
+def test_csv_gzip(tmp_path: Path):
+    """Verify a .csv.gz file is gzipped CSV, with a header row from the first dict."""
+    path = tmp_path / "results.csv.gz"
+    with ReportWriter(str(path)) as writer:
+        writer.write_all(iter([{"a": 1, "b": "x,y"}, {"b": 2, "a": 3}, [4, 5]]))
+    with gzip.open(str(path), mode="rt", encoding="utf-8", newline="") as in_file:
+        assert in_file.read() == 'a,b\r\n1,"x,y"\r\n3,2\r\n4,5\r\n'
+
+
+@pytest.mark.parametrize("flush_policy, visible", [("buffer", 0), ("batch", 2), ("record", 3)])
+def test_flush_policy(tmp_path: Path, flush_policy: str, visible: int):
+    """Verify the results in the file before the writer is closed."""
+    path = tmp_path / "results.jsonl"
+    with ReportWriter(str(path), flush_policy=flush_policy) as writer:
+        writer.write_all([1, 2])
+        writer.write(3)
+        assert len(path.read_bytes().splitlines()) == visible
+    assert path.read_bytes() == b"1\n2\n3\n"
+
+
+def test_stdout(capfd):
+    """Verify the results are written to stdout, which is left open."""
+    with ReportWriter("-", output_format="jsonl") as writer:
+        writer.write_all(["a", "b"])
+    assert capfd.readouterr().out == '"a"\n"b"\n'
+
+
+def test_log(monkeypatch):
+    """Verify the log format logs each result through the logger bound when the writer is opened."""
+    import logzero
+
+    logged = []
+
+    class RecordingLogger(object):
+        def info(self, message):
+            logged.append(message)
+
+    monkeypatch.setattr(logzero, "logger", RecordingLogger())
+    with ReportWriter() as writer:
+        monkeypatch.setattr(logzero, "logger", None)
+        writer.write_all(["a", 1])
+    assert logged == ["Result: 'a'", "Result: 1"]
+
+
+def test_invalid():
+    """Verify unknown formats, flush policies and buffer sizes are rejected, also by the settings."""
+    with pytest.raises(ValueError):
+        ReportWriter(output_format="xml")
+    with pytest.raises(ValueError):
+        ReportWriter(flush_policy="never")
+    with pytest.raises(ValueError):
+        ReportWriter(buffer_size=0)
+
+    from {{ cookiecutter.pkg_name }}.settings import Settings
+
+    settings = argparse.Namespace(output=None, output_format=None, gzip=False, output_buffer_size=0)
+    assert "--output-buffer-size" in Settings()._cli_validate(settings, [])
+    settings.output_buffer_size = 1
+    assert Settings()._cli_validate(settings, []) is None
@@ -3,6 +3,9 @@
 
 Assumes the --help outputs a string that contains both the project name and the phrase "usage:"
 """
+import os
+import re
+import sys
 from pathlib import Path
 from subprocess import run, PIPE
 
@@ -47,3 +50,84 @@ def test_poetry_run():
     assert completed_process.returncode == 0
     assert "{{cookiecutter.project_name}}" in completed_process.stdout.decode(encoding="utf-8")
     assert "usage:" in completed_process.stdout.decode(encoding="utf-8")
+
+
+def test_pre_dispatch(tmp_path: Path):
+    """Verify a lone --help is answered from the help cache with the same help as a fully parsed --help.
+
+    python src/test_project/main.py --help
+
+    Also verify --version and --longhelp are answered.
+    """
+    main_py = str(Path(__file__).parent.parent / "src" / "{{cookiecutter.pkg_name}}" / "main.py")
+    env = dict(os.environ, XDG_CACHE_HOME=str(tmp_path), COLUMNS="100")
+
+    def run_main(*args: str) -> str:
+        completed_process = run([sys.executable, main_py] + list(args), stdout=PIPE, stderr=PIPE, env=env)
+        assert completed_process.returncode == 0
+        return completed_process.stdout.decode(encoding="utf-8")
+
+    def log_main(*args: str) -> str:
+        completed_process = run([sys.executable, main_py] + list(args), stdout=PIPE, stderr=PIPE, env=env)
+        assert completed_process.returncode == 0
+        assert not completed_process.stdout
+        return completed_process.stderr.decode(encoding="utf-8")
+
+    help_text = run_main("--help")
+    assert "usage:" in help_text
+    assert list((tmp_path / "{{cookiecutter.pkg_name}}").glob("help-*.txt"))
+    assert run_main("--help") == help_text
+    assert run_main("--verbosity", "2", "--help") == help_text
+    # logged to stderr in logzero's format
+    assert re.match(r"\[I \d{6} \d\d:\d\d:\d\d application_settings:\d+\] Version ", log_main("--version"))
+    assert "{{ cookiecutter.project_name }}" in log_main("--longhelp")
+
+
+# the modules that running "main.py --version" may import beyond the interpreter's start up modules and argparse
+# (logging and logzero must not be imported).
+VERSION_MODULES = {
+    "{{cookiecutter.pkg_name}}",
+    "{{cookiecutter.pkg_name}}.app",
+    "{{cookiecutter.pkg_name}}.application_settings",
+    "{{cookiecutter.pkg_name}}.cli",
+    "{{cookiecutter.pkg_name}}.graceful_interrupt_handler",
+    "{{cookiecutter.pkg_name}}.main",
+    "{{cookiecutter.pkg_name}}.settings",
+    "{{cookiecutter.pkg_name}}.terminalsize",
+    "__future__",
+    "signal",
+    "_signal",
+    "locale",
+    "_locale",
+    "fcntl",
+    "termios",
+}
+
+VERSION_IMPORTS_SCRIPT = """
+import sys
+import argparse
+baseline = set(sys.modules)
+sys.argv = ["main.py", "--version"]
+from {{cookiecutter.pkg_name}}.main import main
+try:
+    main()
+except SystemExit:
+    pass
+sys.stdout.write("\\n".join(sorted(set(sys.modules) - baseline)))
+"""
+
+
+def test_version_imports():
+    """Verify running --version only imports the modules it needs.
+
+    Slow to import modules (configparser, shutil, tempfile, subprocess, platform,...) must only be imported on the
+    code paths that use them.
+    """
+    src_dir = Path(__file__).parent.parent / "src"
+    completed_process = run(
+        [sys.executable, "-c", VERSION_IMPORTS_SCRIPT], stdout=PIPE, stderr=PIPE, cwd=str(src_dir)
+    )
+    assert completed_process.returncode == 0
+    imported = set(completed_process.stdout.decode(encoding="utf-8").split())
+    assert not imported & {"logging", "logzero"}
+    assert imported <= VERSION_MODULES, imported - VERSION_MODULES
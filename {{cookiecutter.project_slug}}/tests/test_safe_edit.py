@@ -0,0 +1,326 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.safe_edit` module."""
+import os
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from {{ cookiecutter.pkg_name }} import safe_edit as safe_edit_module
+from {{ cookiecutter.pkg_name }}.safe_edit import (
+    EditFiles,
+    EditPlan,
+    _line_replacement,
+    copy_range,
+    quick_edit,
+    quick_edit_many,
+    safe_edit,
+    safe_edit_many,
+)
+
+LINES = [
+    "foo bar car\n",
+    "nothing to see here\n",
+    "car foo\n",
+    "food and cars\n",
+    "\n",
+    "last line without newline foo",
+]
+
+REPLACEMENTS: List[Dict[str, List[str]]] = [
+    {'foo': ['bar']},
+    {'foo': ['bar'], 'car': ['dog']},
+    {r'.*?(foo).*?(car).*': ['bar', 'dog']},
+    {r'(?:foo)': []},
+    {r'\s': ['_']},
+    {r'(f)(o)\2': ['F', 'O']},
+]
+
+
+@pytest.mark.parametrize("replacements", REPLACEMENTS)
+def test_edit_plan_matches_line_replacement(replacements):
+    """Verify a compiled EditPlan produces the same lines as the uncompiled replacements."""
+    plan = EditPlan(replacements)
+    for line in LINES:
+        assert plan.apply(line) == _line_replacement(line, replacements)
+
+
+def test_quick_edit_with_plan(tmp_path: Path):
+    """Verify quick_edit accepts a compiled EditPlan and keeps a backup of the original."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("".join(LINES), encoding="utf-8")
+    quick_edit(str(file_name), EditPlan({'foo': ['bar'], 'car': ['dog']}))
+    assert file_name.read_text(encoding="utf-8") == "".join(_line_replacement(line, REPLACEMENTS[1]) for line in LINES)
+    assert Path(str(file_name) + "~").read_text(encoding="utf-8") == "".join(LINES)
+
+
+def test_safe_edit_replaces_in_place(tmp_path: Path):
+    """Verify safe_edit renames a temporary file from the same directory into place and keeps the file's mode."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("old\n", encoding="utf-8")
+    file_name.chmod(0o640)
+    files: EditFiles
+    with safe_edit(str(file_name)) as files:
+        in_file, out_file = files
+        assert Path(out_file.name).parent == tmp_path
+        out_file.write(in_file.read().replace("old", "new"))
+    assert file_name.read_text(encoding="utf-8") == "new\n"
+    assert file_name.stat().st_mode & 0o777 == 0o640
+    assert Path(str(file_name) + "~").read_text(encoding="utf-8") == "old\n"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["test.txt", "test.txt~"]
+
+
+def test_safe_edit_identical_output(tmp_path: Path):
+    """Verify identical output leaves the file, its backup and its mtime untouched."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("".join(LINES), encoding="utf-8")
+    os.utime(str(file_name), ns=(1, 1))
+    files: EditFiles
+    with safe_edit(str(file_name)) as files:
+        files[1].write(files[0].read())
+    assert not files.changed
+    assert file_name.stat().st_mtime_ns == 1
+    assert list(tmp_path.iterdir()) == [file_name]
+
+    assert not quick_edit(str(file_name), {'missing': ['found']})
+    assert quick_edit(str(file_name), {'foo': ['FOO']})
+    assert file_name.stat().st_mtime_ns != 1
+    assert not quick_edit(str(file_name), {'FOO': ['FOO']})
+
+
+def test_safe_edit_error_leaves_file(tmp_path: Path):
+    """Verify an exception inside safe_edit leaves the file alone and removes the temporary file."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("old\n", encoding="utf-8")
+    files: EditFiles
+    with pytest.raises(ValueError):
+        with safe_edit(str(file_name)) as files:
+            files[1].write("new\n")
+            raise ValueError("oops")
+    assert file_name.read_text(encoding="utf-8") == "old\n"
+    assert list(tmp_path.iterdir()) == [file_name]
+
+
+@pytest.mark.parametrize("exception", [KeyboardInterrupt, SystemExit])
+def test_safe_edit_base_exception_leaves_file(tmp_path: Path, exception):
+    """Verify a BaseException inside safe_edit and safe_edit_many does not commit the partial output."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("old\n", encoding="utf-8")
+    files: EditFiles
+    with pytest.raises(exception):
+        with safe_edit(str(file_name)) as files:
+            files[1].write("PARTIAL")
+            raise exception()
+    edits: List[EditFiles]
+    with pytest.raises(exception):
+        with safe_edit_many([str(file_name)]) as edits:
+            edits[0][1].write("PARTIAL")
+            raise exception()
+    assert file_name.read_text(encoding="utf-8") == "old\n"
+    assert list(tmp_path.iterdir()) == [file_name]
+
+
+def test_safe_edit_many(tmp_path: Path):
+    """Verify safe_edit_many commits every file of the set."""
+    file_names = [tmp_path / "a.rc", tmp_path / "b.conf", tmp_path / "new.conf"]
+    for file_name in file_names[:2]:
+        file_name.write_text("old\n", encoding="utf-8")
+    edits: List[EditFiles]
+    with safe_edit_many([str(file_name) for file_name in file_names]) as edits:
+        for in_file, out_file in edits:
+            out_file.write(in_file.read().replace("old", "new") if in_file else "created\n")
+    assert [file_name.read_text(encoding="utf-8") for file_name in file_names] == ["new\n", "new\n", "created\n"]
+    assert [files.changed for files in edits] == [True, True, True]
+    assert Path(str(file_names[0]) + "~").read_text(encoding="utf-8") == "old\n"
+
+    with safe_edit_many([str(file_name) for file_name in file_names]) as edits:
+        for in_file, out_file in edits:
+            out_file.write(in_file.read().replace("created", "changed"))
+    assert [files.changed for files in edits] == [False, False, True]
+
+
+def test_safe_edit_many_rollback(tmp_path: Path, monkeypatch):
+    """Verify safe_edit_many restores the files already committed when committing a later file fails."""
+    file_names = [str(tmp_path / name) for name in ["a.rc", "b.rc", "c.rc"]]
+    for file_name in file_names[:2]:
+        Path(file_name).write_text("old\n", encoding="utf-8")
+    install_file = safe_edit_module._install_file
+
+    def failing_install_file(file_name: str, tf_name: str) -> None:
+        if file_name == file_names[2]:
+            raise OSError("disk full")
+        install_file(file_name, tf_name)
+
+    monkeypatch.setattr(safe_edit_module, "_install_file", failing_install_file)
+    edits: List[EditFiles]
+    with pytest.raises(OSError):
+        with safe_edit_many(file_names) as edits:
+            for in_file, out_file in edits:
+                out_file.write("new\n")
+    assert [Path(file_name).read_text(encoding="utf-8") for file_name in file_names[:2]] == ["old\n", "old\n"]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.rc", "b.rc"]
+
+
+def test_safe_edit_many_fsync_order(tmp_path: Path, monkeypatch):
+    """Verify the changed staged files are all fsynced before any rename, then each directory once after them."""
+    (tmp_path / "sub").mkdir()
+    file_names = [str(tmp_path / "a.rc"), str(tmp_path / "sub" / "b.rc"), str(tmp_path / "c.rc")]
+    for file_name in file_names:
+        Path(file_name).write_text("old\n", encoding="utf-8")
+    events = []
+    fsync, install_file = os.fsync, safe_edit_module._install_file
+
+    def recording_fsync(fd: int) -> None:
+        events.append("fsync")
+        fsync(fd)
+
+    def recording_install_file(file_name: str, tf_name: str) -> None:
+        events.append("install")
+        install_file(file_name, tf_name)
+
+    def recording_fsync_directory(directory: str) -> None:
+        events.append(directory)
+
+    monkeypatch.setattr(safe_edit_module.os, "fsync", recording_fsync)
+    monkeypatch.setattr(safe_edit_module, "_install_file", recording_install_file)
+    monkeypatch.setattr(safe_edit_module, "_fsync_directory", recording_fsync_directory)
+    edits: List[EditFiles]
+    with safe_edit_many(file_names) as edits:
+        for file_name, (in_file, out_file) in zip(file_names, edits):
+            out_file.write("new\n" if file_name != file_names[2] else in_file.read())
+    assert events[:4] == ["fsync", "fsync", "install", "install"]
+    assert sorted(events[4:]) == sorted([str(tmp_path), str(tmp_path / "sub")])
+
+
+@pytest.mark.parametrize("kernel_copy", [True, False])
+def test_binary_safe_edit_copy_range(tmp_path: Path, monkeypatch, kernel_copy):
+    """Verify a binary safe_edit can patch a header and pass the rest of the file through with copy_range."""
+    file_name = tmp_path / "test.bin"
+    body = bytes(range(256)) * 1024
+    file_name.write_bytes(b"HEAD" + body)
+    if not kernel_copy:
+
+        def no_kernel_copy(*args):
+            raise OSError("not supported")
+
+        monkeypatch.setattr(safe_edit_module, "_kernel_copy", no_kernel_copy)
+    files: EditFiles
+    with safe_edit(str(file_name), binary=True) as files:
+        in_file, out_file = files
+        out_file.write(in_file.read(4).lower() + b"er")
+        assert copy_range(in_file, out_file, 4, 10) == 10
+        assert copy_range(in_file, out_file, 14) == len(body) - 10
+        out_file.write(b"TAIL")
+    assert file_name.read_bytes() == b"header" + body + b"TAIL"
+
+
+def test_quick_edit_memory_ceiling(tmp_path: Path):
+    """Verify quick_edit streams the file so peak memory does not depend on the file size."""
+    import tracemalloc
+
+    file_name = tmp_path / "large.txt"
+    chunk = "".join(line[:-1] * 256 + "\n" for line in LINES[:-1]) * 16
+    with open(file_name, "w", encoding="utf-8") as out_file:
+        for _ in range(256):
+            out_file.write(chunk)
+    file_size = file_name.stat().st_size
+    assert file_size > 16 * 1024 * 1024
+
+    buffer_size = 64 * 1024
+    tracemalloc.start()
+    try:
+        quick_edit(str(file_name), EditPlan({'foo': ['bar']}), buffer_size=buffer_size)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 16 * buffer_size
+    assert file_name.stat().st_size == file_size
+
+
+@pytest.mark.parametrize("replacements", REPLACEMENTS)
+@pytest.mark.parametrize("whole_buffer", [False, True])
+def test_quick_edit_modes(tmp_path: Path, replacements, whole_buffer: bool):
+    """Verify both modes edit single line patterns like the uncompiled replacements."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("".join(LINES), encoding="utf-8")
+    assert quick_edit(str(file_name), replacements, whole_buffer=whole_buffer)
+    assert file_name.read_text(encoding="utf-8") == "".join(_line_replacement(line, replacements) for line in LINES)
+
+
+@pytest.mark.parametrize(
+    "replacements", [{'(.)': ['X']}, {r'(\w+)': ['word']}, {'(?i)(É)': ['e']}, {'é': ['e']}, {r'\s': ['_']}]
+)
+def test_quick_edit_modes_non_ascii(tmp_path: Path, replacements):
+    """Verify both modes edit non-ASCII lines alike, matching characters rather than utf-8 bytes."""
+    lines = ["é\n", "plain\n", "Éclair\u00a0au café\n", "ascii only"]
+    expected = "".join(_line_replacement(line, replacements) for line in lines)
+    for whole_buffer in [False, True]:
+        file_name = tmp_path / "test{mode}.txt".format(mode=int(whole_buffer))
+        file_name.write_text("".join(lines), encoding="utf-8")
+        quick_edit(str(file_name), replacements, whole_buffer=whole_buffer)
+        assert file_name.read_text(encoding="utf-8") == expected
+
+
+def test_quick_edit_whole_buffer_split_character(tmp_path: Path):
+    """Verify a pattern spanning lines whose groups would split a utf-8 character leaves the file unchanged."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("é\nx\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        quick_edit(str(file_name), {'(.)(.)\n': ['X', 'Y']}, whole_buffer=True)
+    assert file_name.read_text(encoding="utf-8") == "é\nx\n"
+
+
+def test_quick_edit_whole_buffer_stages(tmp_path: Path):
+    """Verify line patterns before and after a pattern spanning lines see each other's edits."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("".join(LINES), encoding="utf-8")
+    replacements = {'foo': ['car'], r'.*?(car)\n(car)': ['CAR', 'RAC'], r'\s': ['_']}
+    assert quick_edit(str(file_name), replacements, whole_buffer=True)
+    lines = "".join(_line_replacement(line, {'foo': ['car']}) for line in LINES).replace("car\ncar", "CAR\nRAC")
+    expected = "".join(_line_replacement(line, {r'\s': ['_']}) for line in lines.splitlines(keepends=True))
+    assert file_name.read_text(encoding="utf-8") == expected
+
+
+def test_quick_edit_whole_buffer_no_match(tmp_path: Path):
+    """Verify the whole buffer mode leaves the file alone and creates no backup when nothing matches."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("".join(LINES), encoding="utf-8")
+    mtime_ns = file_name.stat().st_mtime_ns
+    assert not quick_edit(str(file_name), {'missing': ['found']}, whole_buffer=True)
+    assert file_name.stat().st_mtime_ns == mtime_ns
+    assert not Path(str(file_name) + "~").exists()
+    assert list(tmp_path.iterdir()) == [file_name]
+
+
+def test_quick_edit_whole_buffer_multiline(tmp_path: Path):
+    """Verify the whole buffer mode supports patterns that span lines."""
+    file_name = tmp_path / "test.txt"
+    file_name.write_text("".join(LINES), encoding="utf-8")
+    assert quick_edit(str(file_name), {r'.*?(car)\n(car) ': ['CAR', 'RAC'], r'(?:\n)': []}, whole_buffer=True)
+    expected = "".join(LINES).replace("car\ncar ", "CAR\nRAC ").replace("\n\n", "\n")
+    assert file_name.read_text(encoding="utf-8") == expected
+
+
+@pytest.mark.parametrize("whole_buffer", [False, True])
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_quick_edit_many(tmp_path: Path, whole_buffer: bool, jobs: int):
+    """Verify quick_edit_many edits every file and reports a missing file, without creating it or aborting."""
+    file_names = []
+    for index in range(8):
+        file_name = tmp_path / "test{index}.txt".format(index=index)
+        file_name.write_text("".join(LINES[index % 2:]), encoding="utf-8")
+        file_names.append(str(file_name))
+    file_names.insert(3, str(tmp_path / "missing.txt"))
+
+    results = quick_edit_many(file_names, {'foo': ['bar']}, jobs=jobs, whole_buffer=whole_buffer)
+
+    assert [result.file_name for result in results] == file_names
+    assert results[3].error is not None
+    assert results[3].error.startswith("FileNotFoundError")
+    assert not results[3].changed
+    assert not (tmp_path / "missing.txt").exists()
+    for result in results[:3] + results[4:]:
+        assert result.error is None
+        assert result.changed
+        assert result.bytes_written == Path(result.file_name).stat().st_size
+        assert "foo" not in Path(result.file_name).read_text(encoding="utf-8")
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.task_runner` module."""
+import argparse
+import os
+
+import pytest
+
+from {{ cookiecutter.pkg_name }}.task_runner import TaskRunner, available_cpus, jobs_argument
+
+
+def reciprocal(item: int) -> float:
+    """A task that fails for 0."""
+    return 1 / item
+
+
+def test_jobs_argument():
+    """Verify --jobs takes a positive number or auto."""
+    assert jobs_argument("3") == 3
+    assert 1 <= jobs_argument("auto") == available_cpus() <= (os.cpu_count() or 1)
+    for value in ["0", "many"]:
+        with pytest.raises(argparse.ArgumentTypeError):
+            jobs_argument(value)
+
+
+@pytest.mark.parametrize("jobs,executor,chunk_size", [(1, "thread", 1), (3, "thread", 1), (2, "process", 4)])
+def test_run_ordered(jobs: int, executor: str, chunk_size: int):
+    """Verify the results are in the order of the work items, with the errors captured."""
+    runner = TaskRunner(jobs=jobs, executor=executor, chunk_size=chunk_size)
+    results = list(runner.run(reciprocal, iter(range(-20, 21))))
+    assert [result.item for result in results] == list(range(-20, 21))
+    assert [result.item for result in results if result.error] == [0]
+    assert results[20].error is not None
+    assert results[20].error.startswith("ZeroDivisionError")
+    assert results[21].result == 1.0
+    # the work items, not the chunks
+    assert runner.report.completed == 41
+
+
+def test_run_unordered_from_settings():
+    """Verify the settings configure the runner, and errors are raised when not captured."""
+    settings = argparse.Namespace(jobs=4, executor="thread", chunk_size=2, unordered=True)
+    runner = TaskRunner.from_settings(settings)
+    assert sorted(result.result for result in runner.run(reciprocal, [1, 2, 4, 5])) == [0.2, 0.25, 0.5, 1.0]
+
+    runner = TaskRunner.from_settings(settings, capture_errors=False)
+    with pytest.raises(ZeroDivisionError):
+        list(runner.run(reciprocal, [1, 0, 2]))
@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""Tests for `{{ cookiecutter.pkg_name }}.terminalsize` module."""
+import os
+import signal
+
+import pytest
+
+from {{ cookiecutter.pkg_name }} import terminalsize
+from {{ cookiecutter.pkg_name }}.terminalsize import get_terminal_size, refresh_terminal_size
+
+
+def test_get_terminal_size_memoized(monkeypatch):
+    """Verify the size follows COLUMNS and LINES and is memoized until refreshed."""
+    monkeypatch.setenv("COLUMNS", "123")
+    monkeypatch.setenv("LINES", "45")
+    refresh_terminal_size()
+    assert get_terminal_size() == (123, 45)
+
+    monkeypatch.setenv("COLUMNS", "99")
+    assert get_terminal_size() == (123, 45)
+    refresh_terminal_size()
+    assert get_terminal_size() == (99, 45)
+
+    monkeypatch.delenv("COLUMNS")
+    monkeypatch.delenv("LINES")
+    refresh_terminal_size()
+    if not os.isatty(1):
+        assert get_terminal_size() == terminalsize.DEFAULT_TERMINAL_SIZE
+    refresh_terminal_size()
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGWINCH"), reason="requires SIGWINCH")
+def test_sigwinch_refreshes(monkeypatch):
+    """Verify a SIGWINCH forgets the memoized size and chains to the original handler."""
+    calls = []
+    original_handler = signal.signal(signal.SIGWINCH, lambda signum, frame: calls.append(signum))
+    monkeypatch.setattr(terminalsize, "_sigwinch_handler_installed", False)
+    try:
+        terminalsize._install_sigwinch_handler()
+        get_terminal_size()
+        os.kill(os.getpid(), signal.SIGWINCH)
+        assert terminalsize._terminal_size is None
+        assert calls == [signal.SIGWINCH]
+    finally:
+        signal.signal(signal.SIGWINCH, original_handler)